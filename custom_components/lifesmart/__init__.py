@@ -18,6 +18,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 
 from .const import DOMAIN, SUPPORTED_PLATFORMS, UPDATE_LISTENER
+from .device_snapshot import LifeSmartDeviceSnapshot
 from .hub import LifeSmartHub
 from .services import LifeSmartServiceManager
 
@@ -30,8 +31,9 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     此函数是 Home Assistant 加载集成时的主要入口点，负责：
     1. 创建和初始化 LifeSmart Hub
     2. 设置平台组件
-    3. 注册服务
-    4. 设置配置更新监听器
+    3. 启动设备快照对账
+    4. 注册服务
+    5. 设置配置更新监听器
 
     Args:
         hass: Home Assistant 的核心实例
@@ -64,7 +66,10 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
             config_entry, SUPPORTED_PLATFORMS
         )
 
-        # 4. 注册服务
+        # 4. 设备列表来自快照时，实体已创建，在后台与实时设备列表对账
+        hub.start_snapshot_reconcile()
+
+        # 5. 注册服务
         service_manager = LifeSmartServiceManager(hass, hub.get_client())
         service_manager.register_services()
 
@@ -153,3 +158,13 @@ async def _async_update_listener(
     """
     _LOGGER.info("检测到配置更新，正在重新加载 LifeSmart 集成...")
     await hass.config_entries.async_reload(config_entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """删除配置条目时移除其设备快照。
+
+    Args:
+        hass: Home Assistant 的核心实例
+        config_entry: 被删除的配置条目
+    """
+    await LifeSmartDeviceSnapshot(hass, config_entry.entry_id).async_remove()
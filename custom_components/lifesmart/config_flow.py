@@ -18,6 +18,7 @@ from homeassistant.exceptions import ConfigEntryNotReady, ConfigEntryAuthFailed
 from homeassistant.helpers import selector
 from homeassistant.helpers.selector import SelectSelectorMode
 
+from .core.local_connection_pool import parse_gateway_hosts
 from .core.local_tcp_client import LifeSmartLocalTCPClient
 from .const import (
     CONF_AI_INCLUDE_AGTS,
@@ -30,6 +31,9 @@ from .const import (
     CONF_LIFESMART_USERTOKEN,
     CONF_LIFESMART_USERPASSWORD,
     CONF_LIFESMART_AUTH_METHOD,
+    CONF_LOCAL_AWAIT_ACK,
+    CONF_LOCAL_EXTRA_HOSTS,
+    CONF_LOCAL_FULL_CONFIG,
     DOMAIN,
     LIFESMART_REGION_OPTIONS,
 )
@@ -195,7 +199,37 @@ class LifeSmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
         if user_input is not None:
             try:
-                await validate_local_input(self.hass, user_input)
+                extra_hosts = parse_gateway_hosts(
+                    user_input.get(CONF_LOCAL_EXTRA_HOSTS, ""), user_input[CONF_PORT]
+                )
+            except ValueError:
+                errors[CONF_LOCAL_EXTRA_HOSTS] = "invalid_extra_hosts"
+        if user_input is not None and not errors:
+            # 额外网关与主网关一样尝试登录，其错误显示在额外网关字段上
+            gateways = [("base", user_input)] + [
+                (
+                    CONF_LOCAL_EXTRA_HOSTS,
+                    {**user_input, CONF_HOST: host, CONF_PORT: port},
+                )
+                for host, port in extra_hosts
+            ]
+            for field, gateway_input in gateways:
+                try:
+                    await validate_local_input(self.hass, gateway_input)
+                except (
+                    asyncio.TimeoutError,
+                    ConnectionRefusedError,
+                    ConfigEntryNotReady,
+                ):
+                    errors[field] = "cannot_connect"
+                except ConfigEntryAuthFailed:
+                    errors[field] = "invalid_auth"
+                except Exception:
+                    _LOGGER.exception("本地连接流程发生未知错误")
+                    errors[field] = "unknown"
+                if errors:
+                    break
+            else:
                 return self.async_create_entry(
                     title=f"Local Hub ({user_input[CONF_HOST]})",
                     data={
@@ -203,13 +237,6 @@ class LifeSmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_TYPE: config_entries.CONN_CLASS_LOCAL_PUSH,
                     },
                 )
-            except (asyncio.TimeoutError, ConnectionRefusedError, ConfigEntryNotReady):
-                errors["base"] = "cannot_connect"
-            except ConfigEntryAuthFailed:
-                errors["base"] = "invalid_auth"
-            except Exception:
-                _LOGGER.exception("本地连接流程发生未知错误")
-                errors["base"] = "unknown"
 
         local_schema = vol.Schema(
             {
@@ -219,6 +246,7 @@ class LifeSmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(CONF_PASSWORD, default="admin"): selector.TextSelector(
                     selector.TextSelectorConfig(type="password")
                 ),
+                vol.Optional(CONF_LOCAL_EXTRA_HOSTS): str,
             }
         )
         return self.async_show_form(
@@ -462,6 +490,24 @@ class LifeSmartOptionsFlowHandler(config_entries.OptionsFlow):
                 ): str,
             }
         )
+        if (
+            self._get_config_data().get(CONF_TYPE)
+            == config_entries.CONN_CLASS_LOCAL_PUSH
+        ):
+            # 本地模式: 指令是否等待中枢应答 (中枢需在应答中返回 _sel)，
+            # 以及 get-config 是否请求全部字段 (便于排查设备问题)
+            schema = schema.extend(
+                {
+                    vol.Optional(
+                        CONF_LOCAL_AWAIT_ACK,
+                        default=self.options_data.get(CONF_LOCAL_AWAIT_ACK, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_LOCAL_FULL_CONFIG,
+                        default=self.options_data.get(CONF_LOCAL_FULL_CONFIG, False),
+                    ): bool,
+                }
+            )
         return self.async_show_form(step_id="main_params", data_schema=schema)
 
     async def async_step_auth_params(
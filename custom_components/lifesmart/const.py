@@ -50,6 +50,9 @@ CONF_EXCLUDE_ITEMS = "exclude"
 CONF_EXCLUDE_AGTS = "exclude_agt"
 CONF_AI_INCLUDE_AGTS = "ai_include_agt"
 CONF_AI_INCLUDE_ITEMS = "ai_include_me"
+CONF_LOCAL_EXTRA_HOSTS = "extra_hosts"  # 共用本地凭据的其他网关 (host[:port]，逗号分隔)
+CONF_LOCAL_AWAIT_ACK = "local_await_ack"  # 本地指令等待中枢按 _sel 返回的应答
+CONF_LOCAL_FULL_CONFIG = "local_full_config"  # 本地 get-config 请求全部端点字段
 
 # --- AI 类型常量 ---
 CON_AI_TYPE_SCENE = "scene"
@@ -0,0 +1,119 @@
+"""LifeSmart 云端接口的熔断器。
+
+某个云端接口连续出现暂时性故障 (网络错误、服务端错误) 达到阈值后熔断：之后的
+请求立即失败，不再访问云端。熔断期间由后台任务定期发送探测请求，探测成功后
+恢复正常；探测失败时探测间隔逐次加倍。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from ..exceptions import LifeSmartAPIError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class CircuitBreakerStats:
+    """熔断器的统计数据。"""
+
+    opens: int = 0
+    rejected: int = 0
+    probes: int = 0
+
+
+class LifeSmartCircuitBreaker:
+    """单个云端接口的熔断器。
+
+    `check()` 在发出请求前调用，熔断期间引发 `LifeSmartAPIError`。请求出现
+    暂时性故障时调用 `record_failure()`，云端正常响应 (包括业务错误) 时调用
+    `record_success()`。熔断后 `probe()` 在后台每隔 `reset_timeout` 秒
+    (逐次加倍，不超过 `max_reset_timeout`) 被调用一次，返回 True 时恢复。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[bool]],
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_reset_timeout: float = 300.0,
+    ) -> None:
+        self.name = name
+        self._probe = probe
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._failures = 0
+        self._open = False
+        self._probe_task: asyncio.Task | None = None
+        self.stats = CircuitBreakerStats()
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于熔断状态。"""
+        return self._open
+
+    def check(self) -> None:
+        """熔断期间拒绝请求。
+
+        Raises:
+            LifeSmartAPIError: 熔断器处于打开状态
+        """
+        if self._open:
+            self.stats.rejected += 1
+            raise LifeSmartAPIError(
+                f"LifeSmart 云端接口 {self.name} 暂时不可用，正在等待恢复。"
+            )
+
+    def record_success(self) -> None:
+        """云端正常响应，清零连续故障计数。"""
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        """记录一次暂时性故障，连续故障达到阈值时熔断。"""
+        if self._open:
+            return
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._trip()
+
+    def cancel(self) -> None:
+        """停止后台探测任务 (客户端关闭时调用)。"""
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+        self._probe_task = None
+
+    def _trip(self) -> None:
+        """打开熔断器并启动后台探测。"""
+        self._open = True
+        self.stats.opens += 1
+        _LOGGER.warning(
+            "LifeSmart 云端接口 %s 连续 %d 次失败，暂停请求并在后台探测恢复。",
+            self.name,
+            self._failures,
+        )
+        self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def _probe_loop(self) -> None:
+        """定期探测云端接口，直到其恢复。"""
+        delay = self.reset_timeout
+        while True:
+            await asyncio.sleep(delay)
+            self.stats.probes += 1
+            try:
+                healthy = await self._probe()
+            except Exception as e:
+                _LOGGER.debug("探测云端接口 %s 时出错: %s", self.name, e)
+                healthy = False
+            if healthy:
+                break
+            delay = min(self.max_reset_timeout, delay * 2)
+        self._open = False
+        self._failures = 0
+        self._probe_task = None
+        _LOGGER.info("LifeSmart 云端接口 %s 已恢复。", self.name)
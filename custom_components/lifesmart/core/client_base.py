@@ -13,7 +13,7 @@
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator
 
 from homeassistant.components.climate import HVACMode
 
@@ -59,6 +59,16 @@ class LifeSmartClientBase(ABC):
         """
         return await self._async_get_all_devices()
 
+    async def async_iter_devices(self, timeout=10) -> AsyncIterator[dict[str, Any]]:
+        """
+        逐个产出设备信息的公共接口。
+
+        默认实现取得完整的设备列表后再逐个产出；能在设备列表到达过程中提前
+        产出设备的客户端（如本地 TCP 客户端）会覆盖此方法。
+        """
+        for device in await self._async_get_all_devices(timeout) or []:
+            yield device
+
     async def async_send_single_command(
         self, agt: str, me: str, idx: str, command_type: int, val: Any
     ) -> int:
@@ -0,0 +1,190 @@
+"""LifeSmart 云端 API 的客户端限流器。
+
+所有云端请求在发出前先从令牌桶中取得许可：令牌按固定速率补充，桶容量决定
+允许的突发请求数，同时进行中的请求数也有上限。等待许可的请求按优先级分道，
+用户指令先于红外请求，红外请求先于后台刷新。服务器提示限流时，所有请求暂停
+一段逐次加倍的退避时间。排队等待时间与被拒绝的请求数可通过 `stats` 查看。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import AsyncIterator
+
+from ..exceptions import LifeSmartAPIError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CloudPriority(IntEnum):
+    """云端请求优先级，数值越小越先发出。"""
+
+    COMMAND = 0  # 实体控制、场景等用户指令
+    IR = 1  # 红外按键发送与红外码库查询
+    BACKGROUND = 2  # 设备/场景/房间列表等后台刷新
+
+
+@dataclass
+class CloudRateLimitStats:
+    """限流器的统计数据。"""
+
+    requests: int = 0
+    rejected: int = 0
+    backoffs: int = 0
+    max_depth: int = 0
+    last_wait: float = 0.0
+    max_wait: float = 0.0
+    total_wait: float = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        """每个请求的平均排队等待时间 (秒)。"""
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+class LifeSmartCloudRateLimiter:
+    """带优先级与并发上限的令牌桶限流器。
+
+    `slot(priority)` 等待许可后进入，退出时释放并发名额。许可按优先级顺序
+    发放，同一优先级内先到先得。排队的请求达到 `max_queue` 时新请求立即以
+    `LifeSmartAPIError` 被拒绝，避免大量指令在服务器限流期间无限堆积。
+
+    `report_throttled()` 在服务器提示限流后调用，暂停发放许可：有服务器给出的
+    等待时间时使用该时间，否则使用从 `INITIAL_BACKOFF` 开始逐次加倍、不超过
+    `MAX_BACKOFF` 的退避时间。`report_success()` 重置退避。
+    """
+
+    INITIAL_BACKOFF = 1.0
+    MAX_BACKOFF = 30.0
+
+    def __init__(
+        self, rate: float, burst: int, max_concurrent: int, max_queue: int
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._tokens = float(burst)
+        self._refilled_at: float | None = None
+        self._active = 0
+        self._lanes: tuple[deque, ...] = tuple(deque() for _ in CloudPriority)
+        self._blocked_until = 0.0
+        self._backoff = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+        self.stats = CloudRateLimitStats()
+
+    @property
+    def depth(self) -> int:
+        """当前排队等待许可的请求数。"""
+        return sum(len(lane) for lane in self._lanes)
+
+    @property
+    def active(self) -> int:
+        """当前进行中的请求数。"""
+        return self._active
+
+    def lane_depths(self) -> dict[str, int]:
+        """各优先级队列中等待许可的请求数。"""
+        return {
+            priority.name.lower(): len(self._lanes[priority])
+            for priority in CloudPriority
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: CloudPriority) -> AsyncIterator[None]:
+        """取得一个请求许可，退出时释放并发名额。"""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: CloudPriority) -> None:
+        """等待一个请求许可，之后必须调用 `release()`。
+
+        Raises:
+            LifeSmartAPIError: 排队的请求已达到 `max_queue`
+        """
+        if self.depth >= self.max_queue:
+            self.stats.rejected += 1
+            raise LifeSmartAPIError("云端请求排队过多，已拒绝本次请求，请稍后重试。")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._lanes[priority].append((future, loop.time()))
+        self.stats.max_depth = max(self.stats.max_depth, self.depth)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                # 已取得许可但调用方随即被取消
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """释放一个并发名额，并向等待中的请求发放许可。"""
+        self._active -= 1
+        self._dispatch()
+
+    def report_throttled(self, retry_after: float | None = None) -> None:
+        """服务器提示限流，在退避时间内暂停发放许可。"""
+        if self._backoff:
+            self._backoff = min(self.MAX_BACKOFF, self._backoff * 2)
+        else:
+            self._backoff = self.INITIAL_BACKOFF
+        delay = retry_after if retry_after is not None else self._backoff
+        loop = asyncio.get_running_loop()
+        self._blocked_until = max(self._blocked_until, loop.time() + delay)
+        self.stats.backoffs += 1
+        _LOGGER.warning("LifeSmart 云端提示请求过于频繁，暂停发送 %.1f 秒。", delay)
+        self._dispatch()
+
+    def report_success(self) -> None:
+        """请求成功，重置退避时间。"""
+        self._backoff = 0.0
+
+    def _next_lane(self) -> deque | None:
+        """返回最高优先级的非空队列，跳过已被取消的请求。"""
+        for lane in self._lanes:
+            while lane and lane[0][0].done():
+                lane.popleft()
+            if lane:
+                return lane
+        return None
+
+    def _dispatch(self) -> None:
+        """在令牌与并发名额允许时发放许可，否则安排在可发放时再次检查。"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._refilled_at is not None:
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._refilled_at) * self.rate
+            )
+        self._refilled_at = now
+        while self._active < self.max_concurrent and (lane := self._next_lane()):
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+            elif self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+            else:
+                future, queued_at = lane.popleft()
+                self._tokens -= 1
+                self._active += 1
+                wait = now - queued_at
+                stats = self.stats
+                stats.requests += 1
+                stats.last_wait = wait
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+                future.set_result(None)
+                continue
+            self._timer = loop.call_later(delay, self._dispatch)
+            return
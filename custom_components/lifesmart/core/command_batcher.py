@@ -0,0 +1,129 @@
+"""LifeSmart 云端 IO 写指令的微批处理器。
+
+短时间窗口内发出的 IO 写指令按中枢 (agt) 分组，每组合并为一次 EpBatchSet
+调用。EpBatchSet 只能设置同一个中枢下的设备，因此跨中枢的指令在窗口结束时
+并行发出，每个中枢一次请求。每个调用方仍然得到只属于自己的结果。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from ..const import DEVICE_ID_KEY, SUBDEVICE_INDEX_KEY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _io_key(item: dict) -> tuple:
+    """IO 条目的 (设备 ID, IO 索引)，用于将失败条目对应到调用方。"""
+    return item.get(DEVICE_ID_KEY), item.get(SUBDEVICE_INDEX_KEY)
+
+
+@dataclass
+class CommandBatchStats:
+    """批处理器的统计数据。"""
+
+    commands: int = 0
+    items: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+
+    @property
+    def commands_per_batch(self) -> float:
+        """平均每次请求合并的指令数。"""
+        return self.commands / self.batches if self.batches else 0.0
+
+
+class LifeSmartCommandBatcher:
+    """按中枢合并短时间窗口内的 IO 写指令。
+
+    某个中枢的第一条指令到达时开启一个 `window` 秒的窗口，窗口结束或条目数
+    达到 `MAX_ITEMS` 时，该中枢的全部条目按到达顺序交给 `send_batch` 一次发出。
+    `send_batch(agt, items)` 返回服务器报告失败的条目 (EpBatchSet 的
+    `failedIoitems`)。
+
+    `submit()` 返回调用方自己的失败条目 (按 me/idx 匹配)，全部成功时为空列表；
+    整批请求失败时，该批的所有调用方都收到同一个异常。
+    """
+
+    MAX_ITEMS = 100
+
+    def __init__(
+        self,
+        send_batch: Callable[[str, list[dict]], Awaitable[list[dict]]],
+        window: float,
+    ) -> None:
+        self._send_batch = send_batch
+        self.window = window
+        # agt -> [(调用方的条目, 等待结果的 Future)]
+        self._pending: dict[str, list[tuple[list[dict], asyncio.Future]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = CommandBatchStats()
+
+    async def submit(self, agt: str, items: list[dict]) -> list[dict]:
+        """排入一条指令 (一个或多个 IO 条目) 并等待其所在批次发出。
+
+        Returns:
+            该指令中被服务器报告失败的条目，全部成功时为空列表
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._pending.setdefault(agt, [])
+        queue.append((items, future))
+        self.stats.commands += 1
+        if sum(len(entry[0]) for entry in queue) >= self.MAX_ITEMS:
+            self._flush(agt)
+        elif agt not in self._timers:
+            self._timers[agt] = loop.call_later(self.window, self._flush, agt)
+        return await future
+
+    def _flush(self, agt: str) -> None:
+        """结束该中枢的窗口，在后台发出已排入的条目。"""
+        if timer := self._timers.pop(agt, None):
+            timer.cancel()
+        queue = self._pending.pop(agt, None)
+        if not queue:
+            return
+        task = asyncio.get_running_loop().create_task(self._send(agt, queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(
+        self, agt: str, queue: list[tuple[list[dict], asyncio.Future]]
+    ) -> None:
+        """发出一批条目，并将结果分发给各调用方。"""
+        items = [item for entry in queue for item in entry[0]]
+        self.stats.batches += 1
+        self.stats.items += len(items)
+        _LOGGER.debug(
+            "合并 %d 条指令 (%d 个 IO) 发往中枢 %s", len(queue), len(items), agt
+        )
+        try:
+            failed = await self._send_batch(agt, items)
+        except Exception as e:
+            self.stats.failed_batches += 1
+            for _, future in queue:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        failed_by_io = {_io_key(item): item for item in failed}
+        for entry_items, future in queue:
+            if not future.done():
+                future.set_result(
+                    [
+                        failed_by_io[_io_key(item)]
+                        for item in entry_items
+                        if _io_key(item) in failed_by_io
+                    ]
+                )
+
+    async def async_flush(self) -> None:
+        """立即发出所有排队的条目，并等待所有批次完成。"""
+        for agt in list(self._pending):
+            self._flush(agt)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
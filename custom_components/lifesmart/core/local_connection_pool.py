@@ -0,0 +1,312 @@
+"""LifeSmart 多网关本地连接池。
+
+此模块包含 LifeSmartLocalConnectionPool 类，在一个 Hub 下同时维护多个本地网关
+的 TCP 连接。所有连接共享同一个协议 (解码) 实例，设备列表按 `(agt, me)`
+合并为一个索引，控制指令按 `agt` 或设备 ID 路由到对应网关的连接。
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from .client_base import LifeSmartClientBase
+from .local_tcp_client import LifeSmartLocalTCPClient
+from .protocol import CONFIG_PROFILE_MINIMAL, LifeSmartProtocol
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_gateway_hosts(text: str, default_port: int) -> list[tuple[str, int]]:
+    """解析以逗号分隔的 `host[:port]` 列表，省略端口时使用 `default_port`。
+
+    IPv6 地址带端口时写作 `[地址]:port`；不带方括号的 IPv6 地址整体视为主机。
+
+    Raises:
+        ValueError: 主机为空、格式错误或端口不是 1-65535 之间的整数
+    """
+    gateways = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item.startswith("["):
+            host, sep, rest = item[1:].partition("]")
+            if not sep or (rest and not rest.startswith(":")):
+                raise ValueError(f"网关地址格式错误: {item}")
+            port = rest[1:] if rest else default_port
+        elif item.count(":") > 1:
+            host, port = item, default_port
+        else:
+            host, sep, port = item.partition(":")
+            if not sep:
+                port = default_port
+        host, port = host.strip(), int(port)
+        if not host:
+            raise ValueError(f"网关地址缺少主机: {item}")
+        if not 0 < port < 65536:
+            raise ValueError(f"网关端口超出范围: {item}")
+        gateways.append((host, port))
+    return gateways
+
+
+class LifeSmartLocalConnectionPool(LifeSmartClientBase):
+    """在一个 Hub 下管理多个本地网关连接的客户端。
+
+    对外表现为一个普通客户端：设备列表为各网关设备的合并结果，带 `agt` 的
+    指令按 `agt` 选择连接，只带设备 ID 的指令按设备所在的网关选择连接。
+    设备 ID 只在一个网关内唯一，多个网关存在同一设备 ID 时，只带设备 ID 的
+    指令无法确定目标网关而被拒绝。每个网关独立登录、重连，一个网关离线不影响
+    其余网关。
+    """
+
+    def __init__(
+        self,
+        gateways: list[tuple[str, int]],
+        username: str,
+        password: str,
+        config_agt=None,
+        await_ack: bool = False,
+        config_profile: str = CONFIG_PROFILE_MINIMAL,
+    ) -> None:
+        if not gateways:
+            raise ValueError("至少需要一个本地网关")
+        self._proto = LifeSmartProtocol()
+        self.clients = [
+            LifeSmartLocalTCPClient(
+                host,
+                port,
+                username,
+                password,
+                config_agt,
+                await_ack=await_ack,
+                proto=self._proto,
+                config_profile=config_profile,
+            )
+            for host, port in gateways
+        ]
+        self._callback: Callable | None = None
+        # 设备列表返回时尚未就绪的网关 -> 等待其首次就绪的任务
+        self._late_watchers: dict[LifeSmartLocalTCPClient, asyncio.Task] = {}
+
+    @property
+    def devices(self) -> dict[tuple[str, str], dict]:
+        """所有网关设备的合并索引 ((agt, 设备 ID) -> 设备数据)。"""
+        return {
+            (device.get("agt", client.node_agt), device_id): device
+            for client in self.clients
+            for device_id, device in client.devices.items()
+        }
+
+    @property
+    def is_connected(self) -> bool:
+        """任一网关处于连接状态时返回 True。"""
+        return any(client.is_connected for client in self.clients)
+
+    def gateway_health(self) -> list[dict[str, Any]]:
+        """返回每个网关的连接状态。"""
+        return [
+            {
+                "host": client.host,
+                "port": client.port,
+                "agt": client.node_agt,
+                "connected": client.is_connected,
+                "ready": client.device_ready.is_set(),
+                "devices": len(client.devices),
+                "send_queue_depth": client.send_queue_stats["depth"],
+                "keepalive_rtt": client.keepalive_rtt,
+                "receive_queue_depth": client.receive_queue_stats["depth"],
+            }
+            for client in self.clients
+        ]
+
+    def set_exclude_filter(
+        self, exclude_devices: set[str], exclude_hubs: set[str]
+    ) -> None:
+        """为所有网关设置排除的设备与中枢。"""
+        for client in self.clients:
+            client.set_exclude_filter(exclude_devices, exclude_hubs)
+
+    async def async_connect(self, callback: None | Callable):
+        """并行运行所有网关的连接循环，直到全部结束或任务被取消。"""
+        self._callback = callback
+        await asyncio.gather(
+            *(client.async_connect(callback) for client in self.clients)
+        )
+
+    def disconnect(self):
+        """断开所有网关的连接。"""
+        for task in self._late_watchers.values():
+            task.cancel()
+        self._late_watchers.clear()
+        for client in self.clients:
+            client.disconnect()
+
+    def _watch_late_gateway(self, client: LifeSmartLocalTCPClient) -> None:
+        """等待未就绪的网关首次就绪，每个网关只等待一次。"""
+        if client not in self._late_watchers:
+            self._late_watchers[client] = asyncio.create_task(
+                self._async_reload_when_ready(client)
+            )
+
+    async def _async_reload_when_ready(self, client: LifeSmartLocalTCPClient) -> None:
+        """网关在设备列表返回后才就绪时请求 Hub 重新加载，为其设备创建实体。"""
+        await client.device_ready.wait()
+        _LOGGER.info(
+            "本地网关 %s:%s 在设备列表返回后就绪，将触发重新加载。",
+            client.host,
+            client.port,
+        )
+        if self._callback and callable(self._callback):
+            await client._emit_reload(self._callback)
+
+    def _client_for_agt(self, agt: str) -> LifeSmartLocalTCPClient | None:
+        """返回 `agt` 对应网关的连接，未知时记录错误并返回 None。"""
+        for client in self.clients:
+            if client.node_agt == agt:
+                return client
+        _LOGGER.error("没有与中枢 %s 对应的本地连接，无法发送指令。", agt)
+        return None
+
+    def _client_for_device(self, device_id: str) -> LifeSmartLocalTCPClient | None:
+        """返回设备所在网关的连接。
+
+        设备未知，或多个网关存在同一设备 ID 而无法确定目标时，记录错误并返回
+        None，不会把指令发往错误的网关。
+        """
+        matches = [client for client in self.clients if device_id in client.devices]
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            _LOGGER.error(
+                "设备 %s 同时存在于中枢 %s，无法确定目标网关，指令未发送。",
+                device_id,
+                ", ".join(client.node_agt for client in matches),
+            )
+        else:
+            _LOGGER.error(
+                "设备 %s 不属于任何已连接的本地网关，无法发送指令。", device_id
+            )
+        return None
+
+    # ====================================================================
+    # 基类抽象方法的实现：按 agt 或设备 ID 转发到对应网关
+    # ====================================================================
+    async def _async_get_all_devices(self, timeout=10) -> list[dict[str, Any]]:
+        """
+        [连接池实现] 等待各网关加载设备，返回已就绪网关的设备合并列表。
+
+        各网关并行等待设备加载，`timeout` 是每个网关的最长等待时间。超时未就绪
+        的网关会被记录，并在其首次就绪时请求 Hub 重新加载，为其设备创建实体。
+        """
+        await asyncio.gather(
+            *(client._async_get_all_devices(timeout) for client in self.clients)
+        )
+        devices = []
+        for client in self.clients:
+            if client.device_ready.is_set():
+                devices.extend(client.devices.values())
+            else:
+                _LOGGER.warning(
+                    "本地网关 %s:%s 未在 %ss 内就绪。",
+                    client.host,
+                    client.port,
+                    timeout,
+                )
+                self._watch_late_gateway(client)
+        return devices
+
+    async def _async_send_single_command(
+        self, agt: str, me: str, idx: str, command_type: int, val: Any
+    ) -> int:
+        if client := self._client_for_agt(agt):
+            return await client._async_send_single_command(
+                agt, me, idx, command_type, val
+            )
+        return -1
+
+    async def _async_send_multi_command(
+        self, agt: str, me: str, io_list: list[dict]
+    ) -> int:
+        if client := self._client_for_agt(agt):
+            return await client._async_send_multi_command(agt, me, io_list)
+        return -1
+
+    async def _async_set_scene(self, agt: str, scene_name: str) -> int:
+        if client := self._client_for_agt(agt):
+            return await client._async_set_scene(agt, scene_name)
+        return -1
+
+    async def _async_send_ir_key(
+        self,
+        agt: str,
+        me: str,
+        category: str,
+        brand: str,
+        keys: str,
+        ai: str = "",
+        idx: str = "",
+    ) -> int:
+        if client := self._client_for_agt(agt):
+            return await client._async_send_ir_key(
+                agt, me, category, brand, keys, ai, idx
+            )
+        return -1
+
+    async def _async_add_scene(self, agt: str, scene_name: str, actions: str) -> int:
+        if client := self._client_for_agt(agt):
+            return await client._async_add_scene(agt, scene_name, actions)
+        return -1
+
+    async def _async_delete_scene(self, agt: str, scene_name: str) -> int:
+        if client := self._client_for_agt(agt):
+            return await client._async_delete_scene(agt, scene_name)
+        return -1
+
+    async def _async_get_scene_list(self, agt: str) -> list[dict[str, Any]]:
+        return await self.clients[0]._async_get_scene_list(agt)
+
+    async def _async_get_room_list(self, agt: str) -> list[dict[str, Any]]:
+        return await self.clients[0]._async_get_room_list(agt)
+
+    async def _async_get_hub_list(self) -> list[dict[str, Any]]:
+        hubs = []
+        for client in self.clients:
+            hubs.extend(await client._async_get_hub_list())
+        return hubs
+
+    async def _async_change_device_icon(self, device_id: str, icon: str) -> int:
+        if client := self._client_for_device(device_id):
+            return await client._async_change_device_icon(device_id, icon)
+        return -1
+
+    async def _async_set_device_eeprom(
+        self, device_id: str, key: str, value: Any
+    ) -> int:
+        if client := self._client_for_device(device_id):
+            return await client._async_set_device_eeprom(device_id, key, value)
+        return -1
+
+    async def _async_add_device_timer(
+        self, device_id: str, cron_info: str, key: str
+    ) -> int:
+        if client := self._client_for_device(device_id):
+            return await client._async_add_device_timer(device_id, cron_info, key)
+        return -1
+
+    async def _async_ir_control(self, device_id: str, options: dict) -> int:
+        if client := self._client_for_device(device_id):
+            return await client._async_ir_control(device_id, options)
+        return -1
+
+    async def _async_send_ir_code(self, device_id: str, ir_data: list | bytes) -> int:
+        if client := self._client_for_device(device_id):
+            return await client._async_send_ir_code(device_id, ir_data)
+        return -1
+
+    async def _async_ir_raw_control(self, device_id: str, raw_data: str) -> int:
+        if client := self._client_for_device(device_id):
+            return await client._async_ir_raw_control(device_id, raw_data)
+        return -1
+
+    async def _async_get_ir_remote_list(self, agt: str) -> dict[str, Any]:
+        return await self.clients[0]._async_get_ir_remote_list(agt)
@@ -7,21 +7,95 @@
 
 import asyncio
 import logging
-from typing import Callable, Any
+import random
+import socket
+import time
+from collections import ChainMap
+from dataclasses import asdict
+from functools import partial
+from types import MappingProxyType
+from typing import AsyncIterator, Callable, Any, Mapping
 
 from .client_base import LifeSmartClientBase
-from .protocol import LifeSmartPacketFactory, LifeSmartProtocol
-from ..helpers import safe_get, normalize_device_names
+from .protocol import (
+    CONFIG_PROFILE_MINIMAL,
+    LifeSmartFrameAssembler,
+    LifeSmartPacketFactory,
+    LifeSmartProtocol,
+)
+from .receive_queue import LifeSmartReceiveQueue
+from .send_scheduler import LifeSmartSendScheduler, SendPriority
+from ..helpers import generate_unique_id, safe_get, normalize_device_names
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class _SchgRoute:
+    """一个 `_schg` 路径对应的设备记录、子设备键与 unique_id。
+
+    `view()` 返回消息头 (me/idx/agt/devtype) 与该 IO 共享状态的只读视图，
+    推送只需原地更新 `state()`，分发时不再复制整个子设备数据。
+    """
+
+    __slots__ = (
+        "dev_id",
+        "sub_key",
+        "device",
+        "unique_id",
+        "_header",
+        "_state",
+        "_view",
+    )
+
+    def __init__(self, dev_id: str, sub_key: str, device: dict, agt: str) -> None:
+        self.dev_id, self.sub_key, self.device = dev_id, sub_key, device
+        devtype = device.get("devtype", "")
+        self.unique_id = generate_unique_id(devtype, agt, dev_id, sub_key)
+        self._header = {"me": dev_id, "idx": sub_key, "agt": agt, "devtype": devtype}
+        self._state: dict | None = None
+        self._view: Mapping | None = None
+
+    def state(self) -> dict:
+        """设备记录中该 IO 的状态字典，不存在时创建。"""
+        return self.device.setdefault("data", {}).setdefault(self.sub_key, {})
+
+    def view(self) -> Mapping:
+        """与云端推送格式一致的只读 IO 消息，IO 状态字典被替换时才重建。"""
+        state = self.state()
+        if state is not self._state:
+            # ChainMap 的键顺序与覆盖规则与 {**header, **state} 相同
+            self._state = state
+            self._view = MappingProxyType(ChainMap(state, self._header))
+        return self._view
+
+
 class LifeSmartLocalTCPClient(LifeSmartClientBase):
     """LifeSmart 本地客户端，负责与中枢进行 TCP 通信。"""
 
     IDLE_TIMEOUT = 65.0
+    # 等待中枢对指令应答 (ret/err) 的默认超时时间
+    COMMAND_TIMEOUT = 5.0
+    # 重连退避: 首次等待约 RECONNECT_DELAY_MIN 秒，每次失败翻倍，上限 RECONNECT_DELAY_MAX
+    RECONNECT_DELAY_MIN = 1.0
+    RECONNECT_DELAY_MAX = 60.0
+    # 空闲心跳平时只发送轻量保活查询，距上次完整配置超过此间隔时才发送 get-config
+    DRIFT_CHECK_INTERVAL = 30 * 60.0
+    # 心跳发出后等待任何入站数据的时间。失效的连接最多在
+    # IDLE_TIMEOUT + 2 * KEEPALIVE_TIMEOUT 秒内被发现 (保活无数据 -> get-config
+    # 无数据 -> 重连)
+    KEEPALIVE_TIMEOUT = 10.0
 
-    def __init__(self, host, port, username, password, config_agt=None) -> None:
+    def __init__(
+        self,
+        host,
+        port,
+        username,
+        password,
+        config_agt=None,
+        await_ack=False,
+        proto: LifeSmartProtocol | None = None,
+        config_profile: str = CONFIG_PROFILE_MINIMAL,
+    ) -> None:
         self.host, self.port, self.username, self.password, self.config_agt = (
             host,
             port,
@@ -31,13 +105,73 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
         )
         self.reader: asyncio.StreamReader | None = None
         self.writer: asyncio.StreamWriter | None = None
-        self._proto = LifeSmartProtocol()
+        # 多网关连接池中的客户端共享同一个协议 (解码) 实例
+        self._proto = proto or LifeSmartProtocol()
+        self._assembler = LifeSmartFrameAssembler(
+            self._proto, schg_filter=self._accept_schg_path
+        )
         self._factory: LifeSmartPacketFactory = LifeSmartPacketFactory("", "")
+        # get-config 的端点字段投影方案，见 CONFIG_PROFILE_FIELDS
+        self.config_profile = config_profile
         self.disconnected = False
         self.device_ready = asyncio.Event()
         self.devices, self.node, self.node_agt = {}, "", ""
+        # 当前 get-config 应答中已提前构建的设备记录，以及等待这些记录的枚举队列
+        self._streamed: dict[str, dict] = {}
+        self._device_streams: set[asyncio.Queue] = set()
+        # `_schg` 路由表: 路径 -> _SchgRoute，加载设备时预先构建，推送只需一次查找
+        self._routes: dict[str, _SchgRoute] = {}
+        self._io_routes: dict[tuple[str, str], _SchgRoute] = {}
+        self._exclude_devices: set[str] = set()
+        self._exclude_hubs: set[str] = set()
+        # 自上次成功加载设备以来的连续重连次数，用于计算退避时间
+        self._reconnect_attempts = 0
+        # 空闲心跳状态: 在途的保活查询、尚未收到任何数据的保活发出时间、
+        # 最近一次往返时间 (仅由带相同 `_sel` 的应答测得) 与完整配置的时间
+        self._keepalive: asyncio.Future | None = None
+        self._keepalive_sent_at: float | None = None
+        self.keepalive_rtt: float | None = None
+        self._last_full_config = 0.0
+        self._awaiting_config = False
+        # 是否等待中枢对指令的应答；关闭时指令写出即视为成功 (旧行为)
+        self.await_ack = await_ack
+        # 在途指令: _sel 序号 -> 等待应答的 Future
+        self._pending: dict[int, asyncio.Future] = {}
+        # 所有出站数据包经调度器按优先级合并写出
+        self._sender = LifeSmartSendScheduler(lambda: self.writer)
+        # 解码出的设备更新经有界队列由独立任务分发，慢速回调不会阻塞 socket 读取
+        self._updates = LifeSmartReceiveQueue()
         self._connect_task = None
 
+    def set_exclude_filter(
+        self, exclude_devices: set[str], exclude_hubs: set[str]
+    ) -> None:
+        """设置排除的设备与中枢，其 `_schg` 推送在解码阶段即被跳过。"""
+        self._exclude_devices = set(exclude_devices)
+        self._exclude_hubs = set(exclude_hubs)
+
+    @property
+    def send_queue_stats(self) -> dict[str, Any]:
+        """出站发送队列的当前深度、合并写入次数与排队等待时间统计。"""
+        stats = self._sender.stats
+        return {
+            "depth": self._sender.depth,
+            "lanes": self._sender.lane_depths(),
+            **asdict(stats),
+            "avg_wait": stats.avg_wait,
+            "packets_per_write": stats.packets_per_write,
+        }
+
+    @property
+    def receive_queue_stats(self) -> dict[str, Any]:
+        """入站更新队列的当前深度、合并/丢弃数量与分发延迟统计。"""
+        stats = self._updates.stats
+        return {
+            "depth": self._updates.depth,
+            **asdict(stats),
+            "avg_lag": stats.avg_lag,
+        }
+
     @property
     def is_connected(self) -> bool:
         """
@@ -53,6 +187,8 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
         """断开与本地客户端的连接。"""
         _LOGGER.info("请求断开本地客户端连接。")
         self.disconnected = True
+        self._fail_pending("本地客户端已断开")
+        self._sender.close("本地客户端已断开")
         # 只取消任务，让任务自己的 finally 块来处理关闭
         if self._connect_task and not self._connect_task.done():
             self._connect_task.cancel()
@@ -122,6 +258,8 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
         """主连接循环，负责登录、获取设备和监听状态更新。"""
 
         self._connect_task = asyncio.current_task()
+        if callback and callable(callback):
+            self._updates.start(callback)
         while not self.disconnected:
             self.reader, self.writer = None, None
             try:
@@ -130,26 +268,27 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
                     asyncio.open_connection(self.host, self.port), timeout=5
                 )
                 _LOGGER.info("本地连接已建立。")
+                self._enable_tcp_keepalive()
+                self._keepalive, self._awaiting_config = None, False
+                self._keepalive_sent_at = None
                 pkt = LifeSmartPacketFactory("", "").build_login_packet(
                     self.username, self.password
                 )
-                self.writer.write(pkt)
-                await self.writer.drain()
-                response, stage = b"", "login"
+                await self._sender.send(pkt)
+                self._assembler.reset()
+                self._streamed = {}
+                stage = "login"
                 while not self.disconnected:
                     # 为读取操作增加超时，防止无限期阻塞
                     try:
                         buf = await asyncio.wait_for(
-                            self.reader.read(4096), timeout=self.IDLE_TIMEOUT
+                            self.reader.read(4096), timeout=self._read_timeout()
                         )
                     except asyncio.TimeoutError:
                         if stage == "loaded":
                             _LOGGER.debug("连接空闲超时，发送心跳包以维持连接...")
                             try:
-                                # 发送一个无害的 getconfig 包作为心跳检测，看是不是真的断了
-                                pkt = self._factory.build_get_config_packet(self.node)
-                                self.writer.write(pkt)
-                                await self.writer.drain()
+                                await self._send_heartbeat()
                                 continue  # 发送心跳后，继续下一次 read 等待
                             except Exception as e:
                                 _LOGGER.warning("发送心跳包失败，连接可能已断开: %s", e)
@@ -166,171 +305,7 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
                             "Socket 连接被对方关闭 (在 '%s' 阶段)，将进行重连。", stage
                         )
                         break
-                    # _LOGGER.debug(
-                    #     "收到本地 %d 字节原始数据 <- : %s", len(buf), buf.hex(" ")
-                    # )
-                    response += buf
-                    # _LOGGER.debug(
-                    #     "当前响应缓冲区 (总长度 %d): %s",
-                    #     len(response),
-                    #     response.hex(" "),
-                    # )
-                    while response:
-                        try:
-                            _LOGGER.debug("尝试解码缓冲区数据...")
-                            remaining_response, decoded = self._proto.decode(response)
-                            if decoded is None:
-                                _LOGGER.error(
-                                    "解码器返回了 None，但未抛出异常。可能存在未知错误。清空缓冲区。"
-                                )
-                                response = b""
-                                break
-
-                            # _LOGGER.debug(
-                            #     "🔑解码成功，解析出的结构: \n%s", pformat(decoded)
-                            # )
-                            response = remaining_response
-                            _LOGGER.debug(
-                                "解码后剩余数据 (长度 %d): %s",
-                                len(response),
-                                response.hex(" ") if response else "无",
-                            )
-
-                            if stage == "login":
-
-                                if safe_get(decoded, 1, "ret") is None:
-                                    _LOGGER.error(
-                                        "本地登录失败 -> %s",
-                                        safe_get(decoded, 1, "err", "未知登录错误"),
-                                    )
-                                    self.disconnected = True
-                                    continue
-                                node_info = safe_get(decoded, 1, "ret", 4)
-                                if not node_info:
-                                    _LOGGER.error("登录响应缺少 node 信息")
-                                    break
-                                self.node = safe_get(node_info, "base", 1, default="")
-                                self.node_agt = safe_get(
-                                    node_info, "agt", 1, default=""
-                                )
-                                _LOGGER.info(
-                                    "本地登录成功，Node: %s, Agt: %s",
-                                    self.node,
-                                    self.node_agt,
-                                )
-                                self._factory.node = self.node
-                                self._factory.node_agt = self.node_agt
-                                stage = "loading"
-                                pkt = self._factory.build_get_config_packet(self.node)
-                                self.writer.write(pkt)
-                                await self.writer.drain()
-                            elif stage == "loading":
-                                eps = safe_get(decoded, 1, "ret", 1, "eps", default={})
-                                self.devices = {}
-                                for devid, dev in eps.items():
-                                    dev = normalize_device_names(dev)
-                                    cls_value = safe_get(dev, "cls", default="")
-                                    dev_meta = {
-                                        "me": devid,
-                                        "devtype": (
-                                            cls_value[:-3]
-                                            if len(cls_value) >= 3
-                                            and cls_value[-3:-1] == "_V"
-                                            else cls_value
-                                        ),
-                                        "agt": self.node_agt,
-                                        "name": dev["name"],
-                                        "data": safe_get(
-                                            dev, "_chd", "m", "_chd", default={}
-                                        ),
-                                    }
-                                    dev_meta.update(dev)
-                                    if "_chd" in dev_meta:
-                                        del dev_meta["_chd"]
-                                    self.devices[devid] = dev_meta
-                                _LOGGER.info(
-                                    "成功加载 %d 个本地设备。", len(self.devices)
-                                )
-                                self.device_ready.set()  # 通知 get_all_device_async 可以返回了
-                                stage = "loaded"
-                            else:  # 实时状态推送
-                                if schg := safe_get(decoded, 1, "_schg"):
-                                    _LOGGER.debug(
-                                        "收到本地状态更新 (_schg) <- : %s", schg
-                                    )
-                                    for schg_key, schg_data in schg.items():
-                                        if not isinstance(schg_key, str):
-                                            continue
-                                        parts = schg_key.split("/")
-
-                                        # 6段路径: agt/me/ep/devid/m/idx
-                                        # 5段路径 (兼容旧格式): agt/ep/devid/m/idx
-
-                                        dev_id, sub_key = None, None
-
-                                        if (
-                                            len(parts) == 6
-                                            and parts[1] == "me"
-                                            and parts[2] == "ep"
-                                            and parts[4] == "m"
-                                        ):
-                                            dev_id, sub_key = parts[3], parts[5]
-                                        elif (
-                                            len(parts) == 5
-                                            and parts[1] == "ep"
-                                            and parts[3] == "m"
-                                        ):
-                                            dev_id, sub_key = parts[2], parts[4]
-
-                                        if (
-                                            dev_id
-                                            and sub_key
-                                            and dev_id in self.devices
-                                        ):
-                                            device_data = self.devices[
-                                                dev_id
-                                            ].setdefault("data", {})
-                                            sub_device_data = device_data.setdefault(
-                                                sub_key, {}
-                                            )
-                                            sub_device_data.update(
-                                                schg_data.get("chg", {})
-                                            )
-
-                                            if callback and callable(callback):
-                                                msg = {
-                                                    "me": dev_id,
-                                                    "idx": sub_key,
-                                                    "agt": self.node_agt,
-                                                    "devtype": self.devices[dev_id][
-                                                        "devtype"
-                                                    ],
-                                                    **sub_device_data,
-                                                }
-                                                # 构造一个与云端推送格式完全一致的字典
-                                                # 以便 data_update_handler 可以统一处理
-                                                await callback(
-                                                    {"type": "io", "msg": msg}
-                                                )
-                                elif safe_get(decoded, 1, "_sdel"):
-                                    _LOGGER.warning(
-                                        "检测到设备被删除，将触发重新加载: %s",
-                                        safe_get(decoded, 1, "_sdel"),
-                                    )
-                                    if callback and callable(callback):
-                                        await callback({"reload": True})
-                        except EOFError:
-                            _LOGGER.debug(
-                                "捕获到 EOFError，数据包不完整，等待更多数据..."
-                            )
-                            break  # 跳出内层 while response 循环，去外层循环读取更多数据
-                        except Exception as e:
-                            _LOGGER.error(
-                                "处理数据时发生意外错误: %s", e, exc_info=True
-                            )
-                            response = b""  # 清空缓冲区以避免死循环
-                            break  # 出现意外错误，中断内部循环以重连
-
+                    stage = await self._dispatch_frames(buf, stage, callback)
             except (
                 ConnectionResetError,
                 asyncio.TimeoutError,
@@ -347,6 +322,8 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
             except Exception as e:
                 _LOGGER.error("本地连接主循环发生未知异常: %s", e, exc_info=True)
             finally:
+                self._fail_pending("本地连接已断开")
+                self._sender.close("本地连接已断开")
                 if self.writer:
                     try:
                         self.writer.close()
@@ -357,15 +334,467 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
                         _LOGGER.warning("关闭 writer 时发生未知错误: %s", e)
                     self.writer = None
                 if not self.disconnected:
-                    await asyncio.sleep(5.0)
+                    await asyncio.sleep(self._next_reconnect_delay())
+        self._updates.stop()
 
-    async def _send_packet(self, packet: bytes):
-        if self.writer and not self.writer.is_closing():
-            self.writer.write(packet)
-            await self.writer.drain()
+    def _enable_tcp_keepalive(self) -> None:
+        """在 socket 上启用 TCP keepalive，由内核探测无应答的对端。"""
+        sock = self.writer.get_extra_info("socket") if self.writer else None
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in (
+                ("TCP_KEEPIDLE", int(self.IDLE_TIMEOUT)),
+                ("TCP_KEEPINTVL", 10),
+                ("TCP_KEEPCNT", 3),
+            ):
+                if hasattr(socket, option):
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        except OSError as e:
+            _LOGGER.debug("无法启用 TCP keepalive: %s", e)
+
+    def _read_timeout(self) -> float:
+        """返回下一次 socket 读取的超时时间。
+
+        心跳发出后尚未收到任何数据时只等待 KEEPALIVE_TIMEOUT，其余时候等待
+        IDLE_TIMEOUT。
+        """
+        if self._keepalive_sent_at is not None or self._awaiting_config:
+            return self.KEEPALIVE_TIMEOUT
+        return self.IDLE_TIMEOUT
+
+    async def _send_heartbeat(self) -> None:
+        """连接空闲时发送心跳。
+
+        平时发送轻量的保活查询。查询发出后收到的任何帧都证明连接存活 (见
+        `_handle_frame`)，不要求中枢原样返回 `_sel`；只有带相同 `_sel` 的应答
+        才会记录为 `keepalive_rtt`。保活查询之后 KEEPALIVE_TIMEOUT 秒内没有
+        收到任何帧，或距上次完整配置已超过 DRIFT_CHECK_INTERVAL 时，改为发送
+        get-config，其应答按重连后的增量同步处理。get-config 在 KEEPALIVE_TIMEOUT
+        秒内仍没有任何数据时抛出 ConnectionError，由主循环重连。
+        """
+        if self._awaiting_config:
+            raise ConnectionError("get-config 心跳未得到应答")
+        keepalive_failed = self._keepalive_sent_at is not None
+        if keepalive_failed:
+            _LOGGER.warning("保活查询后未收到任何数据，改为请求完整的设备配置。")
+        if self._keepalive is not None and not self._keepalive.done():
+            self._keepalive.cancel()
+        self._keepalive, self._keepalive_sent_at = None, None
+
+        if (
+            keepalive_failed
+            or time.monotonic() - self._last_full_config >= self.DRIFT_CHECK_INTERVAL
+        ):
+            self._awaiting_config = True
+            pkt = self._factory.build_get_config_packet(self.node, self.config_profile)
+            await self._sender.send(pkt, SendPriority.BACKGROUND)
+            return
+
+        pkt = self._factory.build_keepalive_packet(self.node)
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(
+            partial(self._on_keepalive_reply, sel=pkt.sel, sent_at=time.monotonic())
+        )
+        self._pending[pkt.sel] = self._keepalive = future
+        self._keepalive_sent_at = time.monotonic()
+        await self._sender.send(pkt, SendPriority.BACKGROUND)
+
+    def _on_keepalive_reply(
+        self, future: asyncio.Future, sel: int, sent_at: float
+    ) -> None:
+        """保活查询完成 (应答、失败或取消) 时清理登记，得到应答时记录往返时间。"""
+        if self._pending.get(sel) is future:
+            del self._pending[sel]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.keepalive_rtt = time.monotonic() - sent_at
+        _LOGGER.debug("保活查询往返时间: %.1f ms", self.keepalive_rtt * 1000)
+
+    def _next_reconnect_delay(self) -> float:
+        """返回下一次重连前的等待时间 (指数退避，带随机抖动)。
+
+        等待时间在 [d/2, d] 之间随机取值，d 从 RECONNECT_DELAY_MIN 开始每次翻倍，
+        不超过 RECONNECT_DELAY_MAX。随机抖动避免多个网关或多个 HA 实例在网络
+        恢复后同时重连。成功加载设备后计数清零。
+        """
+        delay = min(
+            self.RECONNECT_DELAY_MAX,
+            self.RECONNECT_DELAY_MIN * 2**self._reconnect_attempts,
+        )
+        self._reconnect_attempts += 1
+        return random.uniform(delay / 2, delay)
+
+    async def _dispatch_frames(self, data: bytes, stage: str, callback) -> str:
+        """解析并处理缓冲区中所有已完整到达的帧，返回处理后的连接阶段。
+
+        单个帧解码或处理失败时只丢弃该帧 (组装器已将其移出缓冲区)，其后已到达
+        的帧继续处理，而不必等到下一次 socket 读取。
+        """
+        while not self.disconnected:
+            try:
+                for decoded in self._assembler.feed(data):
+                    stage = await self._handle_frame(stage, decoded, callback)
+                    if self.disconnected:
+                        break
+                return stage
+            except Exception as e:
+                _LOGGER.error("处理数据时发生意外错误: %s", e, exc_info=True)
+                data = b""
+        return stage
+
+    async def _handle_frame(self, stage: str, decoded: list, callback) -> str:
+        """按连接阶段处理单个帧，返回处理后的阶段。"""
+        if stage == "login":
+            return "loading" if await self._handle_login_response(decoded) else stage
+        if stage == "loading":
+            if not isinstance(safe_get(decoded, 1, "ret", 1, "eps"), dict):
+                # 在 get-config 应答之前到达的其他帧 (推送、其他应答) 不是设备列表
+                _LOGGER.debug("等待设备配置时收到其他帧，已忽略: %s", decoded)
+                return stage
+            previous = self._load_devices(decoded)
+            if previous is not None:
+                await self._dispatch_resync(previous, callback)
+            return "loaded"
+        # 保活查询之后收到的任何帧都证明连接仍然存活
+        self._keepalive_sent_at = None
+        if self._resolve_response(decoded):
+            return stage
+        if isinstance(safe_get(decoded, 1, "ret", 1, "eps"), dict):
+            # 心跳触发的 get-config 应答，按增量同步处理
+            if (previous := self._load_devices(decoded)) is not None:
+                await self._dispatch_resync(previous, callback)
+            return stage
+        await self._handle_push_frame(decoded, callback)  # 其余均为实时推送
+        return stage
+
+    async def _handle_login_response(self, decoded: list) -> bool:
+        """处理登录响应帧，成功后请求设备配置。
+
+        Returns:
+            登录成功并已发送 get-config 请求时返回 True
+        """
+        if safe_get(decoded, 1, "ret") is None:
+            _LOGGER.error(
+                "本地登录失败 -> %s",
+                safe_get(decoded, 1, "err", "未知登录错误"),
+            )
+            self.disconnected = True
+            return False
+        node_info = safe_get(decoded, 1, "ret", 4)
+        if not node_info:
+            _LOGGER.error("登录响应缺少 node 信息")
+            return False
+        self.node = safe_get(node_info, "base", 1, default="")
+        self.node_agt = safe_get(node_info, "agt", 1, default="")
+        _LOGGER.info("本地登录成功，Node: %s, Agt: %s", self.node, self.node_agt)
+        self._factory.node = self.node
+        self._factory.node_agt = self.node_agt
+        pkt = self._factory.build_get_config_packet(self.node, self.config_profile)
+        await self._sender.send(pkt)
+        return True
+
+    def _load_devices(self, decoded: list) -> dict[str, dict] | None:
+        """根据 get-config 响应帧重建设备列表。
+
+        应答到达过程中已逐个构建的设备记录 (见 `async_iter_devices`) 直接沿用，
+        不再重复规范化。
+
+        Returns:
+            重连后重新加载时返回之前的设备列表快照，首次加载时返回 None
+        """
+        eps = safe_get(decoded, 1, "ret", 1, "eps", default={})
+        previous = self.devices if self.device_ready.is_set() else None
+        streamed, self._streamed = self._streamed, {}
+        self.devices = {}
+        for devid, dev in eps.items():
+            self.devices[devid] = streamed.get(devid) or self._build_device(devid, dev)
+        self._build_routes()
+        _LOGGER.info("成功加载 %d 个本地设备。", len(self.devices))
+        self._reconnect_attempts = 0
+        self._last_full_config = time.monotonic()
+        self._awaiting_config = False
+        self.device_ready.set()  # 通知 get_all_device_async 可以返回了
+        for stream in self._device_streams:
+            stream.put_nowait(None)  # 通知每个 async_iter_devices 结束
+        self._device_streams.clear()
+        self._assembler.config_listener = None
+        return previous
+
+    def _build_device(self, devid: str, dev: dict) -> dict:
+        """将 get-config 应答中的一个端点转换为设备记录。"""
+        dev = normalize_device_names(dev)
+        cls_value = safe_get(dev, "cls", default="")
+        dev_meta = {
+            "me": devid,
+            "devtype": (
+                cls_value[:-3]
+                if len(cls_value) >= 3 and cls_value[-3:-1] == "_V"
+                else cls_value
+            ),
+            "agt": self.node_agt,
+            "name": dev["name"],
+            "data": safe_get(dev, "_chd", "m", "_chd", default={}),
+        }
+        dev_meta.update(dev)
+        if "_chd" in dev_meta:
+            del dev_meta["_chd"]
+        return dev_meta
+
+    def _on_config_endpoint(self, devid: str, dev: dict) -> None:
+        """get-config 应答中一个端点到齐时构建其设备记录，并交给每个枚举方。"""
+        record = self._streamed[devid] = self._build_device(devid, dev)
+        for stream in self._device_streams:
+            stream.put_nowait(record)
+
+    async def async_iter_devices(self, timeout=10) -> AsyncIterator[dict[str, Any]]:
+        """逐个产出设备记录，不必等待整个 get-config 应答到达并解码。
+
+        设备已加载时直接产出当前设备列表。否则在应答到达过程中，每个端点一旦
+        完整到达就产出其设备记录 (与加载完成后 `devices` 中的对象相同)，应答
+        处理完后结束。`timeout` 是两个设备记录之间的最长等待时间，因此大型
+        安装的总加载时间不受其限制；超时后记录错误并结束。
+
+        每次调用有独立的队列，并发的枚举各自收到全部设备记录与结束标记。
+        最后一个枚举结束 (包括超时或被提前关闭) 时停止扫描应答。
+        """
+        if self.device_ready.is_set():
+            for device in list(self.devices.values()):
+                yield device
+            return
+        stream: asyncio.Queue = asyncio.Queue()
+        # 已到达的端点也要交给本次枚举
+        for record in self._streamed.values():
+            stream.put_nowait(record)
+        self._device_streams.add(stream)
+        self._assembler.config_listener = self._on_config_endpoint
+        yielded = set()
+        try:
+            while True:
+                try:
+                    record = await asyncio.wait_for(stream.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    _LOGGER.error(
+                        "等待本地设备列表超时 (已收到 %d 个设备)。", len(yielded)
+                    )
+                    return
+                if record is None:
+                    break
+                yielded.add(record["me"])
+                yield record
+        finally:
+            self._device_streams.discard(stream)
+            if not self._device_streams:
+                self._assembler.config_listener = None
+        # 应答中未能提前产出的设备 (例如在枚举开始前整帧已到达)
+        for devid, device in list(self.devices.items()):
+            if devid not in yielded:
+                yield device
+
+    async def _dispatch_resync(self, previous: dict[str, dict], callback) -> None:
+        """重连后与之前的快照比较，只分发断线期间发生变化的 IO。
+
+        设备集合发生变化 (有设备被添加或删除) 时与 `_sdel` 推送一样请求重新加载，
+        否则逐个比较每个 IO 的数据，只为值有变化或新出现的 IO 发送更新。
+        """
+        if not (callback and callable(callback)):
+            return
+        if previous.keys() != self.devices.keys():
+            _LOGGER.info(
+                "重连后设备列表发生变化 (新增 %d 个，移除 %d 个)，将触发重新加载。",
+                len(self.devices.keys() - previous.keys()),
+                len(previous.keys() - self.devices.keys()),
+            )
+            await self._emit_reload(callback)
+            return
+        if self.node_agt in self._exclude_hubs:
+            return
+        changed = 0
+        for dev_id, device in self.devices.items():
+            if dev_id in self._exclude_devices:
+                continue
+            old_data = previous[dev_id].get("data", {})
+            for sub_key, io_data in device.get("data", {}).items():
+                if old_data.get(sub_key) != io_data:
+                    changed += 1
+                    await self._emit_io(callback, self._io_route(dev_id, sub_key))
+        _LOGGER.info("重连后增量同步完成，%d 个 IO 在断线期间发生变化。", changed)
+
+    def _build_routes(self) -> None:
+        """为每个已加载的 IO 预先构建 6 段与 5 段 `_schg` 路径的路由。"""
+        self._routes, self._io_routes = {}, {}
+        agt = self.node_agt
+        for dev_id, device in self.devices.items():
+            for sub_key in device.get("data", {}):
+                route = self._io_route(dev_id, sub_key)
+                self._routes[f"{agt}/me/ep/{dev_id}/m/{sub_key}"] = route
+                self._routes[f"{agt}/ep/{dev_id}/m/{sub_key}"] = route
+
+    def _io_route(self, dev_id: str, sub_key: str) -> _SchgRoute:
+        """返回已加载设备某个 IO 的路由，不存在时创建。"""
+        route = self._io_routes.get((dev_id, sub_key))
+        if route is None:
+            route = _SchgRoute(dev_id, sub_key, self.devices[dev_id], self.node_agt)
+            self._io_routes[(dev_id, sub_key)] = route
+        return route
+
+    def _route(self, path: str) -> _SchgRoute | None:
+        """查找 `_schg` 路径的路由。
+
+        路由表未命中 (例如路径中的 agt 与登录时不同，或推送了新的 IO) 时回退到
+        解析路径，已加载设备的结果会被记入路由表。未知设备返回 None。
+        """
+        route = self._routes.get(path)
+        if route is None:
+            dev_id, sub_key = self._parse_schg_path(path)
+            if not (dev_id and sub_key) or dev_id not in self.devices:
+                return None
+            route = self._routes[path] = self._io_route(dev_id, sub_key)
+        return route
+
+    async def _handle_push_frame(self, decoded: list, callback) -> None:
+        """处理设备加载完成后的实时推送帧 (_schg / _sdel)。"""
+        if schg := safe_get(decoded, 1, "_schg"):
+            _LOGGER.debug("收到本地状态更新 (_schg) <- : %s", schg)
+            for schg_key, schg_data in schg.items():
+                if not isinstance(schg_key, str):
+                    continue
+                if (route := self._route(schg_key)) is not None:
+                    route.state().update(schg_data.get("chg", {}))
+
+                    if callback and callable(callback):
+                        await self._emit_io(callback, route)
+        elif safe_get(decoded, 1, "_sdel"):
+            _LOGGER.warning(
+                "检测到设备被删除，将触发重新加载: %s",
+                safe_get(decoded, 1, "_sdel"),
+            )
+            if callback and callable(callback):
+                await self._emit_reload(callback)
+
+    async def _emit_io(self, callback, route: _SchgRoute) -> None:
+        """分发一个 IO 更新。
+
+        消息是该 IO 共享状态的只读视图，并附带预先计算的 unique_id。连接循环
+        运行时放入入站队列 (同一个 IO 的排队更新合并为最新值)，否则直接调用
+        回调。
+        """
+        data = {"type": "io", "msg": route.view(), "unique_id": route.unique_id}
+        if self._updates.running:
+            self._updates.put((self.node_agt, route.dev_id, route.sub_key), data)
+        else:
+            await callback(data)
+
+    async def _emit_reload(self, callback) -> None:
+        """请求 Hub 重新加载；该请求在入站队列已满时也不会被丢弃。"""
+        data = {"reload": True}
+        if self._updates.running:
+            self._updates.put("reload", data, droppable=False)
+        else:
+            await callback(data)
+
+    @staticmethod
+    def _parse_schg_path(path: str) -> tuple[str | None, str | None]:
+        """从 `_schg` 路径中解析出 (设备 ID, 子设备键)，无法识别时返回 (None, None)。"""
+        parts = path.split("/")
+
+        # 6段路径: agt/me/ep/devid/m/idx
+        # 5段路径 (兼容旧格式): agt/ep/devid/m/idx
+        if (
+            len(parts) == 6
+            and parts[1] == "me"
+            and parts[2] == "ep"
+            and parts[4] == "m"
+        ):
+            return parts[3], parts[5]
+        if len(parts) == 5 and parts[1] == "ep" and parts[3] == "m":
+            return parts[2], parts[4]
+        return None, None
+
+    def _accept_schg_path(self, path: str) -> bool:
+        """判断 `_schg` 路径是否需要完整解码。
+
+        只有已加载且未被排除的设备才会被分发，其余路径 (未知设备、被排除的设备
+        或中枢) 的值字节在解码阶段直接跳过。
+        """
+        if self.node_agt in self._exclude_hubs:
+            return False
+        route = self._route(path)
+        return route is not None and route.dev_id not in self._exclude_devices
+
+    async def _send_packet(
+        self,
+        packet: bytes,
+        timeout: float | None = None,
+        priority: SendPriority = SendPriority.INTERACTIVE,
+    ) -> int:
+        """经发送调度器发出指令包；启用 `await_ack` 时等待中枢对该指令的应答。
+
+        包工厂构建的指令包 (`LSCommandPacket`) 带有递增的 `_sel` 序号，中枢在
+        应答帧头部原样返回。这里以该序号登记一个 Future，由读取循环收到对应的
+        ret/err 帧时完成，因此多个指令可以同时在途，各自按 `timeout` 超时。
+        未启用 `await_ack` 或数据包不带序号时，写出后即视为成功。
+
+        Returns:
+            0 表示已发送 (或中枢已确认)；中枢拒绝时返回其错误码；未连接、超时
+            或连接断开时返回 -1
+        """
+        if not self.writer or self.writer.is_closing():
+            _LOGGER.error("本地客户端未连接，无法发送指令。")
+            return -1
+        sel = getattr(packet, "sel", None)
+        if sel is None or not self.await_ack:
+            try:
+                await self._sender.send(packet, priority)
+            except ConnectionError as e:
+                _LOGGER.warning("指令发送失败: %s", e)
+                return -1
             return 0
-        _LOGGER.error("本地客户端未连接，无法发送指令。")
-        return -1
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[sel] = future
+        try:
+            await self._sender.send(packet, priority)
+            response = await asyncio.wait_for(
+                future, self.COMMAND_TIMEOUT if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            _LOGGER.warning("等待指令应答超时 (_sel=%s)", sel)
+            return -1
+        except ConnectionError as e:
+            _LOGGER.warning("指令未得到应答 (_sel=%s): %s", sel, e)
+            return -1
+        finally:
+            if self._pending.get(sel) is future:
+                del self._pending[sel]
+
+        if err := response.get("err"):
+            _LOGGER.warning("中枢拒绝了指令 (_sel=%s) -> %s", sel, err)
+            return err if isinstance(err, int) else -1
+        return 0
+
+    def _resolve_response(self, decoded: list) -> bool:
+        """若帧是某个在途指令的应答，则完成对应的 Future 并返回 True。"""
+        header = safe_get(decoded, 0)
+        body = safe_get(decoded, 1)
+        if not isinstance(header, dict) or not isinstance(body, dict):
+            return False
+        if "ret" not in body and "err" not in body:
+            return False
+        sel = header.get("_sel", header.get("sn"))
+        future = self._pending.get(sel) if isinstance(sel, int) else None
+        if future is None or future.done():
+            return False
+        future.set_result(body)
+        return True
+
+    def _fail_pending(self, reason: str) -> None:
+        """连接断开时让所有在途指令立即失败，而不是等到各自超时。"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(reason))
+        self._pending.clear()
 
     # ====================================================================
     # 基类抽象方法的实现
@@ -376,6 +805,8 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
 
         此方法不直接发送请求，而是等待后台的 `async_connect` 任务
         在成功加载设备（该过程会发送 get_config 包）后设置一个 `device_ready` 事件。
+        需要在应答到达过程中逐个取得设备的调用方使用 `async_iter_devices`，
+        只有该路径会启用端点扫描。
         """
         try:
             _LOGGER.debug("等待本地设备列表就绪 (超时: %ds)...", timeout)
@@ -576,17 +1007,17 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
     async def change_icon_async(self, devid: str, icon: str) -> int:
         """修改设备图标。"""
         pkt = self._factory.build_change_icon_packet(devid, icon)
-        return await self._send_packet(pkt)
+        return await self._send_packet(pkt, priority=SendPriority.BULK)
 
     async def add_scene_async(self, scene_name: str, cmdlist: str) -> int:
         """添加一个场景。"""
         pkt = self._factory.build_add_scene_packet(scene_name, cmdlist)
-        return await self._send_packet(pkt)
+        return await self._send_packet(pkt, priority=SendPriority.BULK)
 
     async def delete_scene_async(self, scene_name: str) -> int:
         """删除一个场景。"""
         pkt = self._factory.build_delete_scene_packet(scene_name)
-        return await self._send_packet(pkt)
+        return await self._send_packet(pkt, priority=SendPriority.BULK)
 
     async def ir_control_async(self, devid: str, opt: dict) -> int:
         """通过运行AI场景来控制红外设备。"""
@@ -611,9 +1042,9 @@ class LifeSmartLocalTCPClient(LifeSmartClientBase):
     async def set_eeprom_async(self, devid: str, key: str, val: Any) -> int:
         """设置设备的EEPROM。"""
         pkt = self._factory.build_set_eeprom_packet(devid, key, val)
-        return await self._send_packet(pkt)
+        return await self._send_packet(pkt, priority=SendPriority.BULK)
 
     async def add_timer_async(self, devid: str, croninfo: str, key: str) -> int:
         """为设备添加一个定时器。"""
         pkt = self._factory.build_add_timer_packet(devid, croninfo, key)
-        return await self._send_packet(pkt)
+        return await self._send_packet(pkt, priority=SendPriority.BULK)
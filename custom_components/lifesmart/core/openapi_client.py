@@ -5,13 +5,21 @@
 提供了一套清晰、易于使用的异步方法来控制设备。
 """
 
+import asyncio
 import hashlib
 import json
 import logging
+import random
 import time
-from typing import Any, Optional
-
-from aiohttp.client_exceptions import ClientError
+from dataclasses import asdict
+from functools import partial
+from typing import Any, Callable, Optional
+
+from aiohttp.client_exceptions import (
+    ClientConnectorError,
+    ClientError,
+    ClientResponseError,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
@@ -21,13 +29,25 @@ from ..const import (
     DEVICE_ID_KEY,
     SUBDEVICE_INDEX_KEY,
 )
+from .circuit_breaker import LifeSmartCircuitBreaker
 from .client_base import LifeSmartClientBase
-from ..diagnostics import get_error_advice
+from .cloud_rate_limiter import CloudPriority, LifeSmartCloudRateLimiter
+from .command_batcher import LifeSmartCommandBatcher
+from ..diagnostics import get_error_advice, is_retryable_error
 from ..exceptions import LifeSmartAPIError, LifeSmartAuthError
+from ..ir_catalog_cache import get_ir_catalog_cache
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _retry_after(error: ClientResponseError) -> Optional[float]:
+    """读取 HTTP 429 响应中的 Retry-After 秒数，缺失或无法解析时返回 None。"""
+    try:
+        return float(error.headers["Retry-After"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
 class LifeSmartOAPIClient(LifeSmartClientBase):
     """一个用于高效、健壮地管理 LifeSmart API 调用的类。
 
@@ -42,8 +62,56 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
         _usertoken (str): 用户 UserToken。
         _userid (str): 用户 UserID。
         _apppassword (Optional[str]): App 用户密码（仅用于登录获取令牌）。
+        _batcher (Optional[LifeSmartCommandBatcher]): IO 写指令的微批处理器，
+            仅在 `batch_window` 大于 0 时启用。
+        _rate_limiter (LifeSmartCloudRateLimiter): 所有云端请求共用的限流器。
+        _breakers (dict[str, LifeSmartCircuitBreaker]): 按 API 路径划分的熔断器。
     """
 
+    # Hub 使用的 EpBatchSet 合并窗口 (秒)
+    COMMAND_BATCH_WINDOW = 0.05
+
+    # 只读方法：并发的相同调用 (方法与参数均相同) 共享一次 HTTP 请求及其结果
+    COALESCED_METHODS = frozenset({"EpGetAll", "SceneGet", "RoomGet", "EpGet"})
+
+    # 进行中的只读请求。在类级别共享，使同一账号的多个客户端实例
+    # (例如配置流程验证时创建的临时客户端) 之间也能合并。
+    _inflight_reads: dict[tuple, asyncio.Task] = {}
+
+    # 云端限流：每秒补充的令牌数、突发容量、并发请求上限与排队上限
+    RATE_LIMIT = 5.0
+    RATE_BURST = 10
+    MAX_CONCURRENT_REQUESTS = 4
+    MAX_QUEUED_REQUESTS = 200
+
+    # 后台刷新类的只读方法，在限流队列中排在用户指令与红外请求之后
+    BACKGROUND_METHODS = frozenset(
+        {"AgtGetList", "AgtGet", "EpGetAll", "EpGet", "SceneGet", "RoomGet"}
+    )
+
+    # 幂等方法：出现暂时性故障时可以安全地重试。其他方法 (设置 IO、发送红外、
+    # 触发场景等) 重复执行会产生副作用，只在连接未能建立时重试。
+    IDEMPOTENT_METHODS = BACKGROUND_METHODS | frozenset(
+        {
+            "GetRemoteList",
+            "GetCategory",
+            "GetBrands",
+            "GetRemoteIdxs",
+            "GetCodes",
+            "GetACCodes",
+            "GetCustomKeys",
+            "GetRemoteFeature",
+        }
+    )
+
+    # 暂时性故障的重试：默认重试次数，以及指数退避的初始与最大间隔 (秒)
+    MAX_RETRIES = 2
+    RETRY_BASE_DELAY = 0.5
+    RETRY_MAX_DELAY = 5.0
+
+    # 熔断后用于探测各接口是否恢复的只读方法
+    PROBE_METHODS = {"/api": "AgtGetList", "/irapi": "GetCategory"}
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -53,8 +121,15 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
         usertoken: str,
         userid: str,
         user_password: Optional[str] = None,
+        batch_window: float = 0.0,
+        max_retries: int = MAX_RETRIES,
     ) -> None:
-        """初始化 LifeSmart 客户端。"""
+        """初始化 LifeSmart 客户端。
+
+        `batch_window` 大于 0 时，该时间窗口内的 IO 写指令 (EpSet/EpsSet) 按中枢
+        合并为一次 EpBatchSet 调用。`max_retries` 为暂时性故障的最大重试次数，
+        为 0 时不重试。
+        """
         self.hass = hass
         self._region = region
         self._appkey = appkey
@@ -62,6 +137,21 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
         self._usertoken = usertoken
         self._userid = userid
         self._apppassword = user_password
+        self._batcher: Optional[LifeSmartCommandBatcher] = (
+            LifeSmartCommandBatcher(self.batch_set_async, batch_window)
+            if batch_window > 0
+            else None
+        )
+        self._rate_limiter = LifeSmartCloudRateLimiter(
+            self.RATE_LIMIT,
+            self.RATE_BURST,
+            self.MAX_CONCURRENT_REQUESTS,
+            self.MAX_QUEUED_REQUESTS,
+        )
+        self._max_retries = max_retries
+        self._retries = 0
+        # API 路径 (/api, /irapi) -> 熔断器
+        self._breakers: dict[str, LifeSmartCircuitBreaker] = {}
 
     # ====================================================================
     # 核心 API 调用器
@@ -72,6 +162,10 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
     ) -> dict[str, Any]:
         """一个集中的方法，用于构建、签名和发送 API 请求。
 
+        `COALESCED_METHODS` 中的只读方法在已有相同请求进行中时不会重复发送，
+        而是等待并共享该请求的响应 (或异常)。暂时性故障的重试与熔断见
+        `_async_resilient_request`。
+
         Args:
             method: API 方法名称 (例如 "EpGetAll")。
             params: 请求的参数字典。
@@ -83,6 +177,179 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
         Raises:
             LifeSmartAPIError: 当 API 返回非零错误码时引发。
         """
+        if method not in self.COALESCED_METHODS:
+            return await self._async_resilient_request(method, params, api_path)
+
+        key = (
+            self._region,
+            self._appkey,
+            self._userid,
+            self._usertoken,
+            api_path,
+            method,
+            json.dumps(params or {}, sort_keys=True),
+        )
+        loop = asyncio.get_running_loop()
+        task = self._inflight_reads.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(
+                self._async_resilient_request(method, params, api_path)
+            )
+            self._inflight_reads[key] = task
+            task.add_done_callback(lambda t: self._finish_inflight_read(key, t))
+        else:
+            _LOGGER.debug("合并进行中的 API 请求: %s %s", method, params)
+        # shield: 单个调用方被取消时，不影响共享同一请求的其他调用方
+        return await asyncio.shield(task)
+
+    @classmethod
+    def _finish_inflight_read(cls, key: tuple, task: asyncio.Task) -> None:
+        """只读请求结束后将其移出进行中列表。"""
+        if cls._inflight_reads.get(key) is task:
+            del cls._inflight_reads[key]
+        if not task.cancelled():
+            # 所有调用方都已取消时，避免 "Task exception was never retrieved"
+            task.exception()
+
+    async def _async_resilient_request(
+        self, method: str, params: Optional[dict], api_path: str
+    ) -> dict[str, Any]:
+        """在熔断器保护下发送请求，暂时性故障按需重试。
+
+        幂等方法 (`IDEMPOTENT_METHODS`) 的暂时性故障最多重试 `max_retries` 次；
+        其他方法只在连接未能建立 (请求确定未送达) 时重试。重试间隔为带随机
+        抖动的指数退避。
+
+        Raises:
+            LifeSmartAPIError: 请求失败，或该接口处于熔断状态。
+        """
+        breaker = self._circuit_breaker(api_path)
+        attempt = 0
+        while True:
+            breaker.check()
+            try:
+                response = await self._async_send_api_request(method, params, api_path)
+            except LifeSmartAPIError as e:
+                if not self._is_transient_error(e):
+                    if e.code is not None:
+                        # 云端给出了业务错误码，说明接口本身是健康的
+                        breaker.record_success()
+                    raise
+                breaker.record_failure()
+                retryable = method in self.IDEMPOTENT_METHODS or isinstance(
+                    e.__cause__, ClientConnectorError
+                )
+                if not retryable or attempt >= self._max_retries or breaker.is_open:
+                    raise
+                delay = random.uniform(
+                    0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2**attempt)
+                )
+                attempt += 1
+                self._retries += 1
+                _LOGGER.warning(
+                    "API 调用 '%s' 暂时失败，%.2f 秒后进行第 %d 次重试: %s",
+                    method,
+                    delay,
+                    attempt,
+                    e,
+                )
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            return response
+
+    @staticmethod
+    def _is_transient_error(error: LifeSmartAPIError) -> bool:
+        """判断错误是否是暂时性的：网络故障、HTTP 429/5xx，或可重试分类的错误码。"""
+        cause = error.__cause__
+        if isinstance(cause, ClientResponseError):
+            return cause.status == 429 or cause.status >= 500
+        if isinstance(cause, ClientError):
+            return True
+        return error.code is not None and is_retryable_error(error.code)
+
+    def _circuit_breaker(self, api_path: str) -> LifeSmartCircuitBreaker:
+        """返回 API 路径对应的熔断器，首次使用时创建。"""
+        breaker = self._breakers.get(api_path)
+        if breaker is None:
+            breaker = LifeSmartCircuitBreaker(
+                api_path, partial(self._async_probe, api_path)
+            )
+            self._breakers[api_path] = breaker
+        return breaker
+
+    async def _async_probe(self, api_path: str) -> bool:
+        """发送一次探测请求 (不经过熔断与重试)，判断接口是否已恢复。"""
+        method = self.PROBE_METHODS.get(api_path, "AgtGetList")
+        try:
+            await self._async_send_api_request(method, None, api_path)
+        except LifeSmartAPIError as e:
+            return not self._is_transient_error(e)
+        return True
+
+    @property
+    def resilience_stats(self) -> dict[str, Any]:
+        """重试次数与各接口熔断器的状态统计。"""
+        return {
+            "retries": self._retries,
+            "breakers": {
+                path: {"open": breaker.is_open, **asdict(breaker.stats)}
+                for path, breaker in self._breakers.items()
+            },
+        }
+
+    def disconnect(self) -> None:
+        """停止熔断器的后台探测任务。"""
+        for breaker in self._breakers.values():
+            breaker.cancel()
+
+    @property
+    def rate_limit_stats(self) -> dict[str, Any]:
+        """云端限流器的排队深度、排队等待时间与拒绝次数统计。"""
+        limiter = self._rate_limiter
+        return {
+            "depth": limiter.depth,
+            "active": limiter.active,
+            "lanes": limiter.lane_depths(),
+            **asdict(limiter.stats),
+            "avg_wait": limiter.stats.avg_wait,
+        }
+
+    def _request_priority(self, method: str, api_path: str) -> CloudPriority:
+        """根据 API 方法确定请求在限流队列中的优先级。"""
+        if api_path == "/irapi":
+            return CloudPriority.IR
+        if method in self.BACKGROUND_METHODS:
+            return CloudPriority.BACKGROUND
+        return CloudPriority.COMMAND
+
+    async def _async_send_api_request(
+        self, method: str, params: Optional[dict], api_path: str
+    ) -> dict[str, Any]:
+        """经限流器发送一次 API 请求，并将服务器的限流提示反馈给限流器。
+
+        只有 HTTP 429 (及其 Retry-After) 被视为限流提示；业务错误码 (例如
+        10008 内部错误、10017 数据非法) 只影响当次请求，不会让所有请求退避。
+        签名中包含时间戳，因此在取得许可之后才签名。
+        """
+        limiter = self._rate_limiter
+        async with limiter.slot(self._request_priority(method, api_path)):
+            try:
+                response = await self._async_send_signed_request(
+                    method, params, api_path
+                )
+            except LifeSmartAPIError as e:
+                cause = e.__cause__
+                if isinstance(cause, ClientResponseError) and cause.status == 429:
+                    limiter.report_throttled(_retry_after(cause))
+                raise
+            limiter.report_success()
+            return response
+
+    async def _async_send_signed_request(
+        self, method: str, params: Optional[dict], api_path: str
+    ) -> dict[str, Any]:
+        """签名并发送一次 API 请求，检查响应中的错误码。"""
         url = f"{self._get_api_url()}{api_path}.{method}"
         tick = int(time.time())
         params = params or {}
@@ -329,6 +596,15 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
     async def set_single_ep_async(
         self, agt: str, me: str, idx: str, command_type: int, val: Any
     ) -> int:
+        """设置设备单个IO口的值。(API: EpSet，启用批处理时合并为 EpBatchSet)"""
+        if self._batcher:
+            item = {
+                DEVICE_ID_KEY: me,
+                SUBDEVICE_INDEX_KEY: idx,
+                "type": command_type,
+                "val": val,
+            }
+            return await self._async_batch_command(agt, [item])
         params = {
             HUB_ID_KEY: agt,
             DEVICE_ID_KEY: me,
@@ -352,11 +628,47 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
                      例如: [{"idx": "DYN", "type": "0xff", "val": 123},
                             {"idx": "RGBW", "type": "0x81", "val": 1}]
         """
+        if self._batcher:
+            items = [{DEVICE_ID_KEY: me, **io} for io in io_list]
+            return await self._async_batch_command(agt, items)
         args_str = json.dumps(io_list)
         params = {HUB_ID_KEY: agt, DEVICE_ID_KEY: me, "args": args_str}
         response = await self._async_call_api("EpsSet", params, api_path="/api")
         return self._get_code_from_response(response, "EpsSet")
 
+    async def batch_set_async(self, agt: str, io_items: list[dict]) -> list[dict]:
+        """批量设置同一中枢下多个设备的IO口。(API: EpBatchSet)
+
+        Args:
+            agt: 中枢ID。
+            io_items: IO 条目列表，例如:
+                      [{"me": "2f14", "idx": "L1", "type": 129, "val": 1}, ...]
+
+        Returns:
+            服务器报告设置失败的条目 (`failedIoitems`)，每项带有错误码 `ret`。
+        """
+        params = {HUB_ID_KEY: agt, "ioItems": json.dumps(io_items)}
+        response = await self._async_call_api("EpBatchSet", params, api_path="/api")
+        message = response.get("message")
+        failed = message.get("failedIoitems") if isinstance(message, dict) else None
+        return failed if isinstance(failed, list) else []
+
+    async def _async_batch_command(self, agt: str, items: list[dict]) -> int:
+        """经批处理器发送一条指令，其条目失败时与 EpSet 一样引发异常。"""
+        failed = await self._batcher.submit(agt, items)
+        if not failed:
+            return 0
+        error_code = failed[0].get("ret", -1)
+        desc, advice, category = get_error_advice(error_code)
+        _LOGGER.error(
+            "EpBatchSet 中的指令失败! [错误码: %s] [分类: %s] [描述: %s] [条目: %s]",
+            error_code,
+            category or "未知",
+            desc,
+            failed,
+        )
+        raise LifeSmartAPIError(advice, error_code)
+
     async def get_epget_async(self, agt: str, me: str) -> dict[str, Any]:
         """获取指定设备的详细信息。(API: EpGet)"""
         response = await self._async_call_api(
@@ -380,27 +692,39 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
         message = response.get("message")
         return message if isinstance(message, dict) else {}
 
+    async def _async_get_ir_catalog(
+        self, method: str, params: dict[str, Any], parse: Callable[[Any], Any]
+    ) -> Any:
+        """经红外码库缓存获取目录数据，`parse` 从响应的 message 中提取结果。"""
+
+        async def fetch() -> Any:
+            args = (params,) if params else ()
+            response = await self._async_call_api(method, *args, api_path="/irapi")
+            return parse(response.get("message"))
+
+        return await get_ir_catalog_cache(self.hass).async_get(method, params, fetch)
+
     async def get_ir_categories_async(self) -> list[str]:
-        """获取支持的红外遥控器种类。(API: GetCategory)"""
-        response = await self._async_call_api("GetCategory", api_path="/irapi")
-        message = response.get("message")
-        return message if isinstance(message, list) else []
+        """获取支持的红外遥控器种类。(API: GetCategory，经红外码库缓存)"""
+        return await self._async_get_ir_catalog(
+            "GetCategory", {}, lambda m: m if isinstance(m, list) else []
+        )
 
     async def get_ir_brands_async(self, category: str) -> dict[str, int]:
-        """获取指定种类的红外遥控器品牌列表。(API: GetBrands)"""
-        response = await self._async_call_api(
-            "GetBrands", {"category": category}, api_path="/irapi"
+        """获取指定种类的红外遥控器品牌列表。(API: GetBrands，经红外码库缓存)"""
+        return await self._async_get_ir_catalog(
+            "GetBrands",
+            {"category": category},
+            lambda m: m.get("data", {}) if isinstance(m, dict) else {},
         )
-        message = response.get("message", {})
-        return message.get("data", {}) if isinstance(message, dict) else {}
 
     async def get_ir_remote_indexes_async(self, category: str, brand: str) -> list[str]:
-        """获取指定品牌的遥控器索引列表。(API: GetRemoteIdxs)"""
-        response = await self._async_call_api(
-            "GetRemoteIdxs", {"category": category, "brand": brand}, api_path="/irapi"
+        """获取指定品牌的遥控器索引列表。(API: GetRemoteIdxs，经红外码库缓存)"""
+        return await self._async_get_ir_catalog(
+            "GetRemoteIdxs",
+            {"category": category, "brand": brand},
+            lambda m: m.get("data", []) if isinstance(m, dict) else [],
         )
-        message = response.get("message", {})
-        return message.get("data", []) if isinstance(message, dict) else []
 
     async def get_ir_codes_async(
         self, category: str, brand: str, idx: str, keys: list[str] = None
@@ -467,6 +791,9 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
     ) -> dict[str, Any]:
         """获取遥控器特性。(API: GetRemoteFeature)
 
+        码库遥控器 (idx) 的特性经红外码库缓存；已创建的遥控器 (agt + ai) 的按键
+        可能被用户随时学习或修改，每次都从云端查询。
+
         Args:
             category: 遥控器类别
             brand: 品牌类别，查询已创建遥控器时可为空字符串
@@ -479,13 +806,15 @@ class LifeSmartOAPIClient(LifeSmartClientBase):
         if idx:
             # 查询码库遥控器特性
             params["idx"] = idx
-        elif agt and ai:
-            # 查询已创建遥控器特性
-            params[HUB_ID_KEY] = agt
-            params["ai"] = ai
-        else:
+            return await self._async_get_ir_catalog(
+                "GetRemoteFeature", params, lambda m: m if isinstance(m, dict) else {}
+            )
+        if not (agt and ai):
             raise ValueError("必须提供idx参数或agt+ai参数组合")
 
+        # 查询已创建遥控器特性
+        params[HUB_ID_KEY] = agt
+        params["ai"] = ai
         response = await self._async_call_api(
             "GetRemoteFeature", params, api_path="/irapi"
         )
@@ -5,14 +5,13 @@
 - LifeSmartPacketFactory: 负责构建各种控制指令的数据包。
 """
 
-import gzip
 import json
 import logging
 import struct
+import zlib
 from collections import OrderedDict
 from dataclasses import dataclass
-from io import BytesIO
-from typing import Any
+from typing import Any, Callable, Iterator
 
 from ..const import (
     # --- 核心常量 ---
@@ -21,6 +20,9 @@ from ..const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# 解析栈中“尚未解析出值/键”的占位符 (解析结果本身可能为 None)
+_PENDING = object()
+
 
 @dataclass
 class LSTimestamp:
@@ -46,6 +48,18 @@ class LSTimestamp:
         return self.__str__()
 
 
+class LSCommandPacket(bytes):
+    """携带 `_sel` 序号的指令包。
+
+    可以像普通 bytes 一样写入 socket，发送方通过 `sel` 将中枢的应答与该包对应。
+    """
+
+    def __new__(cls, data: bytes, sel: int):
+        packet = super().__new__(cls, data)
+        packet.sel = sel
+        return packet
+
+
 class LSEncoder(json.JSONEncoder):
     """自定义的 JSON 编码器，用于处理 LifeSmart 特殊数据类型。"""
 
@@ -56,6 +70,61 @@ class LSEncoder(json.JSONEncoder):
         return list(obj) if isinstance(obj, bytes) else super().default(obj)
 
 
+class _GzipInflater:
+    """将 gzip 流解压到按声明长度预分配的缓冲区中，输出总量受上限约束。
+
+    每次最多解压 CHUNK_SIZE 字节再拷入预分配缓冲区，峰值内存约为
+    “声明长度 + 一个分块”，且输出一旦超过上限立即停止。
+    """
+
+    CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, expected: int, limit: int) -> None:
+        if expected > limit:
+            raise ValueError(f"压缩包声明的长度 {expected} 超出上限 {limit}")
+        self._inflater = zlib.decompressobj(wbits=31)
+        self._expected = expected
+        self._limit = limit
+        self.output = bytearray(expected)
+        self.size = 0
+
+    @property
+    def eof(self) -> bool:
+        """gzip 流是否已结束。"""
+        return self._inflater.eof
+
+    @property
+    def unused_data(self) -> bytes:
+        """gzip 流结束后多余的输入数据。"""
+        return self._inflater.unused_data
+
+    def feed(self, data) -> None:
+        """送入压缩数据 (任意 bytes-like 对象)，解压出的数据写入 `output`。"""
+        inflater = self._inflater
+        while not inflater.eof:
+            try:
+                chunk = inflater.decompress(data, self.CHUNK_SIZE)
+            except zlib.error as e:
+                raise ValueError(f"解压失败: {str(e)}") from e
+            data = inflater.unconsumed_tail
+            if not chunk and not data:
+                return  # 需要更多输入
+            end = self.size + len(chunk)
+            if end > self._limit:
+                raise ValueError(f"解压后的数据超出上限 {self._limit}")
+            self.output[self.size : end] = chunk
+            self.size = end
+
+    def finish(self) -> bytearray:
+        """返回解压结果；实际长度与声明长度不一致时记录警告。"""
+        if self.size != self._expected:
+            _LOGGER.warning(
+                "解压后尺寸不匹配 (预期 %d, 实际 %d)", self._expected, self.size
+            )
+            del self.output[self.size :]
+        return self.output
+
+
 class LifeSmartProtocol:
     """LifeSmart 二进制协议的编码器和解码器。
 
@@ -98,18 +167,41 @@ class LifeSmartProtocol:
     }
     REVERSE_KEY_MAPPING = {v: k for k, v in KEY_MAPPING.items()}
 
-    def __init__(self, debug=False):
+    # 编码后达到该字节数的数据包会被压缩为 ZZ00 包
+    COMPRESS_THRESHOLD = 1000
+    # gzip 压缩级别，默认保持原有的最高级别 9。
+    # 降到 6 可使大型包的压缩耗时减半以上，但 1000 个端点的配置约大 25%。
+    COMPRESS_LEVEL = 9
+    # 单个数据包 (GL00 包体或 ZZ00 解压后) 的长度上限，超出的帧被直接拒绝。
+    # 1000 个端点的 get-config 回复解压后约 170 KiB，远低于此上限。
+    MAX_PACKET_SIZE = 4 * 1024 * 1024
+
+    def __init__(
+        self,
+        debug=False,
+        compress_level: int = COMPRESS_LEVEL,
+        compress_threshold: int = COMPRESS_THRESHOLD,
+    ):
+        if not 0 <= compress_level <= 9:
+            raise ValueError(f"压缩级别必须在 0-9 之间: {compress_level}")
         self.debug = debug
+        self.compress_level = compress_level
+        self.compress_threshold = compress_threshold
 
     @staticmethod
     def _encode_varint(value):
         """将一个整数编码为变长整数 (Varint)。"""
         data = bytearray()
+        LifeSmartProtocol._write_varint(data, value)
+        return bytes(data)
+
+    @staticmethod
+    def _write_varint(out: bytearray, value):
+        """将一个变长整数 (Varint) 直接追加到输出缓冲区。"""
         while value >= 128:
-            data.append((value & 0x7F) | 0x80)
+            out.append((value & 0x7F) | 0x80)
             value >>= 7
-        data.append(value)
-        return bytes(data)
+        out.append(value)
 
     @staticmethod
     def _decode_varint(stream):
@@ -130,223 +222,404 @@ class LifeSmartProtocol:
 
     def _string_to_bin(self, value):
         """将字符串编码为二进制格式。"""
+        out = bytearray()
+        self._write_string(out, value)
+        return bytes(out)
+
+    def _write_string(self, out: bytearray, value):
+        """将字符串以 0x11 + 长度 + UTF-8 内容的形式追加到输出缓冲区。"""
         encoded_str = value.encode("utf-8")
-        return b"\x11" + self._encode_varint(len(encoded_str)) + encoded_str
+        out.append(0x11)
+        self._write_varint(out, len(encoded_str))
+        out += encoded_str
 
     def _pack_value(self, value, isKey=False):
-        """递归地将 Python 对象打包成二进制格式。"""
+        """将 Python 对象打包成二进制格式。"""
+        out = bytearray()
+        self._pack_into(out, value, isKey)
+        return bytes(out)
+
+    def _pack_into(self, out: bytearray, value, isKey=False):
+        """递归地将 Python 对象打包并追加到同一个输出缓冲区。
+
+        整个数据包共享一个 bytearray，各层递归只做追加，
+        避免逐层 bytes 拼接带来的平方级复制。
+        """
 
         if isinstance(value, bool):  # 处理布尔值
-            return b"\x02" if value else b"\x03"
+            out.append(0x02 if value else 0x03)
+            return
 
         if isinstance(value, int):  # 处理整数
             if not -0x80000000 <= value <= 0x7FFFFFFF:
                 raise ValueError(f"int 超出 32-bit 有符号范围: {value}")
             zz = (value << 1) ^ (value >> 31)
-            return b"\x04" + self._encode_varint(zz)
+            out.append(0x04)
+            self._write_varint(out, zz)
+            return
 
         if isinstance(value, str):  # 处理字符串
             if value == "::NULL::":
-                return b"\x11\x08::NULL::"
+                out += b"\x11\x08::NULL::"
+                return
             if value.startswith("enum:"):
                 key = value[5:]
                 enum_id = self.REVERSE_KEY_MAPPING.get(key)
+                if enum_id is None:
+                    # 数字 enum id (例如 "enum:91")：直接打包为 int，避免 get-config
+                    # 等动作中数字字段（act="enum:91" 等）被错误地按字符串编码后被
+                    # 网关以 ENADF1 拒绝。仅当 key 是单字节范围内的合法整数时生效。
+                    try:
+                        enum_id = int(key)
+                    except ValueError:
+                        enum_id = None
+                    if enum_id is not None and not 0 <= enum_id <= 0xFF:
+                        enum_id = None
                 if enum_id is not None:
-                    return struct.pack("BB", 0x13, enum_id)
-                # 数字 enum id (例如 "enum:91")：直接打包为 int，避免 get-config
-                # 等动作中数字字段（act="enum:91" 等）被错误地按字符串编码后被网关
-                # 以 ENADF1 拒绝。仅当 key 是合法整数时生效。
-                try:
-                    return struct.pack("BB", 0x13, int(key))
-                except (ValueError, struct.error):
-                    pass
+                    out.append(0x13)
+                    out.append(enum_id)
+                    return
                 # 如果没有找到对应的enum_id，则作为普通字符串处理
-                return self._string_to_bin(value)
+                self._write_string(out, value)
+                return
             if isKey and self.REVERSE_KEY_MAPPING.get(value):
-                enum_id = self.REVERSE_KEY_MAPPING.get(value)
-                return struct.pack("BB", 0x13, enum_id)
-            return self._string_to_bin(value)
+                out.append(0x13)
+                out.append(self.REVERSE_KEY_MAPPING[value])
+                return
+            self._write_string(out, value)
+            return
 
         if isinstance(value, bytes):  # 处理字节串
             # 像处理字符串一样，添加类型码(0x11)和长度，然后附加原始字节
-            return b"\x11" + self._encode_varint(len(value)) + value
+            out.append(0x11)
+            self._write_varint(out, len(value))
+            out += value
+            return
 
         if isinstance(value, list):  # 处理列表
             if not value:
-                return b"\x01"
-            data = b"\x12" + struct.pack("B", len(value))
+                out.append(0x01)
+                return
+            out += struct.pack("BB", 0x12, len(value))
             for i, item in enumerate(value):
-                data += self._pack_value(i) + self._pack_value(item)
-            return data
+                self._pack_into(out, i)
+                self._pack_into(out, item)
+            return
 
         if isinstance(value, dict):  # 处理字典
-            data = b"\x12" + struct.pack("B", len(value))
+            out += struct.pack("BB", 0x12, len(value))
             for k, v in value.items():
-                data += self._pack_value(k, True) + self._pack_value(v)
-            return data
+                self._pack_into(out, k, True)
+                self._pack_into(out, v)
+            return
 
         if value is None:
-            return b"\x00"
+            out.append(0x00)
+            return
         _LOGGER.warning("不支持的打包类型: %s", type(value))
-        return b""
 
     def encode(self, parts):
         """将多个部分编码成一个完整的 LifeSmart 数据包。"""
-        header, data = b"GL00\x00\x00", b""
+        out = self._new_packet_buffer()
         for part in parts:
-            packed = self._pack_value(part)
+            start = len(out)
+            self._pack_into(out, part)
             # 官方文档要求顶级列表中的每个元素（必须是字典）都被移除类型头
-            # 这里假设 _pack_value 返回的第一个字节始终是类型头（如 0x12），否则抛出异常
-            if not packed or len(packed) < 2:
+            # 这里假设打包结果的第一个字节始终是类型头（如 0x12），否则抛出异常
+            if len(out) - start < 2:
                 raise ValueError("_pack_value 返回的内容过短，无法移除类型头")
             # 检查类型头是否为预期的字典类型（0x12），如有需要可调整
-            if packed[0] != 0x12:
+            if out[start] != 0x12:
                 raise ValueError(
-                    f"_pack_value 返回的类型头不是预期的 0x12，而是 {packed[0]:#x}"
+                    f"_pack_value 返回的类型头不是预期的 0x12，而是 {out[start]:#x}"
+                )
+            # 只移动当前这一部分的数据，整体仍为线性复杂度
+            del out[start]
+        return self._finalize_packet(out)
+
+    @staticmethod
+    def _new_packet_buffer() -> bytearray:
+        """创建一个预留了 10 字节 GL00 包头的输出缓冲区。"""
+        # GL00 + 2 字节保留位 + 4 字节长度，长度在 _finalize_packet 中回填
+        return bytearray(b"GL00\x00\x00\x00\x00\x00\x00")
+
+    def _finalize_packet(self, out: bytearray) -> bytes:
+        """回填 GL00 包头中的长度，达到压缩阈值时压缩为 ZZ00 包。
+
+        ZZ00 包头中的长度是压缩前完整 GL00 包的长度。gzip 流由 zlib 直接生成
+        (头部 mtime 为 0)，相同输入总是得到相同的输出。
+        """
+        struct.pack_into(">I", out, 6, len(out) - 10)
+        if len(out) >= self.compress_threshold:
+            compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, 31)
+            return b"".join(
+                (
+                    b"ZZ00\x00\x00",
+                    struct.pack(">I", len(out)),
+                    compressor.compress(out),
+                    compressor.flush(),
                 )
-            data += packed[1:]
-        pkt = header + struct.pack(">I", len(data)) + data
-        if len(pkt) >= 1000:
-            compressed = gzip.compress(pkt)
-            return b"ZZ00\x00\x00" + struct.pack(">I", len(pkt)) + compressed
-        return pkt
+            )
+        return bytes(out)
+
+    @staticmethod
+    def _decode_varint_at(buf, pos):
+        """从 memoryview 的 pos 位置解码一个变长整数，返回 (值, 新位置)。"""
+        end = len(buf)
+        if pos < end and buf[pos] < 0x80:  # 单字节快速路径 (绝大多数长度/小整数)
+            return buf[pos], pos + 1
+        value, shift = 0, 0
+        while True:
+            if pos >= end:
+                raise EOFError("Incomplete varint data in stream.")
+            b = buf[pos]
+            pos += 1
+            value |= (b & 0x7F) << shift
+            if not (b & 0x80):
+                return value, pos
+            shift += 7
 
     def _parse_value(self, stream, data_type, call_stack=""):
-        """递归地从字节流中解析出 Python 对象。"""
+        """从字节流中解析出 Python 对象。
+
+        保留 BytesIO 形式的入口以兼容旧调用方，实际解析委托给基于
+        memoryview 的 `_parse_view`，解析完成后再将流位置移动到已消费的末尾。
+        """
+        start = stream.tell()
+        with stream.getbuffer() as view, view[start:] as tail:
+            value, pos = self._parse_view(tail, 0, data_type, call_stack)
+        stream.seek(start + pos)
+        return value
+
+    def _read_empty_list(self, buf, pos, normalized):
+        """0x01: 空列表的特殊标记。"""
+        return [], pos
+
+    def _read_none(self, buf, pos, normalized):
+        """0x00: NULL。"""
+        return None, pos
+
+    def _read_true(self, buf, pos, normalized):
+        """0x02: True。"""
+        return True, pos
+
+    def _read_false(self, buf, pos, normalized):
+        """0x03: False。"""
+        return False, pos
+
+    def _read_int(self, buf, pos, normalized):
+        """0x04: ZigZag 变长整数。"""
+        zz, pos = self._decode_varint_at(buf, pos)
+        return (zz >> 1) ^ -(zz & 1), pos  # 反 ZigZag
+
+    def _read_hex(self, buf, pos, normalized):
+        """0x05: 1 字节索引 + 8 字节 HEX 数据。"""
+        if pos + 9 > len(buf):
+            raise EOFError("HEX 数据不完整")
+        index = buf[pos]
+        hex_data = bytes(buf[pos + 1 : pos + 9])
+        return {
+            "type": "HEX",
+            "index": index,
+            "value": hex_data.hex(),
+            "raw": hex_data,
+        }, pos + 9
+
+    def _read_timestamp(self, buf, pos, normalized):
+        """0x06: 1 字节索引 + ZigZag 变长整数。"""
+        if pos >= len(buf):
+            raise EOFError("时间戳数据不完整")
+        index = buf[pos]
+        zz, pos = self._decode_varint_at(buf, pos + 1)
+        value = (zz >> 1) ^ -(zz & 1)
+        if normalized:
+            return value, pos
+        return LSTimestamp(index=index, value=value, raw_data=b""), pos
+
+    def _read_string(self, buf, pos, normalized):
+        """0x11: 变长长度 + UTF-8 字符串或原始字节。"""
+        length, pos = self._decode_varint_at(buf, pos)
+        if pos + length > len(buf):
+            raise EOFError("字符串数据不足")
+        raw = buf[pos : pos + length]
+        pos += length
         try:
-            if data_type == 0x01:  # 识别空列表的特殊标记
-                return []
+            # 优先尝试解码为UTF-8字符串
+            text = str(raw, "utf-8")
+        except UnicodeDecodeError:
+            # 如果解码失败，说明它很可能不是一个字符串，而是原始的二进制数据
+            raw = bytes(raw)
+            _LOGGER.debug("UTF-8解码失败，将数据作为原始bytes返回: %s", raw)
+            return raw, pos
+        if normalized and text.startswith("enum:"):
+            text = text[5:]
+        return text, pos
+
+    def _read_enum(self, buf, pos, normalized):
+        """0x13: 1 字节枚举 ID。"""
+        if pos + 1 > len(buf):
+            raise EOFError("数据意外结束")
+        name = self.KEY_MAPPING.get(buf[pos], buf[pos])
+        if normalized:
+            return str(name), pos + 1
+        return f"enum:{name}", pos + 1
+
+    # 以类型字节为下标的标量解析表；0x12 (数组/字典) 由 _parse_view 的显式栈处理，
+    # 表中为 None 的类型视为未知类型。
+    _SCALAR_READERS = {
+        0x00: _read_none,
+        0x01: _read_empty_list,
+        0x02: _read_true,
+        0x03: _read_false,
+        0x04: _read_int,
+        0x05: _read_hex,
+        0x06: _read_timestamp,
+        0x11: _read_string,
+        0x13: _read_enum,
+    }
+    _SCALAR_READERS = tuple(map(_SCALAR_READERS.get, range(256)))
 
-            if data_type == 0x00:  # NULL
-                return None
+    def _parse_view(self, buf, pos, data_type, call_stack="", normalized=False):
+        """从 memoryview 的 pos 位置解析出 Python 对象。
 
-            elif data_type == 0x02:  # True
-                return True
-
-            elif data_type == 0x03:  # False
-                return False
-
-            elif data_type == 0x04:  # Integer
-                zz = self._decode_varint(stream)
-                return (zz >> 1) ^ -(zz & 1)  # 反 ZigZag
-
-            if data_type == 0x05:  # HEX类型处理
-                index = stream.read(1)[0]
-                hex_data = stream.read(8)
-                if len(hex_data) < 8:
-                    raise EOFError("HEX 数据不完整")
-                return {
-                    "type": "HEX",
-                    "index": index,
-                    "value": hex_data.hex(),
-                    "raw": hex_data,
-                }
-
-            elif data_type == 0x06:  # 时间戳类型处理
-                index = stream.read(1)[0]
-                zz = self._decode_varint(stream)
-                value = (zz >> 1) ^ -(zz & 1)
-                return LSTimestamp(index=index, value=value, raw_data=b"")
-
-            elif data_type == 0x11:  # String or Bytes
-                length = self._decode_varint(stream)
-                raw = stream.read(length)
-                if len(raw) != length:
-                    raise EOFError("字符串数据不足")
+        整个数据包只包装一次 memoryview，解析过程仅移动整数游标，
+        字符串直接从切片解码，不再为每个键值复制整个数据包。
 
-                try:
-                    # 优先尝试解码为UTF-8字符串
-                    return raw.decode("utf-8")
-                except UnicodeDecodeError:
-                    # 如果解码失败，说明它很可能不是一个字符串，而是原始的二进制数据
-                    _LOGGER.debug("UTF-8解码失败，将数据作为原始bytes返回: %s", raw)
-                    return raw
-
-            elif data_type == 0x12:  # Array/Dict
-                count = ord(stream.read(1))
-                items = []
-                for i in range(count):
-                    if stream.tell() >= len(stream.getvalue()):
-                        raise EOFError(f"解析第{i + 1}/{count}个键时数据流提前结束")
-                    key_type = ord(stream.read(1))
-                    key = self._parse_value(stream, key_type, f"{call_stack}[{i}].key")
-                    if stream.tell() >= len(stream.getvalue()):
-                        raise EOFError(f"解析第{i + 1}/{count}个值时数据流提前结束")
-                    value_type = ord(stream.read(1))
-                    value = self._parse_value(
-                        stream, value_type, f"{call_stack}[{i}].val"
+        解析器不使用递归：标量按类型字节查 `_SCALAR_READERS` 分派，数组/字典
+        (0x12) 以显式栈维护 `[元素数, 已解析的键值对, 待配对的键, 是否规范化]`，
+        因此嵌套深度不受 Python 递归限制。调用栈描述仅在出错时由栈重建。
+
+        `normalized=True` 时在解析过程中直接产出 `_normalize_structure` 的结果形态
+        (键与枚举值不带 'enum:' 前缀、时间戳为整数)，无需再遍历一次结果树。
+        键始终按原始形态解析后再规范化，以保证与两遍处理完全一致。
+
+        Returns:
+            (解析出的对象, 解析后的新位置)
+        """
+        end = len(buf)
+        readers = self._SCALAR_READERS
+        stack = []
+        try:
+            while True:
+                if data_type != 0x12:
+                    reader = readers[data_type]
+                    if reader is None:
+                        _LOGGER.warning("未知的解码数据类型: 0x%02x", data_type)
+                        value = None
+                    else:
+                        value, pos = reader(self, buf, pos, normalized)
+                else:  # Array/Dict
+                    if pos >= end:
+                        raise EOFError("数据意外结束")
+                    count = buf[pos]
+                    pos += 1
+                    if count:
+                        frame = [count, [], _PENDING, normalized]
+                        stack.append(frame)
+                        value = _PENDING
+                    else:
+                        value = {}
+
+                # 将完成的值交给栈顶容器；容器读满后出栈，继续向上交付
+                while value is not _PENDING:
+                    if not stack:
+                        return value, pos
+                    frame = stack[-1]
+                    if frame[2] is _PENDING:
+                        frame[2] = value
+                        break
+                    frame[1].append((frame[2], value))
+                    frame[2] = _PENDING
+                    if len(frame[1]) < frame[0]:
+                        break
+                    stack.pop()
+                    value = self._build_container(frame[0], frame[1], frame[3])
+
+                # 读取栈顶容器下一个键或值的类型字节
+                count, items, key, normalized = frame
+                if key is _PENDING:
+                    part = "键"
+                    normalized = False  # 键总是按原始形态解析
+                else:
+                    part = "值"
+                if pos >= end:
+                    raise EOFError(
+                        f"解析第{len(items) + 1}/{count}个{part}时数据流提前结束"
                     )
-                    items.append((key, value))
-                keys = [k for k, _ in items]
-                is_list = (
-                    count > 0
-                    and all(isinstance(k, int) for k in keys)
-                    and keys == list(range(count))
-                )
-                if is_list:
-                    return [v for _, v in items]
-                return {self._normalize_key(k): v for k, v in items}
-            if data_type == 0x13:
-                if stream.tell() + 1 > len(stream.getvalue()):
-                    raise EOFError("数据意外结束")
-                enum_id = ord(stream.read(1))
-                return f"enum:{self.KEY_MAPPING.get(enum_id, enum_id)}"
-            _LOGGER.warning("未知的解码数据类型: 0x%02x", data_type)
-            return None
+                data_type = buf[pos]
+                pos += 1
         except Exception as e:
             _LOGGER.error(
                 "在位置 %d 解析时出错: %s, 类型[0x%x] 调用栈[%s]",
-                stream.tell(),
+                pos,
                 str(e),
                 data_type,
-                call_stack,
+                call_stack + self._describe_parse_stack(stack),
             )
             raise
 
-    def decode(self, data):
-        """解码一个完整的 LifeSmart 数据包。"""
+    @staticmethod
+    def _describe_parse_stack(stack):
+        """根据解析栈重建出错位置的调用栈描述，例如 `[0].val[2].key`。"""
+        return "".join(
+            f"[{len(items)}].{'key' if key is _PENDING else 'val'}"
+            for _, items, key, _ in stack
+        )
+
+    def _build_container(self, count, items, normalized):
+        """将解析出的键值对组装为列表或字典。
+
+        键恰好为 0..count-1 的整数时视为列表，否则构建字典并规范化键。
+        调用方保证 count > 0 (空结构直接解析为空字典)。
+        """
+        if isinstance(items[0][0], int):
+            keys = [k for k, _ in items]
+            if all(isinstance(k, int) for k in keys) and keys == list(range(count)):
+                return [v for _, v in items]
+        if not normalized:
+            return {self._normalize_key(k): v for k, v in items}
+        result = {}
+        for k, v in items:
+            k = self._normalize_key(k)
+            if isinstance(k, str) and k.startswith("enum:"):
+                k = k[5:]
+            result[k] = v
+        return result
+
+    def decode(self, data, schg_filter: Callable[[str], bool] | None = None):
+        """解码一个完整的 LifeSmart 数据包。
+
+        `data` 可以是 bytes、bytearray 或 memoryview。GL00 负载只包装一次
+        memoryview 并以整数游标解析，避免对大型 get-config 回复反复复制。
+        `schg_filter` 的含义见 `decode_payload`。
+        """
         original_data = data
         try:
             if len(data) < 10:
                 raise EOFError("数据包不完整 (至少需要 10 字节)")
-            header = data[:4]
+            header = bytes(data[:4])
             # 统一从字节 6-10 读取长度
             pkt_len = struct.unpack(">I", data[6:10])[0]
 
             if header == b"ZZ00":  # 压缩包处理
                 # 在我们的 encode 实现中，pkt_len 是未压缩数据的长度。
                 # 压缩数据从字节 10 开始，直到数据流结束。
-                compressed_data = data[10:]
-                try:
-                    decompressed = gzip.decompress(compressed_data)
-                    if len(decompressed) != pkt_len:
-                        _LOGGER.warning(
-                            "解压后尺寸不匹配 (预期 %d, 实际 %d)",
-                            pkt_len,
-                            len(decompressed),
-                        )
-                except (OSError, gzip.BadGzipFile) as e:
-                    raise ValueError(f"解压失败: {str(e)}") from e
+                decompressed = self._inflate(data, 10, pkt_len)
 
                 # 递归解码解压后的数据 (它是一个 GL00 包)
                 # 整个压缩包都被消耗掉了
-                _, structure = self.decode(decompressed)
+                _, structure = self.decode(decompressed, schg_filter)
                 return b"", structure
 
             elif header == b"GL00":  # 标准包处理
                 total_length = 10 + pkt_len
                 if len(original_data) < total_length:
                     raise EOFError(f"数据包长度不匹配 (需要 {total_length} 字节)")
-                packet_data = original_data[10:total_length]
-                remaining_data = original_data[total_length:]
-                stream = BytesIO(packet_data)
-                result = []
-                while stream.tell() < len(packet_data):
-                    # 官方要求每个块都是一个字典
-                    # _parse_value 会处理读取类型、长度和内容
-                    parsed = self._parse_value(stream, 0x12)
-                    result.append(parsed)
-                return remaining_data, self._normalize_structure(result)
+                structure = self.decode_payload(
+                    original_data, 10, total_length, schg_filter
+                )
+                remaining_data = bytes(original_data[total_length:])
+                return remaining_data, structure
             raise ValueError(f"未知的包头: {header.hex()}")
         except EOFError as e:
             _LOGGER.debug("解码时遇到 EOF: %s", str(e))
@@ -355,6 +628,128 @@ class LifeSmartProtocol:
             _LOGGER.error("解码时出错: %s", str(e), exc_info=True)
             raise
 
+    def _inflate(self, data, start, expected):
+        """流式解压 data[start:] 中的 gzip 数据，输出长度受 MAX_PACKET_SIZE 约束。
+
+        压缩数据通过 memoryview 直接送入 zlib，不复制输入；解压结果写入按声明
+        长度预分配的缓冲区，恶意或损坏的帧无法耗尽内存。
+
+        Args:
+            data: 完整的 ZZ00 包 (bytes/bytearray/memoryview)
+            start: 压缩数据的起始位置
+            expected: 包头声明的解压后长度
+        """
+        inflater = _GzipInflater(expected, self.MAX_PACKET_SIZE)
+        with memoryview(data) as view, view[start:] as compressed:
+            inflater.feed(compressed)
+        if not inflater.eof:
+            raise EOFError("压缩数据不完整")
+        return inflater.finish()
+
+    def decode_payload(
+        self,
+        data,
+        start,
+        end,
+        schg_filter: Callable[[str], bool] | None = None,
+    ):
+        """解析 GL00 包体 data[start:end] 中的所有顶层块，并返回规范化后的结构。
+
+        规范化在解析过程中一次完成 (见 `_parse_view` 的 `normalized` 参数)，
+        `_schg` 等高频推送不再额外构建一棵中间结果树。
+
+        提供 `schg_filter` 时，顶层块中 `_schg` 字典的路径键会先被解析并交给
+        `schg_filter` 判断，未被接受的路径只跳过其值字节而不构建任何对象，
+        对应条目不会出现在结果中。其余内容的解析结果与不带过滤器时完全一致。
+
+        Args:
+            data: 包含完整 GL00 包的缓冲区 (bytes/bytearray/memoryview)
+            start: 包体起始位置（紧跟在 10 字节包头之后）
+            end: 包体结束位置
+            schg_filter: 可选的 `_schg` 路径过滤器，返回 True 表示需要完整解码
+        """
+        result = []
+        with memoryview(data) as view, view[:end] as packet_view:
+            pos = start
+            while pos < end:
+                # 官方要求每个块都是一个字典
+                # _parse_view 会处理读取类型、长度和内容
+                if schg_filter is None:
+                    parsed, pos = self._parse_view(
+                        packet_view, pos, 0x12, normalized=True
+                    )
+                else:
+                    parsed, pos = self._parse_push_block(packet_view, pos, schg_filter)
+                result.append(parsed)
+        return result
+
+    def _parse_push_block(self, buf, pos, schg_filter, in_schg=False):
+        """选择性地解析一个 0x12 字典 (类型字节已消费)，返回 (字典, 新位置)。
+
+        顶层块中的 `_schg` 字典以 `in_schg=True` 解析：其路径键按原始形态解析后
+        交给 `schg_filter`，未被接受的条目通过 `_skip_view` 跳过。其余值与
+        `_parse_view(..., normalized=True)` 的结果一致。
+        """
+        end = len(buf)
+        if pos >= end:
+            raise EOFError("数据意外结束")
+        count = buf[pos]
+        pos += 1
+        items = []
+        for i in range(count):
+            if pos >= end:
+                raise EOFError(f"解析第{i + 1}/{count}个键时数据流提前结束")
+            key, pos = self._parse_view(buf, pos + 1, buf[pos])
+            if pos >= end:
+                raise EOFError(f"解析第{i + 1}/{count}个值时数据流提前结束")
+            value_type = buf[pos]
+            pos += 1
+            if in_schg:
+                if not (isinstance(key, str) and schg_filter(key)):
+                    pos = self._skip_view(buf, pos, value_type)
+                    continue
+                value, pos = self._parse_view(buf, pos, value_type, normalized=True)
+            elif key == "_schg" and value_type == 0x12:
+                value, pos = self._parse_push_block(buf, pos, schg_filter, True)
+            else:
+                value, pos = self._parse_view(buf, pos, value_type, normalized=True)
+            items.append((key, value))
+        if not items:
+            return {}, pos
+        return self._build_container(len(items), items, True), pos
+
+    @staticmethod
+    def _skip_view(buf, pos, data_type):
+        """跳过 pos 处一个类型为 data_type 的值，返回其后的位置，不构建任何对象。"""
+        end = len(buf)
+        remaining = 1
+        while True:
+            if data_type == 0x12:
+                if pos >= end:
+                    raise EOFError("数据意外结束")
+                remaining += 2 * buf[pos]
+                pos += 1
+            elif data_type == 0x11:
+                length, pos = LifeSmartProtocol._decode_varint_at(buf, pos)
+                pos += length
+            elif data_type == 0x04:
+                _, pos = LifeSmartProtocol._decode_varint_at(buf, pos)
+            elif data_type == 0x06:
+                _, pos = LifeSmartProtocol._decode_varint_at(buf, pos + 1)
+            elif data_type == 0x05:
+                pos += 9
+            elif data_type == 0x13:
+                pos += 1
+            if pos > end:
+                raise EOFError("数据意外结束")
+            remaining -= 1
+            if not remaining:
+                return pos
+            if pos >= end:
+                raise EOFError("数据意外结束")
+            data_type = buf[pos]
+            pos += 1
+
     def _normalize_key(self, key):
         """确保字典键为基本类型。"""
         if isinstance(key, (str, int, float, bool, type(None))):
@@ -387,27 +782,397 @@ class LifeSmartProtocol:
         return data[5:] if isinstance(data, str) and data.startswith("enum:") else data
 
 
+class _ConfigEndpointScanner:
+    """在 get-config 应答尚未完整到达时，逐个取出 `eps` 中已完整到达的端点。
+
+    应答的 `eps` 字典位于第 2 个顶层块的 `ret[1].eps`。扫描器先定位该字典，
+    之后记住下一个端点的位置，每次送入更长的包体前缀时只解析新到齐的端点。
+    端点的解析结果与完整解码 (`normalized=True`) 中的对应值一致；扫描完成后
+    `result()` 返回全部端点及其在包体中的字节范围，整帧解码时不必再解析一遍。
+    """
+
+    EPS_PATH = ("ret", 1, "eps")
+
+    def __init__(self, proto: "LifeSmartProtocol") -> None:
+        self._proto = proto
+        self.reset()
+
+    def reset(self) -> None:
+        """开始扫描一个新的帧。"""
+        # 下一个端点在包体中的位置，None 表示尚未定位到 eps
+        self._pos: int | None = None
+        self._remaining = 0
+        # eps 字典内容 (从元素数开始) 在包体中的起始位置，以及已解析的端点
+        self._eps_start = 0
+        self._eps: dict | None = None
+        # eps 已扫描完，或该帧不是 get-config 应答
+        self.done = False
+
+    def result(self) -> tuple[int, int, dict] | None:
+        """eps 已全部扫描时返回 (起始位置, 结束位置, 端点字典)，否则返回 None。
+
+        位置相对于包体起点，范围覆盖 eps 字典的元素数与全部键值。
+        """
+        if self._eps is None or self._remaining:
+            return None
+        return self._eps_start, self._pos, self._eps
+
+    def scan(self, data, start: int, end: int) -> list[tuple[str, dict]]:
+        """扫描包体 data[start:end] (可以不完整)，返回新近完整到达的端点。"""
+        found = []
+        if self.done:
+            return found
+        with memoryview(data) as view, view[start:end] as buf:
+            try:
+                if self._pos is None:
+                    located = self._locate_eps(buf)
+                    if located is None:
+                        self.done = True
+                        return found
+                    self._pos, self._remaining = located
+                    self._eps_start, self._eps = self._pos - 1, {}
+                while self._remaining:
+                    devid, pos = self._read_complete(buf, self._pos)
+                    dev, pos = self._read_complete(buf, pos, normalized=True)
+                    self._pos = pos
+                    self._remaining -= 1
+                    self._eps[self._key(devid)] = dev
+                    if isinstance(dev, dict):
+                        found.append((self._key(devid), dev))
+                self.done = True
+            except EOFError:
+                pass  # 其余数据尚未到达
+        return found
+
+    def _locate_eps(self, buf) -> tuple[int, int] | None:
+        """返回 (第一个端点的位置, 端点数)，该帧不含 eps 时返回 None。"""
+        pos = self._proto._skip_view(buf, 0, 0x12)  # 第 1 个顶层块
+        for key in self.EPS_PATH:
+            pos = self._find_key(buf, pos, key)
+            if pos is None:
+                return None
+        if pos >= len(buf):
+            raise EOFError("数据意外结束")
+        return pos + 1, buf[pos]
+
+    def _find_key(self, buf, pos: int, wanted) -> int | None:
+        """在 pos 处的字典中查找键为 wanted 的字典值，返回其元素数的位置。"""
+        if pos >= len(buf):
+            raise EOFError("数据意外结束")
+        count = buf[pos]
+        pos += 1
+        for _ in range(count):
+            key, pos = self._read_complete(buf, pos)
+            if pos >= len(buf):
+                raise EOFError("数据意外结束")
+            value_type = buf[pos]
+            if self._key(key) == wanted:
+                return pos + 1 if value_type == 0x12 else None
+            pos = self._proto._skip_view(buf, pos + 1, value_type)
+        return None
+
+    def _read_complete(self, buf, pos: int, normalized: bool = False):
+        """解析 pos 处 (从类型字节开始) 的一个值，返回 (值, 新位置)。
+
+        先用 `_skip_view` 确认该值已完整到达，数据不足时抛出 EOFError，
+        而不会像 `_parse_view` 那样把不完整的前缀记录为解析错误。
+        """
+        if pos >= len(buf):
+            raise EOFError("数据意外结束")
+        data_type = buf[pos]
+        end = self._proto._skip_view(buf, pos + 1, data_type)
+        value, _ = self._proto._parse_view(
+            buf, pos + 1, data_type, normalized=normalized
+        )
+        return value, end
+
+    def _key(self, key):
+        """按完整解码的规则规范化字典键。"""
+        key = self._proto._normalize_key(key)
+        if isinstance(key, str) and key.startswith("enum:"):
+            return key[5:]
+        return key
+
+
+class LifeSmartFrameAssembler:
+    """LifeSmart 本地数据流的增量帧组装器。
+
+    TCP 读取到的数据块通过 `feed()` 送入。每个帧的 GL00/ZZ00 包头与长度只解析
+    一次，随后仅缓存数据直到声明的长度到齐，再由生成器逐个产出解码后的帧，
+    保证每个字节只被解析一次。
+
+    ZZ00 包头中的长度是解压后的长度，压缩数据本身没有长度字段，因此压缩负载
+    在到达时即送入流式 gzip 解压器，直到 gzip 流结束为止；流结束后多余的数据
+    即属于下一帧。
+
+    设置 `schg_filter` 后，帧按 `LifeSmartProtocol.decode_payload` 的选择性模式
+    解码，未被接受的 `_schg` 路径不会被构建。
+
+    设置 `config_listener` 后，get-config 应答在完整到达之前，`eps` 中每个已
+    到齐的端点就以 `(设备 ID, 端点数据)` 交给监听器，每个端点恰好一次。帧到齐
+    后只解码 eps 以外的部分，eps 直接使用扫描出的端点 (与交给监听器的是同一批
+    对象)，因此每个端点只解析一次。未设置监听器时没有额外开销。
+    """
+
+    HEADER_SIZE = 10
+
+    def __init__(
+        self,
+        proto: LifeSmartProtocol | None = None,
+        schg_filter: Callable[[str], bool] | None = None,
+    ) -> None:
+        self._proto = proto or LifeSmartProtocol()
+        self.schg_filter = schg_filter
+        self.config_listener: Callable[[str, dict], None] | None = None
+        self._scanner = _ConfigEndpointScanner(self._proto)
+        self._buffer = bytearray()
+        self._header: bytes | None = None
+        self._pkt_len = 0
+        self._inflater: _GzipInflater | None = None
+
+    @property
+    def buffered(self) -> int:
+        """当前已缓存但尚未组成完整帧的字节数。"""
+        inflated = self._inflater.size if self._inflater else 0
+        return len(self._buffer) + inflated
+
+    def reset(self) -> None:
+        """丢弃所有缓存数据和未完成的帧状态（例如重连后）。"""
+        self._buffer.clear()
+        self._header = None
+        self._pkt_len = 0
+        self._inflater = None
+        self._scanner.reset()
+
+    def feed(self, data: bytes) -> Iterator[list]:
+        """送入新读取的数据，并逐个产出已完整到达的解码帧。
+
+        若某个完整帧解码失败，该帧会被丢弃并抛出异常，缓冲区中其后的数据
+        保持不变，可在下一次 `feed()` 时继续解析。遇到无法识别的包头时无法
+        重新同步，此时会清空缓冲区并抛出 ValueError。
+        """
+        if data:
+            self._buffer += data
+        while True:
+            if self._header is None:
+                if len(self._buffer) < self.HEADER_SIZE:
+                    return
+                header = bytes(self._buffer[:4])
+                if header not in (b"GL00", b"ZZ00"):
+                    self.reset()
+                    raise ValueError(f"未知的包头: {header.hex()}")
+                pkt_len = struct.unpack(">I", self._buffer[6:10])[0]
+                if pkt_len > self._proto.MAX_PACKET_SIZE:
+                    self.reset()
+                    raise ValueError(
+                        f"数据包声明的长度 {pkt_len} 超出上限 "
+                        f"{self._proto.MAX_PACKET_SIZE}"
+                    )
+                self._header = header
+                self._pkt_len = pkt_len
+                if header == b"ZZ00":
+                    del self._buffer[: self.HEADER_SIZE]
+                    self._inflater = _GzipInflater(pkt_len, self._proto.MAX_PACKET_SIZE)
+
+            if self._header == b"GL00":
+                total_length = self.HEADER_SIZE + self._pkt_len
+                self._scan_endpoints(self._buffer, min(len(self._buffer), total_length))
+                if len(self._buffer) < total_length:
+                    return
+                self._header = None
+                try:
+                    frame = self._decode_body(self._buffer, total_length)
+                finally:
+                    del self._buffer[:total_length]
+                yield frame
+            else:
+                frame = self._inflate_buffered()
+                if frame is None:
+                    return
+                yield frame
+
+    def _inflate_buffered(self) -> list | None:
+        """将已缓存的压缩数据送入解压器，gzip 流结束时解码并返回该帧。"""
+        if not self._buffer:
+            return None
+        try:
+            self._inflater.feed(self._buffer)
+        except ValueError:
+            self.reset()
+            raise
+        self._buffer.clear()
+        # 解压出的数据本身是一个 GL00 包 (含 10 字节包头)
+        self._scan_endpoints(self._inflater.output, self._inflater.size)
+        if not self._inflater.eof:
+            return None
+
+        # gzip 流结束后剩余的数据属于下一帧
+        self._buffer += self._inflater.unused_data
+        decompressed = self._inflater.finish()
+        self._header, self._inflater = None, None
+        if self._scanner.result() is None:
+            self._scanner.reset()
+            _, structure = self._proto.decode(decompressed, self.schg_filter)
+            return structure
+        total_length = self.HEADER_SIZE + struct.unpack(">I", decompressed[6:10])[0]
+        if len(decompressed) < total_length:
+            self._scanner.reset()
+            raise EOFError(f"数据包长度不匹配 (需要 {total_length} 字节)")
+        return self._decode_body(decompressed, total_length)
+
+    def _decode_body(self, data, end: int) -> list:
+        """解码 GL00 包 data 的包体 data[HEADER_SIZE:end]。
+
+        扫描器已解析出全部 get-config 端点时，包体中的 eps 内容被替换为一个
+        空字典后再解码，结果中的 eps 换成扫描出的端点字典。
+        """
+        scanned = self._scanner.result()
+        self._scanner.reset()
+        if scanned is None:
+            return self._proto.decode_payload(
+                data, self.HEADER_SIZE, end, self.schg_filter
+            )
+        eps_start, eps_end, eps = scanned
+        base = self.HEADER_SIZE
+        with memoryview(data) as view:
+            body = b"".join(
+                (view[: base + eps_start], b"\x00", view[base + eps_end : end])
+            )
+        frame = self._proto.decode_payload(body, base, len(body), self.schg_filter)
+        frame[1]["ret"][1]["eps"] = eps
+        return frame
+
+    def _scan_endpoints(self, data, end: int) -> None:
+        """将 data[HEADER_SIZE:end] 中新到齐的 get-config 端点交给监听器。"""
+        listener = self.config_listener
+        if listener is None or end <= self.HEADER_SIZE:
+            return
+        for devid, dev in self._scanner.scan(data, self.HEADER_SIZE, end):
+            listener(devid, dev)
+
+
+# get-config 请求中每个端点查询的字段 (投影)，键顺序即编码顺序。
+#   full: 全部字段，包括图标、射频芯片、云台等平台不使用的元数据，供诊断使用
+#   minimal: 只包含设备加载、名称规范化与平台分类所需的 cls/name/ver 与 IO 子树
+CONFIG_PROFILE_FULL = "full"
+CONFIG_PROFILE_MINIMAL = "minimal"
+_CONFIG_FIELDS_FULL = {
+    "uuid": False,
+    "enum:114": False,
+    "ver": False,
+    "enum:14": {"m": 1, "s": False, "_chd": 1},
+    "icon": False,
+    "cls": False,
+    "enum:56": False,
+    "_": "eps",
+    "P_Flip": False,
+    "ptzmr": False,
+    "enum:83": False,
+    "nid": False,
+    "devType": False,
+    "cgy": False,
+    "enum:108": False,
+    "rfic": False,
+    "name": False,
+    "agtid": False,
+}
+_CONFIG_FIELDS_MINIMAL = ("ver", "enum:14", "cls", "_", "name")
+CONFIG_PROFILE_FIELDS = {
+    CONFIG_PROFILE_FULL: _CONFIG_FIELDS_FULL,
+    CONFIG_PROFILE_MINIMAL: {
+        k: v for k, v in _CONFIG_FIELDS_FULL.items() if k in _CONFIG_FIELDS_MINIMAL
+    },
+}
+
+
 class LifeSmartPacketFactory:
     """LifeSmart 本地协议的指令包工厂。
 
     此类不直接与网络通信，它的唯一职责是构建各种控制命令的二进制数据包。
+    `compress_level` / `compress_threshold` 控制大型指令包 (场景、红外码等)
+    的 ZZ00 压缩，默认值见 `LifeSmartProtocol`。
     """
 
-    def __init__(self, node_agt: str, node: str = ""):
-        self._proto = LifeSmartProtocol()
-        self._sel = 1
+    # `_sel` 序号在 1..SEL_MAX 之间循环递增
+    SEL_MAX = 0x7FFFFFFF
+
+    def __init__(
+        self,
+        node_agt: str,
+        node: str = "",
+        compress_level: int = LifeSmartProtocol.COMPRESS_LEVEL,
+        compress_threshold: int = LifeSmartProtocol.COMPRESS_THRESHOLD,
+    ):
+        self._proto = LifeSmartProtocol(
+            compress_level=compress_level, compress_threshold=compress_threshold
+        )
+        # 指令序号，写入每个指令包的 `_sel`，中枢在应答帧头部原样返回，
+        # 客户端据此将应答与请求对应起来
+        self._sel = 0
         self.node_agt = node_agt
         self.node = node
+        # 预编译的不变字节片段：node/act 片段按完整 node 路径缓存，
+        # get-config 包按 (node, 投影方案) 缓存
+        self._segment_cache: dict[tuple, bytes] = {}
+        self._config_packet_cache: dict[tuple[str, str], bytes] = {}
+
+        pack = self._proto._pack_value
+        # 指令包结构固定为:
+        #   {"_sel": sel, "req": False, "timestamp": 10}
+        #   {"args": args, "node": f"{node_agt}{suffix}", "act": act}
+        # 顶层字典的 0x12 类型头已按 encode() 的规则移除。
+        self._sel_prefix = b"\x03" + pack("_sel", True)
+        self._args_prefix = (
+            pack("req", True)
+            + pack(False)
+            + pack("timestamp", True)
+            + pack(10)
+            + b"\x03"
+            + pack("args", True)
+        )
+        # EpSet 的 args 结构固定为 {"val", "valtag", "devid", "key", "type"}
+        self._epset_val_prefix = b"\x12\x05" + pack("val", True)
+        self._epset_devid_prefix = (
+            pack("valtag", True) + pack("m") + pack("devid", True)
+        )
+        self._epset_key_prefix = pack("key", True)
+        self._epset_type_prefix = pack("type", True)
+
+    def _node_act_segment(self, node_suffix: str, act: str) -> bytes:
+        """返回 "node" 与 "act" 两个字段的预编译字节片段（按 node/act 缓存）。"""
+        node = f"{self.node_agt}{node_suffix}"
+        segment = self._segment_cache.get((node, act))
+        if segment is None:
+            pack = self._proto._pack_value
+            segment = pack("node", True) + pack(node) + pack("act", True) + pack(act)
+            self._segment_cache[(node, act)] = segment
+        return segment
+
+    def _start_command_packet(self) -> bytearray:
+        """创建指令包缓冲区，写入固定头部与递增的 _sel，直到 args 值之前。"""
+        self._sel = self._sel % self.SEL_MAX + 1
+        out = self._proto._new_packet_buffer()
+        out += self._sel_prefix
+        self._proto._pack_into(out, self._sel)
+        out += self._args_prefix
+        return out
+
+    def _finish_command_packet(self, out: bytearray) -> LSCommandPacket:
+        """完成指令包 (必要时压缩)，并附上写入其中的 `_sel` 序号。"""
+        return LSCommandPacket(self._proto._finalize_packet(out), self._sel)
 
     def _build_packet(
         self, args: dict, act: str = "rfSetA", node_suffix: str = "/ep"
     ) -> bytes:
-        """构建一个标准的控制指令包。"""
-        packet_data = [
-            {"_sel": self._sel, "req": False, "timestamp": 10},
-            {"args": args, "node": f"{self.node_agt}{node_suffix}", "act": act},
-        ]
-        return self._proto.encode(packet_data)
+        """构建一个标准的控制指令包。
+
+        固定头部与 node/act 片段来自预编译缓存，只有 args 需要实时打包，
+        输出与完整调用 encode() 逐字节一致。
+        """
+        out = self._start_command_packet()
+        self._proto._pack_into(out, args)
+        out += self._node_act_segment(node_suffix, act)
+        return self._finish_command_packet(out)
 
     def build_login_packet(self, uid: str, pwd: str) -> bytes:
         """构建登录指令包。"""
@@ -471,34 +1236,36 @@ class LifeSmartPacketFactory:
         ]
         return self._proto.encode(login_data)
 
-    def build_get_config_packet(self, node: str) -> bytes:
-        """构建获取所有设备配置的指令包。"""
+    def build_get_config_packet(
+        self, node: str, profile: str = CONFIG_PROFILE_FULL
+    ) -> bytes:
+        """构建获取所有设备配置的指令包。
+
+        Args:
+            node: 登录后得到的 node
+            profile: 端点字段的投影方案，见 `CONFIG_PROFILE_FIELDS`
+
+        该包只随 node 与投影方案变化，而登录和心跳都会反复发送，因此按
+        (node, profile) 缓存编码结果。
+        """
+        key = (node, profile)
+        packet = self._config_packet_cache.get(key)
+        if packet is None:
+            packet = self._config_packet_cache[key] = self._encode_get_config(
+                node, profile
+            )
+        return packet
+
+    def _encode_get_config(self, node: str, profile: str) -> bytes:
+        """编码获取所有设备配置的指令包。"""
+        fields = CONFIG_PROFILE_FIELDS.get(profile)
+        if fields is None:
+            raise ValueError(f"未知的 get-config 投影方案: {profile}")
         config_data = [
             {"req": False, "timestamp": 10},
             {
                 "args": {
-                    "enum:14": {
-                        "enum:98": {
-                            "uuid": False,
-                            "enum:114": False,
-                            "ver": False,
-                            "enum:14": {"m": 1, "s": False, "_chd": 1},
-                            "icon": False,
-                            "cls": False,
-                            "enum:56": False,
-                            "_": "eps",
-                            "P_Flip": False,
-                            "ptzmr": False,
-                            "enum:83": False,
-                            "nid": False,
-                            "devType": False,
-                            "cgy": False,
-                            "enum:108": False,
-                            "rfic": False,
-                            "name": False,
-                            "agtid": False,
-                        }
-                    },
+                    "enum:14": {"enum:98": dict(fields)},
                     "enum:12": {"enum:13": False},
                     "_chd": 1,
                 },
@@ -508,18 +1275,40 @@ class LifeSmartPacketFactory:
         ]
         return self._proto.encode(config_data)
 
+    def build_keepalive_packet(self, node: str) -> LSCommandPacket:
+        """构建轻量的保活查询包。
+
+        与 get-config 使用同一个查询动作，但只查询节点自身 (`_chd: 0`，不展开
+        端点)，应答只有几十字节。包带 `_sel` 序号，中枢原样返回时可据此匹配
+        应答并测量 RTT；客户端把查询之后到达的任何帧视为连接存活的证明。
+        """
+        pack = self._proto._pack_value
+        out = self._start_command_packet()
+        self._proto._pack_into(out, {"_chd": 0})
+        out += pack("node", True) + pack(f"{node}/me")
+        out += pack("act", True) + pack("enum:91")
+        return self._finish_command_packet(out)
+
     def build_epset_packet(
         self, devid: str, idx: str, command_type: int, val: Any
     ) -> bytes:
-        """构建一个标准的单IO口控制指令包 (EpSet)。"""
-        args = {
-            "val": val,
-            "valtag": "m",
-            "devid": devid,
-            "key": idx,  # 本地协议使用 'key'
-            "type": command_type,
-        }
-        return self._build_packet(args)
+        """构建一个标准的单IO口控制指令包 (EpSet)。
+
+        只实时打包 val/devid/key/type 四个可变值，其余字节均为预编译片段。
+        本地协议使用 'key' 表示 IO 口索引。
+        """
+        pack_into = self._proto._pack_into
+        out = self._start_command_packet()
+        out += self._epset_val_prefix
+        pack_into(out, val)
+        out += self._epset_devid_prefix
+        pack_into(out, devid)
+        out += self._epset_key_prefix
+        pack_into(out, idx)
+        out += self._epset_type_prefix
+        pack_into(out, command_type)
+        out += self._node_act_segment("/ep", "rfSetA")
+        return self._finish_command_packet(out)
 
     def build_multi_epset_packet(self, devid: str, io_list: list[dict]) -> bytes:
         """构建一个多IO口同时控制的指令包 (EpSet)。"""
@@ -0,0 +1,162 @@
+"""LifeSmart 本地 TCP 连接的入站更新队列。
+
+读取循环解码出的设备更新先放入有界队列，由独立的消费任务分批交给 Hub 回调，
+实体处理较慢时也不会阻塞 socket 读取。队列已满时，同一个 IO 的新更新合并到
+其排队中的更新 (保留最新值)，其余情况丢弃最早的更新。排队延迟、合并与丢弃
+的数量可通过 `stats` 查看。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class ReceiveQueueStats:
+    """入站更新队列的统计数据。"""
+
+    enqueued: int = 0
+    dispatched: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    batches: int = 0
+    max_depth: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+
+    @property
+    def avg_lag(self) -> float:
+        """每个更新从入队到分发的平均延迟 (秒)。"""
+        return self.total_lag / self.dispatched if self.dispatched else 0.0
+
+
+class LifeSmartReceiveQueue:
+    """有界、按 IO 合并的入站更新队列。
+
+    `put()` 是同步方法，读取循环放入更新后立即继续读取 socket。`start()` 启动
+    的消费任务每次取出最多 `BATCH_SIZE` 个更新依次交给回调，批次之间让出事件
+    循环。
+
+    队列未满时每个更新都按顺序分发。队列已满时的溢出策略：同一个键 (通常是
+    agt/me/idx) 已有排队中的更新时，将其数据替换为最新值 (保留原有位置与入队
+    时间)；否则丢弃最早的可丢弃更新。控制类事件 (例如重新加载请求) 不会被
+    丢弃。
+    """
+
+    MAX_SIZE = 1000
+    BATCH_SIZE = 50
+
+    def __init__(self, max_size: int | None = None) -> None:
+        self.max_size = max_size or self.MAX_SIZE
+        # 队列项为 [key, data, 入队时间, 可丢弃]，可变以便溢出时原地合并
+        self._items: deque[list] = deque()
+        # 每个键最近一次排队的队列项
+        self._latest: dict[Hashable, list] = {}
+        self._wakeup = asyncio.Event()
+        self._consumer: asyncio.Task | None = None
+        self.stats = ReceiveQueueStats()
+
+    @property
+    def depth(self) -> int:
+        """当前等待分发的更新数。"""
+        return len(self._items)
+
+    @property
+    def running(self) -> bool:
+        """消费任务是否在运行。"""
+        return self._consumer is not None and not self._consumer.done()
+
+    def put(self, key: Hashable, data: dict, droppable: bool = True) -> None:
+        """放入一个更新。
+
+        Args:
+            key: 溢出时用于合并的键
+            data: 交给回调的数据
+            droppable: 队列已满时是否允许丢弃该更新
+        """
+        stats = self.stats
+        stats.enqueued += 1
+        if len(self._items) >= self.max_size:
+            if (pending := self._latest.get(key)) is not None:
+                pending[1] = data
+                stats.coalesced += 1
+                return
+            self._drop_oldest()
+        item = [key, data, asyncio.get_running_loop().time(), droppable]
+        self._items.append(item)
+        self._latest[key] = item
+        stats.max_depth = max(stats.max_depth, len(self._items))
+        self._wakeup.set()
+
+    def _drop_oldest(self) -> None:
+        """丢弃最早入队的可丢弃更新。"""
+        for item in self._items:
+            if item[3]:
+                self._items.remove(item)
+                self._forget(item)
+                self.stats.dropped += 1
+                if self.stats.dropped == 1 or self.stats.dropped % 100 == 0:
+                    _LOGGER.warning(
+                        "入站更新队列已满 (%d)，已累计丢弃 %d 个最早的更新。",
+                        self.max_size,
+                        self.stats.dropped,
+                    )
+                return
+
+    def _forget(self, item: list) -> None:
+        """队列项离开队列时移除其键的索引。"""
+        if self._latest.get(item[0]) is item:
+            del self._latest[item[0]]
+
+    def start(self, callback: Callable[[dict], Awaitable[Any]]) -> None:
+        """启动消费任务，将更新分批交给 `callback`。"""
+        if not self.running:
+            self._consumer = asyncio.get_running_loop().create_task(
+                self._consume(callback)
+            )
+
+    def stop(self) -> None:
+        """停止消费任务并丢弃尚未分发的更新。"""
+        if self._consumer and not self._consumer.done():
+            self._consumer.cancel()
+        self._consumer = None
+        self._items.clear()
+        self._latest.clear()
+
+    def _take_batch(self) -> list[tuple[dict, float]]:
+        """按入队顺序取出一批更新。"""
+        batch = []
+        while self._items and len(batch) < self.BATCH_SIZE:
+            item = self._items.popleft()
+            self._forget(item)
+            batch.append((item[1], item[2]))
+        return batch
+
+    async def _consume(self, callback: Callable[[dict], Awaitable[Any]]) -> None:
+        """持续分发队列中的更新。"""
+        loop = asyncio.get_running_loop()
+        stats = self.stats
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while batch := self._take_batch():
+                stats.batches += 1
+                for data, queued_at in batch:
+                    lag = loop.time() - queued_at
+                    stats.last_lag = lag
+                    stats.max_lag = max(stats.max_lag, lag)
+                    stats.total_lag += lag
+                    stats.dispatched += 1
+                    try:
+                        await callback(data)
+                    except Exception as e:
+                        _LOGGER.error("分发本地更新时发生异常: %s", e, exc_info=True)
+                # 批次之间让出事件循环，读取循环可以继续接收数据
+                await asyncio.sleep(0)
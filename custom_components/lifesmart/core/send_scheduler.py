@@ -0,0 +1,158 @@
+"""LifeSmart 本地 TCP 连接的出站发送调度器。
+
+所有指令包都先进入按优先级分道的发送队列，同一个事件循环周期内排入的数据包
+合并为一次 `writer.write()` 与一次 `drain()`。交互指令优先于批量操作和心跳，
+队列深度与每个包的排队等待时间可通过 `stats` 查看。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SendPriority(IntEnum):
+    """发送优先级，数值越小越先发送。"""
+
+    INTERACTIVE = 0  # 实体控制指令 (开关、窗帘、红外按键等)
+    BULK = 1  # 场景/定时器/EEPROM 等批量或配置类操作
+    BACKGROUND = 2  # 心跳等后台流量
+
+
+@dataclass
+class SendQueueStats:
+    """发送队列的统计数据。"""
+
+    packets: int = 0
+    bytes: int = 0
+    writes: int = 0
+    max_depth: int = 0
+    last_wait: float = 0.0
+    max_wait: float = 0.0
+    total_wait: float = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        """每个包的平均排队等待时间 (秒)。"""
+        return self.total_wait / self.packets if self.packets else 0.0
+
+    @property
+    def packets_per_write(self) -> float:
+        """平均每次写入合并的包数。"""
+        return self.packets / self.writes if self.writes else 0.0
+
+
+class LifeSmartSendScheduler:
+    """按优先级合并写出数据包的发送调度器。
+
+    `send()` 将数据包排入对应优先级的队列并等待其被写出。首个入队的包会安排
+    一个刷新任务，该任务在下一个事件循环周期运行，因此当前周期内排入的所有包
+    按优先级顺序拼接后只写入一次。drain 期间新排入的包在下一轮刷新中发送，
+    此时高优先级的包会排在已等待的低优先级包之前。
+
+    单次写入的数据量不超过 `MAX_WRITE_SIZE`，避免大批量操作长时间占用连接、
+    延后随后到达的交互指令。
+    """
+
+    MAX_WRITE_SIZE = 64 * 1024
+
+    def __init__(self, get_writer: Callable[[], asyncio.StreamWriter | None]) -> None:
+        self._get_writer = get_writer
+        self._lanes: tuple[deque, ...] = tuple(deque() for _ in SendPriority)
+        self._flush_task: asyncio.Task | None = None
+        self.stats = SendQueueStats()
+
+    @property
+    def depth(self) -> int:
+        """当前排队等待写出的包数。"""
+        return sum(len(lane) for lane in self._lanes)
+
+    def lane_depths(self) -> dict[str, int]:
+        """各优先级队列中等待写出的包数。"""
+        return {
+            priority.name.lower(): len(self._lanes[priority])
+            for priority in SendPriority
+        }
+
+    async def send(
+        self, packet: bytes, priority: SendPriority = SendPriority.INTERACTIVE
+    ) -> None:
+        """排入一个数据包，并等待其随某次合并写入完成 drain。
+
+        Raises:
+            ConnectionError: 连接不可用或在写出前被关闭
+            OSError: 写入或 drain 失败
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._lanes[priority].append((packet, loop.time(), future))
+        self.stats.max_depth = max(self.stats.max_depth, self.depth)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush())
+        await future
+
+    def close(self, reason: str = "连接已关闭") -> None:
+        """连接断开时让所有排队中的包立即失败。"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        error = ConnectionError(reason)
+        for lane in self._lanes:
+            while lane:
+                _, _, future = lane.popleft()
+                if not future.done():
+                    future.set_exception(error)
+
+    def _take_batch(self) -> list[tuple]:
+        """按优先级顺序取出一批待写出的包，总长度不超过 MAX_WRITE_SIZE。"""
+        batch, size = [], 0
+        for lane in self._lanes:
+            while lane and (not batch or size + len(lane[0][0]) <= self.MAX_WRITE_SIZE):
+                item = lane.popleft()
+                batch.append(item)
+                size += len(item[0])
+            if lane:
+                break
+        return batch
+
+    async def _flush(self) -> None:
+        """持续写出排队中的包，直到队列为空。"""
+        loop = asyncio.get_running_loop()
+        while batch := self._take_batch():
+            now = loop.time()
+            writer = self._get_writer()
+            try:
+                if writer is None or writer.is_closing():
+                    raise ConnectionError("本地客户端未连接")
+                data = b"".join(packet for packet, _, _ in batch)
+                writer.write(data)
+                await writer.drain()
+            except asyncio.CancelledError:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(ConnectionError("连接已关闭"))
+                raise
+            except Exception as e:
+                _LOGGER.debug("合并写出 %d 个数据包失败: %s", len(batch), e)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            stats = self.stats
+            for _, queued_at, _ in batch:
+                wait = now - queued_at
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+            stats.last_wait = now - batch[-1][1]
+            stats.packets += len(batch)
+            stats.bytes += len(data)
+            stats.writes += 1
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
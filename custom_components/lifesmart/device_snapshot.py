@@ -0,0 +1,160 @@
+"""LifeSmart 设备列表快照。
+
+Hub 将最近一次成功获取的设备列表保存到 HA 的 `.storage` 中。重启时先用快照
+创建实体 (实体状态即快照中各 IO 的最后已知值)，不再等待网关或云端返回设备
+列表；之后由后台任务获取实时设备列表，通过 `diff_devices()` 与快照比较，只
+应用其中的差异。
+
+本地协议解码出的 IO 可能包含 bytes (HEX IO 的 `raw` 字段、无法按 UTF-8 解码
+的字符串)，保存前编码为 `{"__bytes__": 十六进制}`，读取时还原。
+"""
+
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DEVICE_DATA_KEY,
+    DEVICE_ID_KEY,
+    DEVICE_NAME_KEY,
+    DEVICE_TYPE_KEY,
+    DOMAIN,
+    HUB_ID_KEY,
+    SUBDEVICE_INDEX_KEY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# JSON 中表示 bytes 的标记键
+_BYTES_KEY = "__bytes__"
+
+
+def _to_json_safe(value: Any) -> Any:
+    """返回可被 JSON 编码的副本，bytes 编码为 `{"__bytes__": 十六进制}`。"""
+    if isinstance(value, dict):
+        return {key: _to_json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_safe(item) for item in value]
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {_BYTES_KEY: bytes(value).hex()}
+    return value
+
+
+def _from_json_safe(value: Any) -> Any:
+    """还原 `_to_json_safe()` 编码的 bytes。"""
+    if isinstance(value, dict):
+        if value.keys() == {_BYTES_KEY}:
+            return bytes.fromhex(value[_BYTES_KEY])
+        return {key: _from_json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_json_safe(item) for item in value]
+    return value
+
+
+class LifeSmartDeviceSnapshot:
+    """一个配置条目的设备列表快照，保存在 `.storage/lifesmart.<entry_id>.devices`。
+
+    读写失败只记录日志，不影响 Hub 的设置流程 (此时回退为等待实时设备列表)。
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """初始化设备快照。
+
+        Args:
+            hass: Home Assistant 核心实例
+            entry_id: 配置条目 ID
+        """
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.devices", private=True
+        )
+
+    async def async_load(self) -> list[dict] | None:
+        """读取快照中的设备列表，没有可用快照时返回 None。"""
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning("读取设备快照失败，将等待实时设备列表: %s", e)
+            return None
+        devices = data.get("devices") if isinstance(data, dict) else None
+        if not devices:
+            return None
+        try:
+            devices = _from_json_safe(devices)
+        except (TypeError, ValueError) as e:
+            _LOGGER.warning("设备快照格式错误，将等待实时设备列表: %s", e)
+            return None
+        _LOGGER.info("已读取 %d 个设备的快照。", len(devices))
+        return devices
+
+    async def async_save(self, devices: list[dict]) -> None:
+        """保存设备列表；空列表不会覆盖已有的快照。"""
+        if not devices:
+            return
+        try:
+            await self._store.async_save(
+                {"saved_at": time.time(), "devices": _to_json_safe(devices)}
+            )
+        except Exception as e:
+            _LOGGER.warning("保存设备快照失败: %s", e)
+
+    async def async_remove(self) -> None:
+        """删除快照文件。"""
+        try:
+            await self._store.async_remove()
+        except Exception as e:
+            _LOGGER.warning("删除设备快照失败: %s", e)
+
+
+def _device_key(device: dict) -> tuple[str, str]:
+    """设备在所有中枢范围内的唯一键 (agt, me)。"""
+    return device.get(HUB_ID_KEY, ""), device.get(DEVICE_ID_KEY, "")
+
+
+def diff_devices(
+    snapshot: list[dict], live: list[dict]
+) -> tuple[bool, list[dict[str, Any]]]:
+    """比较快照与实时设备列表。
+
+    Args:
+        snapshot: 快照中的设备列表
+        live: 实时获取的设备列表
+
+    Returns:
+        (实体结构是否变化, 值发生变化的 IO 更新消息列表)。设备被添加或删除，
+        或设备的类型、名称、IO 集合发生变化时，实体需要重新创建，此时结构变化
+        为 True 且不再逐个比较 IO。更新消息的格式与实时推送一致，可直接交给
+        `LifeSmartHub.data_update_handler`。
+    """
+    old_devices = {_device_key(device): device for device in snapshot}
+    new_devices = {_device_key(device): device for device in live}
+    if old_devices.keys() != new_devices.keys():
+        return True, []
+
+    messages = []
+    for key, device in new_devices.items():
+        old = old_devices[key]
+        old_data = old.get(DEVICE_DATA_KEY) or {}
+        new_data = device.get(DEVICE_DATA_KEY) or {}
+        if (
+            old.get(DEVICE_TYPE_KEY) != device.get(DEVICE_TYPE_KEY)
+            or old.get(DEVICE_NAME_KEY) != device.get(DEVICE_NAME_KEY)
+            or old_data.keys() != new_data.keys()
+        ):
+            return True, []
+        for sub_key, io_data in new_data.items():
+            if old_data[sub_key] != io_data and isinstance(io_data, dict):
+                messages.append(
+                    {
+                        DEVICE_ID_KEY: key[1],
+                        SUBDEVICE_INDEX_KEY: sub_key,
+                        HUB_ID_KEY: key[0],
+                        DEVICE_TYPE_KEY: device.get(DEVICE_TYPE_KEY),
+                        **io_data,
+                    }
+                )
+    return False, messages
@@ -112,6 +112,15 @@ RECOMMENDATION_GROUP = {
 }
 
 
+# 可通过重试解决的暂时性错误分类
+RETRYABLE_CATEGORIES = frozenset({"服务端错误", "网络问题"})
+
+
+def is_retryable_error(error_code: int) -> bool:
+    """根据错误码的分类判断错误是否是暂时性的、值得重试。"""
+    return get_error_advice(error_code)[2] in RETRYABLE_CATEGORIES
+
+
 def get_error_advice(error_code: int) -> Tuple[str, str, Optional[str]]:
     """根据错误码获取其描述、解决方案和分类。
 
@@ -48,6 +48,9 @@ from .const import (
     CONF_LIFESMART_USERID,
     CONF_LIFESMART_USERPASSWORD,
     CONF_LIFESMART_USERTOKEN,
+    CONF_LOCAL_AWAIT_ACK,
+    CONF_LOCAL_EXTRA_HOSTS,
+    CONF_LOCAL_FULL_CONFIG,
     DEVICE_ID_KEY,
     DEVICE_TYPE_KEY,
     DOMAIN,
@@ -57,8 +60,14 @@ from .const import (
     SUBDEVICE_INDEX_KEY,
 )
 from .core.client_base import LifeSmartClientBase
+from .core.local_connection_pool import (
+    LifeSmartLocalConnectionPool,
+    parse_gateway_hosts,
+)
 from .core.local_tcp_client import LifeSmartLocalTCPClient
+from .core.protocol import CONFIG_PROFILE_FULL, CONFIG_PROFILE_MINIMAL
 from .core.openapi_client import LifeSmartOAPIClient
+from .device_snapshot import LifeSmartDeviceSnapshot, diff_devices
 from .exceptions import LifeSmartAPIError, LifeSmartAuthError
 from .helpers import generate_unique_id
 
@@ -79,6 +88,8 @@ class LifeSmartHub:
         _state_manager: WebSocket 状态管理器（仅 OAPI 模式）
         _local_task: 本地连接任务（仅本地模式）
         _refresh_task_unsub: 定时刷新任务取消函数
+        _snapshot: 持久化的设备列表快照
+        _reconcile_task: 使用快照启动后与实时设备列表对账的后台任务
     """
 
     def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
@@ -95,6 +106,10 @@ class LifeSmartHub:
         self._state_manager: Optional[LifeSmartStateManager] = None
         self._local_task: Optional[asyncio.Task] = None
         self._refresh_task_unsub: Optional[callable] = None
+        self._snapshot = LifeSmartDeviceSnapshot(hass, config_entry.entry_id)
+        # 设备列表来自快照时为 True，需要在后台与实时设备列表对账
+        self._from_snapshot = False
+        self._reconcile_task: Optional[asyncio.Task] = None
 
     async def async_setup(self) -> bool:
         """异步设置 Hub，包括客户端创建、设备获取和后台任务启动。
@@ -126,6 +141,9 @@ class LifeSmartHub:
     async def _async_create_client_and_get_devices(self) -> Optional[dict]:
         """创建客户端并获取设备列表。
 
+        存在设备快照时直接使用快照中的设备列表，不等待网关或云端返回；实时设备
+        列表由 `start_snapshot_reconcile` 启动的后台任务获取并对账。
+
         Returns:
             认证响应数据（OAPI 模式）或 None（本地模式）
 
@@ -136,21 +154,28 @@ class LifeSmartHub:
         config_data = self.config_entry.data.copy()
         conn_type = config_data.get(CONF_TYPE, CONN_CLASS_CLOUD_PUSH)
         auth_response = None
+        snapshot = await self._snapshot.async_load()
 
         if conn_type == CONN_CLASS_CLOUD_PUSH:
             # OAPI 模式
-            auth_response = await self._setup_oapi_client(config_data)
+            auth_response = await self._setup_oapi_client(config_data, snapshot)
         else:
             # 本地模式
-            await self._setup_local_client()
+            await self._setup_local_client(snapshot)
 
+        self._from_snapshot = snapshot is not None
+        if not self._from_snapshot:
+            await self._snapshot.async_save(self.devices)
         return auth_response
 
-    async def _setup_oapi_client(self, config_data: dict) -> dict:
+    async def _setup_oapi_client(
+        self, config_data: dict, snapshot: Optional[list[dict]] = None
+    ) -> dict:
         """设置 OAPI 客户端。
 
         Args:
             config_data: 配置数据
+            snapshot: 设备快照，存在时不再等待 EpGetAll
 
         Returns:
             认证响应数据
@@ -168,13 +193,18 @@ class LifeSmartHub:
                 config_data.get(CONF_LIFESMART_USERTOKEN),
                 config_data.get(CONF_LIFESMART_USERID),
                 config_data.get(CONF_LIFESMART_USERPASSWORD),
+                # 同一时刻的多条实体指令 (例如灯组) 合并为一次 EpBatchSet
+                batch_window=LifeSmartOAPIClient.COMMAND_BATCH_WINDOW,
             )
 
             # 处理认证和令牌刷新
             auth_response = await self._handle_oapi_authentication(config_data)
 
             # 获取设备列表
-            self.devices = await self.client.async_get_all_devices()
+            if snapshot is not None:
+                self.devices = snapshot
+            else:
+                self.devices = await self.client.async_get_all_devices()
             return auth_response
 
         except LifeSmartAuthError as e:
@@ -219,20 +249,53 @@ class LifeSmartHub:
 
         return auth_response
 
-    async def _setup_local_client(self) -> None:
+    async def _setup_local_client(self, snapshot: Optional[list[dict]] = None) -> None:
         """设置本地 TCP 客户端。
 
+        配置了额外网关时，使用连接池在同一个 Hub 下管理所有网关的连接。
+        选项中开启了等待应答时，指令在中枢返回对应 `_sel` 的应答后才视为成功。
+        get-config 默认只请求平台需要的字段；选项中开启了完整配置时请求全部字段，
+        便于排查设备问题。
+
+        Args:
+            snapshot: 设备快照，存在时不再等待网关加载设备
+
         Raises:
             ConfigEntryNotReady: 连接失败
         """
+        data = self.config_entry.data
+        options = self.config_entry.options
+        await_ack = options.get(CONF_LOCAL_AWAIT_ACK, False)
+        config_profile = (
+            CONFIG_PROFILE_FULL
+            if options.get(CONF_LOCAL_FULL_CONFIG, False)
+            else CONFIG_PROFILE_MINIMAL
+        )
         try:
-            self.client = LifeSmartLocalTCPClient(
-                self.config_entry.data[CONF_HOST],
-                self.config_entry.data[CONF_PORT],
-                self.config_entry.data[CONF_USERNAME],
-                self.config_entry.data[CONF_PASSWORD],
-                self.config_entry.entry_id,
+            extra_hosts = parse_gateway_hosts(
+                data.get(CONF_LOCAL_EXTRA_HOSTS, ""), data[CONF_PORT]
             )
+            if extra_hosts:
+                self.client = LifeSmartLocalConnectionPool(
+                    [(data[CONF_HOST], data[CONF_PORT]), *extra_hosts],
+                    data[CONF_USERNAME],
+                    data[CONF_PASSWORD],
+                    self.config_entry.entry_id,
+                    await_ack=await_ack,
+                    config_profile=config_profile,
+                )
+            else:
+                self.client = LifeSmartLocalTCPClient(
+                    data[CONF_HOST],
+                    data[CONF_PORT],
+                    data[CONF_USERNAME],
+                    data[CONF_PASSWORD],
+                    self.config_entry.entry_id,
+                    await_ack=await_ack,
+                    config_profile=config_profile,
+                )
+            # 被排除设备的实时推送在解码阶段即被跳过
+            self.client.set_exclude_filter(*self.get_exclude_config())
 
             # 创建连接任务
             self._local_task = self.hass.async_create_task(
@@ -240,6 +303,9 @@ class LifeSmartHub:
             )
 
             # 获取设备列表
+            if snapshot is not None:
+                self.devices = snapshot
+                return
             self.devices = await self.client.async_get_all_devices()
             if not self.devices:
                 await self._cleanup_local_task()
@@ -253,9 +319,18 @@ class LifeSmartHub:
     async def _local_update_callback(self, data: dict) -> None:
         """本地连接的数据更新回调函数。
 
+        设备被删除、重连后设备列表变化或有网关迟到就绪时，本地连接发送
+        `{"reload": True}`，此时重新加载配置条目以重建实体。
+
         Args:
             data: 接收到的数据
         """
+        if data.get("reload"):
+            _LOGGER.info("本地设备列表发生变化，将重新加载集成以更新实体。")
+            self.hass.async_create_task(
+                self.hass.config_entries.async_reload(self.config_entry.entry_id)
+            )
+            return
         await self.data_update_handler(data)
 
     async def _cleanup_local_task(self) -> None:
@@ -309,6 +384,47 @@ class LifeSmartHub:
 
             self._state_manager.start()
 
+    def start_snapshot_reconcile(self) -> None:
+        """设备列表来自快照时，启动与实时设备列表对账的后台任务。
+
+        应在平台实体创建之后调用，以便对账得到的 IO 更新能送达实体。
+        """
+        if self._from_snapshot and not self._reconcile_task:
+            self._reconcile_task = self.hass.async_create_task(
+                self._async_reconcile_snapshot()
+            )
+
+    async def _async_reconcile_snapshot(self) -> None:
+        """获取实时设备列表，与快照比较后只应用差异。
+
+        设备被添加、删除或重命名时重新加载配置条目以重建实体，否则只分发值
+        发生变化的 IO。获取失败时继续使用快照，由定时刷新稍后更新。
+        """
+        try:
+            live = await self.client.async_get_all_devices()
+        except (LifeSmartAPIError, LifeSmartAuthError) as e:
+            _LOGGER.warning("获取实时设备列表失败，暂时继续使用设备快照: %s", e)
+            return
+        if not live:
+            _LOGGER.warning("未能获取实时设备列表，暂时继续使用设备快照。")
+            return
+
+        structure_changed, messages = diff_devices(self.devices, live)
+        # 原地替换，hass.data 中引用的设备列表同时更新
+        self.devices[:] = live
+        self._from_snapshot = False
+        await self._snapshot.async_save(live)
+
+        if structure_changed:
+            _LOGGER.info("实时设备列表与快照不一致，将重新加载集成以更新实体。")
+            self.hass.async_create_task(
+                self.hass.config_entries.async_reload(self.config_entry.entry_id)
+            )
+            return
+        for msg in messages:
+            await self.data_update_handler({"msg": msg})
+        _LOGGER.info("设备快照对账完成，%d 个 IO 的状态已更新。", len(messages))
+
     async def _async_periodic_refresh(self, now=None) -> None:
         """定时刷新设备数据。
 
@@ -319,6 +435,7 @@ class LifeSmartHub:
             _LOGGER.debug("开始定时刷新设备数据。")
             new_devices = await self.client.async_get_all_devices()
             self.devices = new_devices
+            await self._snapshot.async_save(new_devices)
             dispatcher_send(self.hass, LIFESMART_SIGNAL_UPDATE_ENTITY)
             _LOGGER.debug("全局设备数据刷新完成。")
         except (LifeSmartAPIError, LifeSmartAuthError) as e:
@@ -353,8 +470,8 @@ class LifeSmartHub:
                 self._handle_ai_event(data, device_id, hub_id)
                 return
 
-            # 分发普通设备更新
-            unique_id = generate_unique_id(
+            # 分发普通设备更新；本地客户端的消息已附带预先计算的 unique_id
+            unique_id = raw_data.get("unique_id") or generate_unique_id(
                 device_type, hub_id, device_id, sub_device_key
             )
             dispatcher_send(
@@ -364,7 +481,7 @@ class LifeSmartHub:
             _LOGGER.debug(
                 "状态更新已派发 -> %s: %s",
                 unique_id,
-                json.dumps(data, ensure_ascii=False),
+                json.dumps(dict(data), ensure_ascii=False),
             )
 
         except Exception as e:
@@ -423,6 +540,10 @@ class LifeSmartHub:
         if self._refresh_task_unsub:
             self._refresh_task_unsub()
 
+        # 停止快照对账任务
+        if self._reconcile_task and not self._reconcile_task.done():
+            self._reconcile_task.cancel()
+
         # 停止 WebSocket 状态管理器
         if self._state_manager:
             await self._state_manager.stop()
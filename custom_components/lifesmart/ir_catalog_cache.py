@@ -0,0 +1,181 @@
+"""LifeSmart 红外码库目录的持久化缓存。
+
+红外遥控器的种类、品牌、型号索引与遥控器特性是几乎不变的云端码库数据。
+缓存按请求 (方法 + 参数) 保存在 HA 的 `.storage/lifesmart.ir_catalog` 中，由
+所有配置条目与配置流程共享：命中时直接返回，不访问网络；条目超过有效期后
+仍先返回旧数据，同时在后台重新获取 (stale-while-revalidate)。条目数超过上限时
+淘汰最久未使用的条目。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.ir_catalog"
+DATA_IR_CATALOG_CACHE = f"{DOMAIN}_ir_catalog_cache"
+
+
+def get_ir_catalog_cache(hass: HomeAssistant) -> LifeSmartIRCatalogCache:
+    """返回该 Home Assistant 实例共享的红外码库缓存，首次调用时创建。"""
+    cache = hass.data.get(DATA_IR_CATALOG_CACHE)
+    if cache is None:
+        cache = hass.data[DATA_IR_CATALOG_CACHE] = LifeSmartIRCatalogCache(hass)
+    return cache
+
+
+class LifeSmartIRCatalogCache:
+    """带有效期与 LRU 淘汰的红外码库缓存。
+
+    `async_get()` 首次使用时从磁盘读取缓存；写入通过 `Store.async_delay_save`
+    合并，避免配置流程连续查询时频繁写盘。空结果不会被缓存，以免一次失败的
+    查询在有效期内一直返回空列表。读写磁盘失败只记录日志，此时缓存仅在内存中
+    有效。
+    """
+
+    TTL = 7 * 24 * 3600
+    MAX_ENTRIES = 512
+    SAVE_DELAY = 10
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """初始化红外码库缓存。
+
+        Args:
+            hass: Home Assistant 核心实例
+        """
+        self.hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # 请求键 -> {"method", "params", "data", "fetched_at"}，按最近使用顺序排列
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._load_task: asyncio.Task | None = None
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def make_key(method: str, params: dict[str, Any]) -> str:
+        """由 API 方法与参数生成缓存键。"""
+        return f"{method}:{json.dumps(params, sort_keys=True)}"
+
+    async def async_get(
+        self,
+        method: str,
+        params: dict[str, Any],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """返回缓存的结果，未命中时调用 `fetch()` 获取并缓存。
+
+        条目已过期时仍返回旧数据，并在后台调用 `fetch()` 刷新。
+        """
+        await self._async_ensure_loaded()
+        key = self.make_key(method, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            data = await fetch()
+            self._put(method, params, data)
+            return data
+
+        self._entries.move_to_end(key)
+        if time.time() - entry["fetched_at"] > self.TTL:
+            self._revalidate(method, params, fetch)
+        return entry["data"]
+
+    async def async_invalidate(self, category: str | None = None) -> int:
+        """删除缓存条目，指定 `category` 时只删除该种类的条目。
+
+        Returns:
+            被删除的条目数
+        """
+        await self._async_ensure_loaded()
+        keys = [
+            key
+            for key, entry in self._entries.items()
+            if category is None or entry["params"].get("category") == category
+        ]
+        for key in keys:
+            del self._entries[key]
+        if keys:
+            self._schedule_save()
+        _LOGGER.info("已清除 %d 条红外码库缓存。", len(keys))
+        return len(keys)
+
+    async def _async_ensure_loaded(self) -> None:
+        """首次使用时从磁盘读取缓存，并发调用共享同一次读取。"""
+        if self._load_task is None:
+            self._load_task = asyncio.get_running_loop().create_task(self._async_load())
+        await asyncio.shield(self._load_task)
+
+    async def _async_load(self) -> None:
+        """从磁盘读取缓存条目。"""
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning("读取红外码库缓存失败，将重新从云端获取: %s", e)
+            return
+        entries = data.get("entries") if isinstance(data, dict) else None
+        for item in entries or []:
+            try:
+                key = self.make_key(item["method"], item["params"])
+                self._entries[key] = {
+                    "method": item["method"],
+                    "params": item["params"],
+                    "data": item["data"],
+                    "fetched_at": float(item["fetched_at"]),
+                }
+            except (KeyError, TypeError, ValueError):
+                continue
+        _LOGGER.debug("已读取 %d 条红外码库缓存。", len(self._entries))
+
+    def _put(self, method: str, params: dict[str, Any], data: Any) -> None:
+        """写入一个条目，超过上限时淘汰最久未使用的条目。"""
+        if not data:
+            return
+        key = self.make_key(method, params)
+        self._entries[key] = {
+            "method": method,
+            "params": params,
+            "data": data,
+            "fetched_at": time.time(),
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+        self._schedule_save()
+
+    def _revalidate(
+        self, method: str, params: dict[str, Any], fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """在后台重新获取一个过期条目，同一条目同时只有一个刷新任务。"""
+        key = self.make_key(method, params)
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                self._put(method, params, await fetch())
+            except Exception as e:
+                _LOGGER.debug("后台刷新红外码库缓存 %s 失败: %s", key, e)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = self.hass.async_create_background_task(
+            refresh(), f"{DOMAIN} ir catalog refresh"
+        )
+
+    def _schedule_save(self) -> None:
+        """延迟保存缓存，合并短时间内的多次写入。"""
+        self._store.async_delay_save(self._data_to_save, self.SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """按最近使用顺序导出所有条目。"""
+        return {"entries": list(self._entries.values())}
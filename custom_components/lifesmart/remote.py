@@ -86,9 +86,22 @@ class LifeSmartRemoteEntity(RemoteEntity):
         self._attr_is_on = True
 
     async def async_added_to_hass(self) -> None:
-        """实体添加到 Home Assistant 时的初始化。"""
+        """实体添加到 Home Assistant 时的初始化。
+
+        按键列表在后台获取 (通常直接命中红外码库缓存)，获取完成前使用该类别的
+        默认按键，实体的添加不等待网络请求。
+        """
         await super().async_added_to_hass()
 
+        self._available_keys = self._get_default_keys()
+        task = self.hass.async_create_background_task(
+            self._async_load_available_keys(),
+            f"{DOMAIN} remote {self._remote_id} keys",
+        )
+        self.async_on_remove(task.cancel)
+
+    async def _async_load_available_keys(self) -> None:
+        """获取遥控器支持的按键列表并更新实体状态。"""
         try:
             # 获取遥控器支持的按键列表
             features = await self._client.get_ir_remote_feature_async(
@@ -119,6 +132,7 @@ class LifeSmartRemoteEntity(RemoteEntity):
             )
             # 提供一些基本按键作为后备
             self._available_keys = self._get_default_keys()
+        self.async_write_ha_state()
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -13,6 +13,7 @@ from homeassistant.exceptions import PlatformNotReady, HomeAssistantError
 
 from .const import DEVICE_ID_KEY, HUB_ID_KEY, SUBDEVICE_INDEX_KEY, DOMAIN
 from .core.client_base import LifeSmartClientBase
+from .ir_catalog_cache import get_ir_catalog_cache
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,6 +51,10 @@ class LifeSmartServiceManager:
             self.hass.services.async_register(
                 DOMAIN, "press_switch", self._press_switch
             )
+        if not self.hass.services.has_service(DOMAIN, "invalidate_ir_catalog"):
+            self.hass.services.async_register(
+                DOMAIN, "invalidate_ir_catalog", self._invalidate_ir_catalog
+            )
         _LOGGER.info("LifeSmart 服务已注册完成。")
 
     async def _send_ir_keys(self, call: ServiceCall) -> None:
@@ -209,3 +214,13 @@ class LifeSmartServiceManager:
             _LOGGER.error("点动开关时发生Home Assistant错误: %s", e)
         except Exception as e:
             _LOGGER.error("点动开关失败: %s", e)
+
+    async def _invalidate_ir_catalog(self, call: ServiceCall) -> None:
+        """处理清除红外码库缓存的服务调用。
+
+        Args:
+            call: 服务调用对象，可选的 category 参数只清除该种类的缓存
+        """
+        await get_ir_catalog_cache(self.hass).async_invalidate(
+            call.data.get("category")
+        )
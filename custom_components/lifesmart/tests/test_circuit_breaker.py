@@ -0,0 +1,89 @@
+"""
+LifeSmart 云端接口熔断器测试套件。
+
+此测试文件专门测试 core/circuit_breaker.py 中的熔断器，包括：
+- 连续故障达到阈值时熔断，熔断期间请求立即失败
+- 正常响应清零故障计数
+- 后台探测成功后恢复，探测失败时间隔加倍
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.lifesmart.core.circuit_breaker import LifeSmartCircuitBreaker
+from custom_components.lifesmart.exceptions import LifeSmartAPIError
+
+
+def make_breaker(probe, **kwargs) -> LifeSmartCircuitBreaker:
+    """创建一个阈值为 2、探测间隔很短的熔断器。"""
+    options = {"failure_threshold": 2, "reset_timeout": 0.01}
+    options.update(kwargs)
+    return LifeSmartCircuitBreaker("/api", probe, **options)
+
+
+class TestTripping:
+    """测试熔断条件。"""
+
+    @pytest.mark.asyncio
+    async def test_trips_after_consecutive_failures(self):
+        """测试连续故障达到阈值后熔断，并拒绝请求。"""
+        breaker = make_breaker(AsyncMock(return_value=False), reset_timeout=60)
+
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+
+        assert breaker.is_open
+        with pytest.raises(LifeSmartAPIError, match="暂时不可用"):
+            breaker.check()
+        assert breaker.stats.opens == 1
+        assert breaker.stats.rejected == 1
+        breaker.cancel()
+
+    @pytest.mark.asyncio
+    async def test_success_resets_failure_count(self):
+        """测试中间的正常响应使故障计数清零，不会熔断。"""
+        breaker = make_breaker(AsyncMock())
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert not breaker.is_open
+        breaker.check()
+
+
+class TestRecovery:
+    """测试后台探测与恢复。"""
+
+    @pytest.mark.asyncio
+    async def test_probe_closes_breaker(self):
+        """测试探测失败后继续探测，成功后恢复并接受请求。"""
+        probe = AsyncMock(side_effect=[False, RuntimeError("boom"), True])
+        breaker = make_breaker(probe)
+        breaker.record_failure()
+        breaker.record_failure()
+
+        await asyncio.wait_for(breaker._probe_task, timeout=1)
+
+        assert not breaker.is_open
+        assert probe.await_count == 3
+        assert breaker.stats.probes == 3
+        breaker.check()
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_probing(self):
+        """测试 cancel() 停止后台探测任务。"""
+        probe = AsyncMock(return_value=True)
+        breaker = make_breaker(probe, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_failure()
+        task = breaker._probe_task
+
+        breaker.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert task.cancelled()
+        probe.assert_not_awaited()
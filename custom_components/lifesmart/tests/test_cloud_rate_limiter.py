@@ -0,0 +1,144 @@
+"""
+LifeSmart 云端 API 限流器测试套件。
+
+此测试文件专门测试 core/cloud_rate_limiter.py 中的限流器，包括：
+- 并发上限与按优先级发放许可
+- 令牌桶的突发容量与补充速率
+- 排队过多时拒绝新请求
+- 服务器限流提示后的退避
+- 排队等待时间统计
+"""
+
+import asyncio
+
+import pytest
+
+from custom_components.lifesmart.core.cloud_rate_limiter import (
+    CloudPriority,
+    LifeSmartCloudRateLimiter,
+)
+from custom_components.lifesmart.exceptions import LifeSmartAPIError
+
+
+def make_limiter(**kwargs) -> LifeSmartCloudRateLimiter:
+    """创建一个默认不受令牌限制的限流器。"""
+    options = {"rate": 1000.0, "burst": 100, "max_concurrent": 1, "max_queue": 10}
+    options.update(kwargs)
+    return LifeSmartCloudRateLimiter(**options)
+
+
+class TestPriorityAndConcurrency:
+    """测试并发上限与优先级顺序。"""
+
+    @pytest.mark.asyncio
+    async def test_waiters_granted_by_priority(self):
+        """测试并发名额释放后按优先级发放许可，同优先级先到先得。"""
+        limiter = make_limiter()
+        order = []
+
+        async def request(name, priority):
+            async with limiter.slot(priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await limiter.acquire(CloudPriority.COMMAND)
+        tasks = [
+            asyncio.create_task(request("refresh", CloudPriority.BACKGROUND)),
+            asyncio.create_task(request("ir", CloudPriority.IR)),
+            asyncio.create_task(request("cmd1", CloudPriority.COMMAND)),
+            asyncio.create_task(request("cmd2", CloudPriority.COMMAND)),
+        ]
+        await asyncio.sleep(0)
+        assert limiter.active == 1
+        assert limiter.lane_depths() == {"command": 2, "ir": 1, "background": 1}
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["cmd1", "cmd2", "ir", "refresh"]
+        assert limiter.active == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """测试排队中被取消的请求不占用并发名额。"""
+        limiter = make_limiter()
+        await limiter.acquire(CloudPriority.COMMAND)
+        waiter = asyncio.create_task(limiter.acquire(CloudPriority.BACKGROUND))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+
+        await asyncio.wait_for(limiter.acquire(CloudPriority.COMMAND), timeout=1)
+        assert limiter.active == 1
+
+
+class TestTokenBucket:
+    """测试令牌桶与拒绝策略。"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_paced(self):
+        """测试突发容量用完后请求按补充速率放行，并记录排队等待时间。"""
+        limiter = make_limiter(rate=50.0, burst=2, max_concurrent=10)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        for _ in range(4):
+            await limiter.acquire(CloudPriority.COMMAND)
+
+        # 前 2 个立即放行，后 2 个各等待约 1/50 秒
+        assert loop.time() - start >= 0.03
+        assert limiter.stats.requests == 4
+        assert limiter.stats.max_wait > 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """测试排队请求达到上限时新请求被拒绝并计数。"""
+        limiter = make_limiter(max_queue=2)
+        await limiter.acquire(CloudPriority.COMMAND)
+        waiters = [
+            asyncio.create_task(limiter.acquire(CloudPriority.BACKGROUND))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(LifeSmartAPIError):
+            await limiter.acquire(CloudPriority.COMMAND)
+        assert limiter.stats.rejected == 1
+
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+
+class TestBackoff:
+    """测试服务器限流提示后的退避。"""
+
+    @pytest.mark.asyncio
+    async def test_throttle_pauses_grants(self):
+        """测试限流提示后在退避时间内不发放许可。"""
+        limiter = make_limiter(max_concurrent=10)
+        loop = asyncio.get_running_loop()
+        limiter.report_throttled(retry_after=0.05)
+        start = loop.time()
+
+        await limiter.acquire(CloudPriority.COMMAND)
+
+        assert loop.time() - start >= 0.04
+        assert limiter.stats.backoffs == 1
+
+    @pytest.mark.asyncio
+    async def test_backoff_doubles_until_success(self):
+        """测试连续的限流提示使退避时间加倍，成功后重置。"""
+        limiter = make_limiter()
+        limiter.INITIAL_BACKOFF = 0.0001
+
+        limiter.report_throttled()
+        limiter.report_throttled()
+        assert limiter._backoff == pytest.approx(0.0002)
+
+        limiter.report_success()
+        limiter.report_throttled()
+        assert limiter._backoff == pytest.approx(0.0001)
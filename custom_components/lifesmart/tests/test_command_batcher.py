@@ -0,0 +1,124 @@
+"""
+LifeSmart 云端指令微批处理器测试套件。
+
+此测试文件专门测试 core/command_batcher.py 中的批处理器，包括：
+- 窗口内的指令按中枢合并为一次请求
+- 条目数达到上限时立即发出
+- 按 me/idx 将失败条目分发给对应的调用方
+- 整批失败时所有调用方收到同一个异常
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.lifesmart.core.command_batcher import LifeSmartCommandBatcher
+from custom_components.lifesmart.exceptions import LifeSmartAPIError
+
+
+def io(me: str, idx: str = "L1", val: int = 1) -> dict:
+    """构造一个 IO 条目。"""
+    return {"me": me, "idx": idx, "type": 0x81 if val else 0x80, "val": val}
+
+
+@pytest.fixture
+def send_batch():
+    """模拟 EpBatchSet 调用，默认全部成功。"""
+    return AsyncMock(return_value=[])
+
+
+class TestBatching:
+    """测试窗口内指令的合并。"""
+
+    @pytest.mark.asyncio
+    async def test_commands_within_window_share_one_call(self, send_batch):
+        """测试同一中枢的多条指令在窗口结束时合并为一次请求，按到达顺序排列。"""
+        batcher = LifeSmartCommandBatcher(send_batch, window=0.01)
+
+        results = await asyncio.gather(
+            *(batcher.submit("agt1", [io(f"dev{i}")]) for i in range(25))
+        )
+
+        assert results == [[]] * 25
+        send_batch.assert_awaited_once_with("agt1", [io(f"dev{i}") for i in range(25)])
+        assert batcher.stats.batches == 1
+        assert batcher.stats.commands_per_batch == 25
+
+    @pytest.mark.asyncio
+    async def test_one_call_per_hub(self, send_batch):
+        """测试不同中枢的指令分别发出，每个中枢一次请求。"""
+        batcher = LifeSmartCommandBatcher(send_batch, window=0.01)
+
+        await asyncio.gather(
+            batcher.submit("agt1", [io("a")]),
+            batcher.submit("agt2", [io("b")]),
+            batcher.submit("agt1", [io("c"), io("c", "L2")]),
+        )
+
+        calls = {call.args[0]: call.args[1] for call in send_batch.await_args_list}
+        assert calls == {
+            "agt1": [io("a"), io("c"), io("c", "L2")],
+            "agt2": [io("b")],
+        }
+
+    @pytest.mark.asyncio
+    async def test_full_batch_sent_immediately(self, send_batch):
+        """测试条目数达到 MAX_ITEMS 时不等窗口结束立即发出。"""
+        batcher = LifeSmartCommandBatcher(send_batch, window=60)
+        batcher.MAX_ITEMS = 3
+
+        await asyncio.wait_for(
+            asyncio.gather(
+                batcher.submit("agt1", [io("a"), io("b")]),
+                batcher.submit("agt1", [io("c")]),
+            ),
+            timeout=1,
+        )
+
+        send_batch.assert_awaited_once()
+        assert batcher._timers == {}, "提前发出后应取消窗口定时器"
+
+
+class TestResults:
+    """测试结果分发。"""
+
+    @pytest.mark.asyncio
+    async def test_failed_items_returned_to_their_caller(self, send_batch):
+        """测试服务器报告的失败条目只返回给对应的调用方。"""
+        send_batch.return_value = [{**io("b"), "ret": 10013, "retMsg": "ENR"}]
+        batcher = LifeSmartCommandBatcher(send_batch, window=0.01)
+
+        ok, failed = await asyncio.gather(
+            batcher.submit("agt1", [io("a")]), batcher.submit("agt1", [io("b")])
+        )
+
+        assert ok == []
+        assert [item["ret"] for item in failed] == [10013]
+
+    @pytest.mark.asyncio
+    async def test_batch_error_propagates_to_all_callers(self, send_batch):
+        """测试整批请求失败时所有调用方收到同一个异常。"""
+        error = LifeSmartAPIError("网络请求失败")
+        send_batch.side_effect = error
+        batcher = LifeSmartCommandBatcher(send_batch, window=0.01)
+
+        results = await asyncio.gather(
+            batcher.submit("agt1", [io("a")]),
+            batcher.submit("agt1", [io("b")]),
+            return_exceptions=True,
+        )
+
+        assert results == [error, error]
+        assert batcher.stats.failed_batches == 1
+
+    @pytest.mark.asyncio
+    async def test_async_flush(self, send_batch):
+        """测试 async_flush 立即发出排队的条目并等待完成。"""
+        batcher = LifeSmartCommandBatcher(send_batch, window=60)
+        pending = asyncio.create_task(batcher.submit("agt1", [io("a")]))
+        await asyncio.sleep(0)
+
+        await batcher.async_flush()
+
+        assert pending.done() and pending.result() == []
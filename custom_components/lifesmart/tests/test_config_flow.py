@@ -39,6 +39,9 @@ from custom_components.lifesmart.const import (
     CONF_LIFESMART_USERID,
     CONF_LIFESMART_USERPASSWORD,
     CONF_LIFESMART_USERTOKEN,
+    CONF_LOCAL_AWAIT_ACK,
+    CONF_LOCAL_EXTRA_HOSTS,
+    CONF_LOCAL_FULL_CONFIG,
     DOMAIN,
 )
 from custom_components.lifesmart.exceptions import LifeSmartAuthError
@@ -337,6 +340,45 @@ class TestLocalFlow:
             CONF_TYPE: config_entries.CONN_CLASS_LOCAL_PUSH,
         }, "配置数据应该正确"
 
+    @pytest.mark.asyncio
+    async def test_local_connection_invalid_extra_hosts(self, hass: HomeAssistant):
+        """测试额外网关列表格式错误时不尝试连接并提示错误。"""
+        result = await self._start_local_flow(hass)
+
+        with patch(
+            "custom_components.lifesmart.core.local_tcp_client.LifeSmartLocalTCPClient.check_login",
+        ) as mock_login:
+            result = await hass.config_entries.flow.async_configure(
+                result["flow_id"],
+                {**MOCK_LOCAL_CREDENTIALS, CONF_LOCAL_EXTRA_HOSTS: "192.168.1.101:abc"},
+            )
+
+        assert result["type"] == FlowResultType.FORM, "应该重新显示表单"
+        assert result["errors"] == {
+            CONF_LOCAL_EXTRA_HOSTS: "invalid_extra_hosts"
+        }, "应该在额外网关字段上显示格式错误"
+        mock_login.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_local_connection_extra_host_unreachable(self, hass: HomeAssistant):
+        """测试每个额外网关都会尝试登录，连接失败时在额外网关字段上提示。"""
+        result = await self._start_local_flow(hass)
+
+        with patch(
+            "custom_components.lifesmart.core.local_tcp_client.LifeSmartLocalTCPClient.check_login",
+            side_effect=[True, OSError("unreachable")],
+        ) as mock_login:
+            result = await hass.config_entries.flow.async_configure(
+                result["flow_id"],
+                {**MOCK_LOCAL_CREDENTIALS, CONF_LOCAL_EXTRA_HOSTS: "[fd00::2]:3000"},
+            )
+
+        assert result["type"] == FlowResultType.FORM, "应该重新显示表单"
+        assert result["errors"] == {
+            CONF_LOCAL_EXTRA_HOSTS: "cannot_connect"
+        }, "应该在额外网关字段上显示连接错误"
+        assert mock_login.call_count == 2, "主网关与额外网关都应该尝试登录"
+
     @pytest.mark.asyncio
     async def test_local_connection_auth_error(self, hass: HomeAssistant):
         """测试本地连接认证失败。"""
@@ -677,6 +719,9 @@ class TestOptionsFlow:
         result = await hass.config_entries.options.async_configure(
             result["flow_id"], user_input={"next_step_id": "main_params"}
         )
+        assert (
+            CONF_LOCAL_AWAIT_ACK not in result["data_schema"].schema
+        ), "云端模式不应显示本地指令应答选项"
 
         # 更新排除列表
         result = await hass.config_entries.options.async_configure(
@@ -730,6 +775,36 @@ class TestOptionsFlow:
         assert result["type"] == FlowResultType.MENU, "应该显示菜单"
         assert result["menu_options"] == ["main_params"], "本地模式只应该显示主要参数"
 
+    @pytest.mark.asyncio
+    async def test_options_local_mode_await_ack(self, hass: HomeAssistant):
+        """测试本地模式的主要参数可以开启指令应答等待与完整配置。"""
+        local_config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_TYPE: config_entries.CONN_CLASS_LOCAL_PUSH,
+                **MOCK_LOCAL_CREDENTIALS,
+            },
+        )
+        local_config_entry.add_to_hass(hass)
+
+        result = await hass.config_entries.options.async_init(
+            local_config_entry.entry_id
+        )
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"], user_input={"next_step_id": "main_params"}
+        )
+        assert CONF_LOCAL_AWAIT_ACK in result["data_schema"].schema
+        assert CONF_LOCAL_FULL_CONFIG in result["data_schema"].schema
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={CONF_LOCAL_AWAIT_ACK: True, CONF_LOCAL_FULL_CONFIG: True},
+        )
+
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert local_config_entry.options[CONF_LOCAL_AWAIT_ACK] is True
+        assert local_config_entry.options[CONF_LOCAL_FULL_CONFIG] is True
+
 
 # ==================== 边界条件测试 ====================
 
@@ -750,7 +825,9 @@ class TestEdgeCases:
             CONF_REGION: "cn2",
         }
 
-        with patch("custom_components.lifesmart.config_flow.LifeSmartOAPIClient") as client_cls:
+        with patch(
+            "custom_components.lifesmart.config_flow.LifeSmartOAPIClient"
+        ) as client_cls:
             mock_client = client_cls.return_value
             mock_client.login_async = AsyncMock(
                 return_value={
@@ -0,0 +1,300 @@
+"""
+LifeSmart 设备快照测试套件。
+
+此测试文件专门测试 device_snapshot.py 以及 Hub 使用快照启动的流程，包括：
+- 快照的保存、读取与删除
+- 本地 IO 中的 bytes 以 JSON 安全的形式保存并在读取时还原
+- 快照与实时设备列表的差异比较
+- 存在快照时 Hub 不等待设备列表即完成设置
+- 后台对账只应用差异，结构变化时重新加载
+"""
+
+import copy
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.config_entries import CONN_CLASS_CLOUD_PUSH
+from homeassistant.const import CONF_TYPE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.lifesmart.const import (
+    CONF_LIFESMART_APPKEY,
+    CONF_LIFESMART_APPTOKEN,
+    CONF_LIFESMART_AUTH_METHOD,
+    CONF_LIFESMART_USERID,
+    CONF_LIFESMART_USERTOKEN,
+    DEVICE_DATA_KEY,
+    DEVICE_ID_KEY,
+    DEVICE_NAME_KEY,
+    DEVICE_TYPE_KEY,
+    DOMAIN,
+    HUB_ID_KEY,
+    SUBDEVICE_INDEX_KEY,
+)
+from custom_components.lifesmart.device_snapshot import (
+    LifeSmartDeviceSnapshot,
+    diff_devices,
+)
+from custom_components.lifesmart.exceptions import LifeSmartAPIError
+from custom_components.lifesmart.hub import LifeSmartHub
+from .test_utils import create_mock_oapi_client
+
+
+def make_device(me: str = "dev1", val: int = 0, name: str = "开关") -> dict:
+    """构造一个只有 L1 IO 的开关设备。"""
+    return {
+        HUB_ID_KEY: "hub1",
+        DEVICE_ID_KEY: me,
+        DEVICE_TYPE_KEY: "SL_SW_IF1",
+        DEVICE_NAME_KEY: name,
+        DEVICE_DATA_KEY: {"L1": {"type": 128 + val, "val": val}},
+    }
+
+
+@pytest.fixture
+def mock_config_entry_oapi():
+    """提供 OAPI 模式的配置条目。"""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_TYPE: CONN_CLASS_CLOUD_PUSH,
+            CONF_LIFESMART_APPKEY: "test_appkey",
+            CONF_LIFESMART_APPTOKEN: "test_apptoken",
+            CONF_LIFESMART_USERID: "test_userid",
+            CONF_LIFESMART_USERTOKEN: "test_usertoken",
+            CONF_LIFESMART_AUTH_METHOD: "token",
+        },
+        entry_id="test_entry_snapshot",
+    )
+
+
+class TestSnapshotStore:
+    """测试快照的持久化。"""
+
+    @pytest.mark.asyncio
+    async def test_save_load_remove(self, hass: HomeAssistant):
+        """测试保存后可以读回，删除后不再有快照。"""
+        snapshot = LifeSmartDeviceSnapshot(hass, "entry1")
+        assert await snapshot.async_load() is None
+
+        await snapshot.async_save([make_device()])
+        assert await LifeSmartDeviceSnapshot(hass, "entry1").async_load() == [
+            make_device()
+        ]
+
+        await snapshot.async_remove()
+        assert await snapshot.async_load() is None
+
+    @pytest.mark.asyncio
+    async def test_empty_list_keeps_previous_snapshot(self, hass: HomeAssistant):
+        """测试空设备列表不会覆盖已有快照。"""
+        snapshot = LifeSmartDeviceSnapshot(hass, "entry1")
+        await snapshot.async_save([make_device()])
+        await snapshot.async_save([])
+
+        assert await snapshot.async_load() == [make_device()]
+
+    @pytest.mark.asyncio
+    async def test_local_hex_io_round_trip(self, hass: HomeAssistant):
+        """测试本地 HEX IO 的 bytes 保存为 JSON 安全的值，读取时还原。"""
+        device = make_device()
+        device[DEVICE_DATA_KEY]["P1"] = {
+            "type": "HEX",
+            "index": 1,
+            "value": "0102030405060708",
+            "raw": bytes.fromhex("0102030405060708"),
+        }
+        device[DEVICE_DATA_KEY]["P2"] = {"type": 0, "val": b"\xff\xfe"}
+        snapshot = LifeSmartDeviceSnapshot(hass, "entry1")
+
+        with patch.object(snapshot._store, "async_save") as mock_save:
+            await snapshot.async_save([device])
+        stored = json.loads(json.dumps(mock_save.call_args.args[0]))
+        assert isinstance(device[DEVICE_DATA_KEY]["P1"]["raw"], bytes), "不应修改原列表"
+
+        with patch.object(snapshot._store, "async_load", return_value=stored):
+            assert await snapshot.async_load() == [device]
+
+    @pytest.mark.asyncio
+    async def test_load_failure_returns_none(self, hass: HomeAssistant):
+        """测试读取失败时回退为没有快照。"""
+        snapshot = LifeSmartDeviceSnapshot(hass, "entry1")
+        with patch.object(
+            snapshot._store, "async_load", side_effect=ValueError("损坏的快照")
+        ):
+            assert await snapshot.async_load() is None
+
+
+class TestDiffDevices:
+    """测试快照与实时设备列表的比较。"""
+
+    def test_identical_lists(self):
+        """测试设备列表相同时没有任何差异。"""
+        assert diff_devices([make_device()], [make_device()]) == (False, [])
+
+    def test_changed_io_produces_update_message(self):
+        """测试 IO 值变化时生成与实时推送格式一致的更新消息。"""
+        changed, messages = diff_devices(
+            [make_device("dev1"), make_device("dev2")],
+            [make_device("dev1", val=1), make_device("dev2")],
+        )
+
+        assert changed is False
+        assert messages == [
+            {
+                DEVICE_ID_KEY: "dev1",
+                SUBDEVICE_INDEX_KEY: "L1",
+                HUB_ID_KEY: "hub1",
+                DEVICE_TYPE_KEY: "SL_SW_IF1",
+                "type": 129,
+                "val": 1,
+            }
+        ]
+
+    @pytest.mark.parametrize(
+        "live",
+        [
+            [make_device("dev1"), make_device("dev2")],
+            [],
+            [make_device("dev1", name="新名称")],
+            [{**make_device(), DEVICE_TYPE_KEY: "SL_SW_IF2"}],
+            [
+                {
+                    **make_device(),
+                    DEVICE_DATA_KEY: {"L1": {"val": 0}, "L2": {"val": 0}},
+                }
+            ],
+        ],
+        ids=["device_added", "device_removed", "renamed", "type_changed", "io_added"],
+    )
+    def test_structure_change(self, live):
+        """测试设备增删、重命名或 IO 集合变化时需要重建实体。"""
+        assert diff_devices([make_device("dev1")], live) == (True, [])
+
+
+class TestHubSnapshotStartup:
+    """测试 Hub 使用快照启动与后台对账。"""
+
+    @pytest.mark.asyncio
+    async def test_setup_uses_snapshot(
+        self, hass: HomeAssistant, mock_config_entry_oapi
+    ):
+        """测试存在快照时设置流程不等待 EpGetAll。"""
+        mock_config_entry_oapi.add_to_hass(hass)
+        await LifeSmartDeviceSnapshot(hass, mock_config_entry_oapi.entry_id).async_save(
+            [make_device()]
+        )
+        hub = LifeSmartHub(hass, mock_config_entry_oapi)
+
+        with patch(
+            "custom_components.lifesmart.hub.LifeSmartOAPIClient"
+        ) as mock_client_cls:
+            mock_client = create_mock_oapi_client()
+            mock_client_cls.return_value = mock_client
+            mock_client.async_refresh_token.return_value = {
+                "usertoken": "test_usertoken",
+                "expiredtime": 9999999999,
+            }
+            auth_response = await hub._setup_oapi_client(
+                mock_config_entry_oapi.data.copy(),
+                await hub._snapshot.async_load(),
+            )
+
+        assert auth_response["usertoken"] == "test_usertoken"
+        assert hub.devices == [make_device()]
+        mock_client.async_get_all_devices.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_first_setup_saves_snapshot(
+        self, hass: HomeAssistant, mock_config_entry_oapi
+    ):
+        """测试没有快照时等待实时设备列表并保存快照，不启动对账。"""
+        mock_config_entry_oapi.add_to_hass(hass)
+        hub = LifeSmartHub(hass, mock_config_entry_oapi)
+
+        async def fake_setup(config_data, snapshot):
+            assert snapshot is None
+            hub.devices = [make_device()]
+            return {}
+
+        with patch.object(hub, "_setup_oapi_client", side_effect=fake_setup):
+            await hub._async_create_client_and_get_devices()
+
+        assert await hub._snapshot.async_load() == [make_device()]
+        hub.start_snapshot_reconcile()
+        assert hub._reconcile_task is None
+
+    @pytest.mark.asyncio
+    async def test_reconcile_applies_io_delta(
+        self, hass: HomeAssistant, mock_config_entry_oapi
+    ):
+        """测试对账只分发发生变化的 IO，并更新快照。"""
+        mock_config_entry_oapi.add_to_hass(hass)
+        hub = LifeSmartHub(hass, mock_config_entry_oapi)
+        devices = [make_device("dev1"), make_device("dev2")]
+        live = [make_device("dev1", val=1), make_device("dev2")]
+        hub.devices = devices
+        hub._from_snapshot = True
+        hub.client = create_mock_oapi_client()
+        hub.client.async_get_all_devices = AsyncMock(return_value=copy.deepcopy(live))
+
+        with (
+            patch.object(hub, "data_update_handler", AsyncMock()) as mock_handler,
+            patch.object(hass.config_entries, "async_reload") as mock_reload,
+        ):
+            hub.start_snapshot_reconcile()
+            await hub._reconcile_task
+
+        mock_handler.assert_awaited_once()
+        assert mock_handler.await_args.args[0]["msg"][DEVICE_ID_KEY] == "dev1"
+        mock_reload.assert_not_called()
+        # 原地更新，hass.data 中引用的列表同样可见
+        assert devices == live
+        assert await hub._snapshot.async_load() == live
+
+    @pytest.mark.asyncio
+    async def test_reconcile_reloads_on_structure_change(
+        self, hass: HomeAssistant, mock_config_entry_oapi
+    ):
+        """测试设备增删时重新加载配置条目而不逐个分发。"""
+        mock_config_entry_oapi.add_to_hass(hass)
+        hub = LifeSmartHub(hass, mock_config_entry_oapi)
+        hub.devices = [make_device("dev1")]
+        hub._from_snapshot = True
+        hub.client = create_mock_oapi_client()
+        hub.client.async_get_all_devices = AsyncMock(
+            return_value=[make_device("dev1"), make_device("dev2")]
+        )
+
+        with (
+            patch.object(hub, "data_update_handler", AsyncMock()) as mock_handler,
+            patch.object(
+                hass.config_entries, "async_reload", AsyncMock()
+            ) as mock_reload,
+        ):
+            await hub._async_reconcile_snapshot()
+            await hass.async_block_till_done()
+
+        mock_handler.assert_not_called()
+        mock_reload.assert_awaited_once_with(mock_config_entry_oapi.entry_id)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_failure_keeps_snapshot(
+        self, hass: HomeAssistant, mock_config_entry_oapi
+    ):
+        """测试获取实时设备列表失败时继续使用快照。"""
+        mock_config_entry_oapi.add_to_hass(hass)
+        hub = LifeSmartHub(hass, mock_config_entry_oapi)
+        hub.devices = [make_device()]
+        hub._from_snapshot = True
+        hub.client = create_mock_oapi_client()
+        hub.client.async_get_all_devices = AsyncMock(
+            side_effect=LifeSmartAPIError("网络错误")
+        )
+
+        await hub._async_reconcile_snapshot()
+
+        assert hub.devices == [make_device()]
+        assert hub._from_snapshot is True
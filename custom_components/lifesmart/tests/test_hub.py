@@ -11,6 +11,7 @@
 """
 
 import asyncio
+from types import MappingProxyType
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -32,16 +33,24 @@ from custom_components.lifesmart.const import (
     CONF_LIFESMART_AUTH_METHOD,
     CONF_LIFESMART_USERID,
     CONF_LIFESMART_USERTOKEN,
+    CONF_LOCAL_AWAIT_ACK,
+    CONF_LOCAL_EXTRA_HOSTS,
+    CONF_LOCAL_FULL_CONFIG,
     DEVICE_ID_KEY,
     DEVICE_TYPE_KEY,
     DOMAIN,
     HUB_ID_KEY,
+    LIFESMART_SIGNAL_UPDATE_ENTITY,
     SUBDEVICE_INDEX_KEY,
     CONF_EXCLUDE_ITEMS,
     CONF_EXCLUDE_AGTS,
     CONF_AI_INCLUDE_ITEMS,
     CONF_AI_INCLUDE_AGTS,
 )
+from custom_components.lifesmart.core.protocol import (
+    CONFIG_PROFILE_FULL,
+    CONFIG_PROFILE_MINIMAL,
+)
 from custom_components.lifesmart.exceptions import LifeSmartAPIError, LifeSmartAuthError
 from custom_components.lifesmart.hub import LifeSmartHub
 from .test_utils import create_mock_oapi_client
@@ -237,12 +246,136 @@ class TestLifeSmartHub:
         ) as mock_client_cls:
             mock_client = AsyncMock()
             mock_client_cls.return_value = mock_client
+            mock_client.set_exclude_filter = MagicMock()  # 同步方法
             mock_client.async_get_all_devices.return_value = []
             mock_client.start_tcp_listener.side_effect = Exception("TCP连接失败")
 
             with pytest.raises(ConfigEntryNotReady, match="从本地网关获取设备列表失败"):
                 await hub.async_setup()
 
+            mock_client.set_exclude_filter.assert_called_once_with(set(), set())
+
+    @pytest.mark.asyncio
+    async def test_local_extra_hosts_use_connection_pool(self, hass: HomeAssistant):
+        """测试配置了额外网关时使用多网关连接池。"""
+        mock_config_entry_local = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_TYPE: "local_push",
+                CONF_HOST: "192.168.1.100",
+                CONF_PORT: 8888,
+                CONF_USERNAME: "admin",
+                CONF_PASSWORD: "admin",
+                CONF_LOCAL_EXTRA_HOSTS: "192.168.1.101, 192.168.1.102:9000",
+            },
+        )
+        mock_config_entry_local.add_to_hass(hass)
+
+        hub = LifeSmartHub(hass, mock_config_entry_local)
+
+        with patch(
+            "custom_components.lifesmart.hub.LifeSmartLocalConnectionPool"
+        ) as mock_pool_cls:
+            mock_pool = AsyncMock()
+            mock_pool_cls.return_value = mock_pool
+            mock_pool.set_exclude_filter = MagicMock()  # 同步方法
+            mock_pool.async_get_all_devices.return_value = []
+
+            with pytest.raises(ConfigEntryNotReady):
+                await hub.async_setup()
+
+            mock_pool_cls.assert_called_once_with(
+                [
+                    ("192.168.1.100", 8888),
+                    ("192.168.1.101", 8888),
+                    ("192.168.1.102", 9000),
+                ],
+                "admin",
+                "admin",
+                mock_config_entry_local.entry_id,
+                await_ack=False,
+                config_profile=CONFIG_PROFILE_MINIMAL,
+            )
+            mock_pool.set_exclude_filter.assert_called_once_with(set(), set())
+
+    @pytest.mark.asyncio
+    async def test_local_await_ack_option(self, hass: HomeAssistant):
+        """测试选项中开启等待应答时，本地客户端等待指令应答。"""
+        mock_config_entry_local = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_TYPE: "local_push",
+                CONF_HOST: "192.168.1.100",
+                CONF_PORT: 8888,
+                CONF_USERNAME: "admin",
+                CONF_PASSWORD: "admin",
+            },
+            options={CONF_LOCAL_AWAIT_ACK: True},
+        )
+        mock_config_entry_local.add_to_hass(hass)
+        hub = LifeSmartHub(hass, mock_config_entry_local)
+
+        with patch(
+            "custom_components.lifesmart.hub.LifeSmartLocalTCPClient"
+        ) as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client_cls.return_value = mock_client
+            mock_client.set_exclude_filter = MagicMock()  # 同步方法
+            mock_client.async_get_all_devices.return_value = []
+
+            with pytest.raises(ConfigEntryNotReady):
+                await hub.async_setup()
+
+            assert mock_client_cls.call_args.kwargs["await_ack"] is True
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("options", "expected_profile"),
+        [
+            ({}, CONFIG_PROFILE_MINIMAL),
+            ({CONF_LOCAL_FULL_CONFIG: True}, CONFIG_PROFILE_FULL),
+        ],
+        ids=["Default", "FullConfigOption"],
+    )
+    async def test_local_config_profile_option(
+        self, hass: HomeAssistant, options, expected_profile
+    ):
+        """测试 get-config 的字段范围由选项决定，与日志级别无关。"""
+        mock_config_entry_local = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_TYPE: "local_push",
+                CONF_HOST: "192.168.1.100",
+                CONF_PORT: 8888,
+                CONF_USERNAME: "admin",
+                CONF_PASSWORD: "admin",
+            },
+            options=options,
+        )
+        mock_config_entry_local.add_to_hass(hass)
+        hub = LifeSmartHub(hass, mock_config_entry_local)
+
+        with (
+            patch(
+                "custom_components.lifesmart.hub.LifeSmartLocalTCPClient"
+            ) as mock_client_cls,
+            patch(
+                "custom_components.lifesmart.hub._LOGGER.isEnabledFor",
+                return_value=True,
+            ),
+        ):
+            mock_client = AsyncMock()
+            mock_client_cls.return_value = mock_client
+            mock_client.set_exclude_filter = MagicMock()  # 同步方法
+            mock_client.async_get_all_devices.return_value = []
+
+            with pytest.raises(ConfigEntryNotReady):
+                await hub.async_setup()
+
+            assert (
+                mock_client_cls.call_args.kwargs["config_profile"] == expected_profile
+            )
+
     @pytest.mark.asyncio
     async def test_token_refresh_task_creation(
         self, hass: HomeAssistant, mock_config_entry_oapi
@@ -438,6 +571,9 @@ class TestLifeSmartHub:
                 assert hub.client == mock_client, "Hub的客户端应该被正确设置"
                 assert hub.devices == mock_devices, "Hub的设备列表应该被正确设置"
                 assert hub._local_task == real_task, "本地任务应该被正确设置"
+                mock_client.set_exclude_filter.assert_called_once_with(
+                    *hub.get_exclude_config()
+                )
 
                 # 清理资源
                 await hub.async_unload()
@@ -540,6 +676,37 @@ class TestLifeSmartHub:
             await hub.data_update_handler(ai_data)
             mock_ai_handler.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_data_update_handler_local_view(
+        self, hass: HomeAssistant, mock_config_entry_oapi
+    ):
+        """测试本地客户端的只读消息视图使用其附带的 unique_id 派发。"""
+        mock_config_entry_oapi.add_to_hass(hass)
+        hub = LifeSmartHub(hass, mock_config_entry_oapi)
+        msg = MappingProxyType(
+            {
+                DEVICE_TYPE_KEY: "SL_SW",
+                HUB_ID_KEY: "hub1",
+                DEVICE_ID_KEY: "dev1",
+                SUBDEVICE_INDEX_KEY: "L1",
+            }
+        )
+
+        with (
+            patch("custom_components.lifesmart.hub.dispatcher_send") as mock_dispatcher,
+            patch(
+                "custom_components.lifesmart.hub.generate_unique_id"
+            ) as mock_generate,
+        ):
+            await hub.data_update_handler(
+                {"msg": msg, "unique_id": "sl_sw_hub1_dev1_l1"}
+            )
+
+        mock_generate.assert_not_called()
+        mock_dispatcher.assert_called_once_with(
+            hass, f"{LIFESMART_SIGNAL_UPDATE_ENTITY}_sl_sw_hub1_dev1_l1", msg
+        )
+
     @pytest.mark.asyncio
     async def test_hub_unload(self, hass: HomeAssistant, mock_config_entry_oapi):
         """测试 Hub 的卸载功能。"""
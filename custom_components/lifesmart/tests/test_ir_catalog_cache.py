@@ -0,0 +1,159 @@
+"""
+LifeSmart 红外码库缓存测试套件。
+
+此测试文件专门测试 ir_catalog_cache.py 中的缓存，包括：
+- 命中缓存时不访问网络，空结果不缓存
+- 从 .storage 读取已持久化的条目
+- 过期条目先返回旧数据并在后台刷新
+- LRU 淘汰与按类别清除
+"""
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.lifesmart.ir_catalog_cache import (
+    STORAGE_KEY,
+    LifeSmartIRCatalogCache,
+    get_ir_catalog_cache,
+)
+
+FEATURE_PARAMS = {"category": "tv", "brand": "sony", "idx": "1.irxs"}
+FEATURE = {"keys": ["POWER", "MUTE"]}
+
+
+def stored_entry(method, params, data, age=0.0) -> dict:
+    """构造一条 .storage 中的缓存条目。"""
+    return {
+        "method": method,
+        "params": params,
+        "data": data,
+        "fetched_at": time.time() - age,
+    }
+
+
+class TestCacheLookup:
+    """测试缓存命中与未命中。"""
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self, hass: HomeAssistant):
+        """测试首次查询获取并缓存，之后的查询直接命中。"""
+        cache = get_ir_catalog_cache(hass)
+        fetch = AsyncMock(return_value=FEATURE)
+
+        first = await cache.async_get("GetRemoteFeature", FEATURE_PARAMS, fetch)
+        second = await cache.async_get("GetRemoteFeature", dict(FEATURE_PARAMS), fetch)
+
+        assert first == second == FEATURE
+        fetch.assert_awaited_once()
+        assert get_ir_catalog_cache(hass) is cache, "同一 hass 应共享同一个缓存"
+
+    @pytest.mark.asyncio
+    async def test_empty_result_not_cached(self, hass: HomeAssistant):
+        """测试空结果不会被缓存。"""
+        cache = LifeSmartIRCatalogCache(hass)
+        fetch = AsyncMock(side_effect=[[], ["tv"]])
+
+        assert await cache.async_get("GetCategory", {}, fetch) == []
+        assert await cache.async_get("GetCategory", {}, fetch) == ["tv"]
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_loads_persisted_entries(self, hass: HomeAssistant, hass_storage):
+        """测试重启后从 .storage 读取缓存，无需访问网络。"""
+        hass_storage[STORAGE_KEY] = {
+            "version": 1,
+            "data": {
+                "entries": [
+                    stored_entry("GetRemoteFeature", FEATURE_PARAMS, FEATURE),
+                    {"method": "broken"},
+                ]
+            },
+        }
+        cache = LifeSmartIRCatalogCache(hass)
+        fetch = AsyncMock()
+
+        result = await cache.async_get("GetRemoteFeature", FEATURE_PARAMS, fetch)
+
+        assert result == FEATURE
+        fetch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_revalidated_in_background(
+        self, hass: HomeAssistant, hass_storage
+    ):
+        """测试过期条目先返回旧数据，并在后台刷新。"""
+        hass_storage[STORAGE_KEY] = {
+            "version": 1,
+            "data": {
+                "entries": [
+                    stored_entry(
+                        "GetCategory",
+                        {},
+                        ["tv"],
+                        age=LifeSmartIRCatalogCache.TTL + 1,
+                    )
+                ]
+            },
+        }
+        cache = LifeSmartIRCatalogCache(hass)
+        fetch = AsyncMock(return_value=["tv", "ac"])
+
+        assert await cache.async_get("GetCategory", {}, fetch) == ["tv"]
+        await hass.async_block_till_done()
+
+        fetch.assert_awaited_once()
+        assert await cache.async_get("GetCategory", {}, fetch) == ["tv", "ac"]
+
+
+class TestEvictionAndInvalidation:
+    """测试 LRU 淘汰与缓存清除。"""
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_evicted(self, hass: HomeAssistant):
+        """测试条目数超过上限时淘汰最久未使用的条目。"""
+        cache = LifeSmartIRCatalogCache(hass)
+        cache.MAX_ENTRIES = 2
+        fetch = AsyncMock(return_value={"data": {"sony": 1}})
+
+        for category in ("tv", "fan"):
+            await cache.async_get("GetBrands", {"category": category}, fetch)
+        # 访问 tv 后，fan 成为最久未使用的条目
+        await cache.async_get("GetBrands", {"category": "tv"}, fetch)
+        await cache.async_get("GetBrands", {"category": "ac"}, fetch)
+
+        assert fetch.await_count == 3
+        await cache.async_get("GetBrands", {"category": "tv"}, fetch)
+        assert fetch.await_count == 3, "tv 应仍在缓存中"
+        await cache.async_get("GetBrands", {"category": "fan"}, fetch)
+        assert fetch.await_count == 4, "fan 应已被淘汰"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_by_category(self, hass: HomeAssistant):
+        """测试按类别清除与全部清除。"""
+        cache = LifeSmartIRCatalogCache(hass)
+        fetch = AsyncMock(return_value=["x"])
+        for category in ("tv", "ac"):
+            await cache.async_get("GetRemoteIdxs", {"category": category}, fetch)
+        await cache.async_get("GetCategory", {}, fetch)
+
+        assert await cache.async_invalidate("tv") == 1
+        assert await cache.async_invalidate() == 2
+
+    @pytest.mark.asyncio
+    async def test_entries_saved_to_storage(self, hass: HomeAssistant):
+        """测试缓存条目按最近使用顺序延迟保存到 .storage。"""
+        cache = LifeSmartIRCatalogCache(hass)
+        await cache.async_get("GetCategory", {}, AsyncMock(return_value=["tv"]))
+        fetch = AsyncMock(return_value={"sony": 1})
+
+        with patch.object(cache._store, "async_delay_save") as delay_save:
+            await cache.async_get("GetBrands", {"category": "tv"}, fetch)
+
+        data_func = delay_save.call_args.args[0]
+        assert [entry["method"] for entry in data_func()["entries"]] == [
+            "GetCategory",
+            "GetBrands",
+        ]
@@ -0,0 +1,201 @@
+"""
+LifeSmart 多网关本地连接池测试套件。
+
+此测试文件专门测试 core/local_connection_pool.py 中的连接池，包括：
+- 网关地址列表解析
+- 所有连接共享同一个协议实例
+- 合并的设备索引与部分网关未就绪时的设备列表
+- 网关迟到就绪时请求重新加载
+- 指令按 agt 或设备 ID 路由到对应网关
+- 每个网关的健康状态
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.lifesmart.core.local_connection_pool import (
+    LifeSmartLocalConnectionPool,
+    parse_gateway_hosts,
+)
+
+
+@pytest.fixture
+def pool():
+    """两个网关的连接池，模拟两个网关均已登录并加载设备。"""
+    pool = LifeSmartLocalConnectionPool(
+        [("10.0.0.1", 8888), ("10.0.0.2", 9999)], "admin", "admin"
+    )
+    gw1, gw2 = pool.clients
+    gw1.node_agt, gw2.node_agt = "agt_1", "agt_2"
+    gw1.devices = {"dev_a": {"me": "dev_a", "agt": "agt_1"}}
+    gw2.devices = {"dev_b": {"me": "dev_b", "agt": "agt_2"}}
+    for client in pool.clients:
+        client.device_ready.set()
+        client._async_send_single_command = AsyncMock(return_value=0)
+        client._async_set_device_eeprom = AsyncMock(return_value=0)
+    return pool
+
+
+class TestParseGatewayHosts:
+    """测试网关地址列表解析。"""
+
+    def test_parse_with_and_without_port(self):
+        """测试省略端口时使用默认端口，空项被忽略。"""
+        assert parse_gateway_hosts(" 10.0.0.2, 10.0.0.3:9000 ,", 8888) == [
+            ("10.0.0.2", 8888),
+            ("10.0.0.3", 9000),
+        ]
+        assert parse_gateway_hosts("", 8888) == []
+
+    def test_parse_ipv6(self):
+        """测试 IPv6 地址可以用方括号附带端口，不带方括号时使用默认端口。"""
+        assert parse_gateway_hosts("[fd00::2]:9000, [fd00::3], fd00::4", 8888) == [
+            ("fd00::2", 9000),
+            ("fd00::3", 8888),
+            ("fd00::4", 8888),
+        ]
+
+    @pytest.mark.parametrize(
+        "text",
+        ["10.0.0.2:abc", ":8888", "10.0.0.2:", "10.0.0.2:70000", "[fd00::2", "[]:1"],
+    )
+    def test_parse_invalid(self, text):
+        """测试无效的端口或空主机抛出 ValueError。"""
+        with pytest.raises(ValueError):
+            parse_gateway_hosts(text, 8888)
+
+
+class TestConnectionPool:
+    """测试连接池的共享、合并与路由。"""
+
+    def test_clients_share_protocol(self, pool):
+        """测试所有网关连接共享同一个解码协议实例。"""
+        assert pool.clients[0]._proto is pool.clients[1]._proto is pool._proto
+        assert (
+            pool.clients[0]._assembler is not pool.clients[1]._assembler
+        ), "每个连接必须有独立的帧缓冲"
+
+    def test_requires_gateway(self):
+        """测试没有网关时拒绝创建连接池。"""
+        with pytest.raises(ValueError):
+            LifeSmartLocalConnectionPool([], "admin", "admin")
+
+    @pytest.mark.asyncio
+    async def test_merged_device_index(self, pool):
+        """测试设备列表合并所有网关的设备。"""
+        devices = await pool.async_get_all_devices()
+
+        assert {d["me"] for d in devices} == {"dev_a", "dev_b"}
+        assert set(pool.devices) == {("agt_1", "dev_a"), ("agt_2", "dev_b")}
+
+    def test_same_device_id_on_two_gateways(self, pool):
+        """测试不同网关上相同的设备 ID 在合并索引中互不覆盖。"""
+        pool.clients[1].devices["dev_a"] = {"me": "dev_a", "agt": "agt_2"}
+
+        assert pool.devices[("agt_1", "dev_a")]["agt"] == "agt_1"
+        assert pool.devices[("agt_2", "dev_a")]["agt"] == "agt_2"
+
+    @pytest.mark.asyncio
+    async def test_partial_devices_when_gateway_not_ready(self, pool):
+        """测试某个网关未就绪时仍返回已就绪网关的设备。"""
+        pool.clients[1].device_ready.clear()
+
+        devices = await pool._async_get_all_devices(timeout=0.01)
+
+        assert [d["me"] for d in devices] == ["dev_a"]
+
+    @pytest.mark.asyncio
+    async def test_late_gateway_requests_reload(self, pool):
+        """测试设备列表返回后才就绪的网关只请求一次重新加载。"""
+        callback = AsyncMock()
+        pool._callback = callback
+        pool.clients[1].device_ready.clear()
+
+        await pool._async_get_all_devices(timeout=0.01)
+        await pool._async_get_all_devices(timeout=0.01)
+        await asyncio.sleep(0)
+        callback.assert_not_awaited()
+
+        pool.clients[1].device_ready.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        callback.assert_awaited_once_with({"reload": True})
+        assert len(pool._late_watchers) == 1
+        pool.disconnect()
+        assert not pool._late_watchers
+
+    @pytest.mark.asyncio
+    async def test_route_by_agt(self, pool):
+        """测试带 agt 的指令发往对应网关的连接。"""
+        result = await pool._async_send_single_command("agt_2", "dev_b", "L1", 0x81, 1)
+
+        assert result == 0
+        pool.clients[1]._async_send_single_command.assert_awaited_once_with(
+            "agt_2", "dev_b", "L1", 0x81, 1
+        )
+        pool.clients[0]._async_send_single_command.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_route_by_device_id(self, pool):
+        """测试只带设备 ID 的指令按设备所在网关路由。"""
+        await pool._async_set_device_eeprom("dev_a", "key", 1)
+
+        pool.clients[0]._async_set_device_eeprom.assert_awaited_once_with(
+            "dev_a", "key", 1
+        )
+        pool.clients[1]._async_set_device_eeprom.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_device_id_not_routed(self, pool):
+        """测试多个网关存在同一设备 ID 时，只带设备 ID 的指令不发往任何网关。"""
+        pool.clients[1].devices["dev_a"] = {"me": "dev_a", "agt": "agt_2"}
+
+        assert await pool._async_set_device_eeprom("dev_a", "key", 1) == -1
+        for client in pool.clients:
+            client._async_set_device_eeprom.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unknown_target_fails(self, pool):
+        """测试未知的 agt 或设备返回 -1，不发送任何指令。"""
+        assert await pool._async_send_single_command("agt_x", "d", "L1", 0x81, 1) == -1
+        assert await pool._async_set_device_eeprom("dev_x", "key", 1) == -1
+        for client in pool.clients:
+            client._async_send_single_command.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_hub_list_and_health(self, pool):
+        """测试中枢列表合并，健康状态按网关报告。"""
+        hubs = await pool._async_get_hub_list()
+        assert [hub["agt"] for hub in hubs] == ["agt_1", "agt_2"]
+
+        health = pool.gateway_health()
+        assert [(h["host"], h["port"], h["agt"]) for h in health] == [
+            ("10.0.0.1", 8888, "agt_1"),
+            ("10.0.0.2", 9999, "agt_2"),
+        ]
+        assert all(h["ready"] and h["devices"] == 1 for h in health)
+        assert not pool.is_connected, "没有建立连接的网关应报告为未连接"
+
+    @pytest.mark.asyncio
+    async def test_connect_runs_all_gateways(self, pool):
+        """测试连接池并行运行每个网关的连接循环，并向所有网关下发排除规则。"""
+        started = []
+
+        async def fake_connect(client, callback):
+            started.append(client.host)
+            await asyncio.sleep(0)
+
+        for client in pool.clients:
+            client.async_connect = lambda cb, client=client: fake_connect(client, cb)
+
+        pool.set_exclude_filter({"dev_a"}, set())
+        await pool.async_connect(None)
+
+        assert started == ["10.0.0.1", "10.0.0.2"]
+        assert all(
+            not client._accept_schg_path("agt_1/ep/dev_a/m/L1")
+            for client in pool.clients
+        )
@@ -0,0 +1,151 @@
+"""
+LifeSmart 本地客户端端到端测试套件。
+
+此测试文件在本机回环地址上启动 scripts/local_gateway_simulator.py 中的网关
+模拟器，让真实的 LifeSmartLocalTCPClient 通过 TCP 与之通信，包括：
+- 登录与设备加载
+- `_schg` 推送流的分发
+- 被拆分成小块、延迟到达的帧 (部分帧)
+- 连接中断后的重连与增量同步
+- 指令应答与登录失败
+"""
+
+import asyncio
+import contextlib
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.lifesmart.core.local_tcp_client import LifeSmartLocalTCPClient
+from scripts.local_gateway_simulator import (
+    LocalGatewaySimulator,
+    SimulatorConfig,
+)
+
+# 模拟器监听本机回环地址，需要放开测试环境默认的 socket 限制
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+
+async def wait_until(predicate, timeout: float = 5.0) -> None:
+    """轮询等待条件成立，超时则测试失败。"""
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@contextlib.asynccontextmanager
+async def connected_client(simulator: LocalGatewaySimulator, callback=None, **kwargs):
+    """连接到模拟器的客户端，退出时断开并等待连接任务结束。"""
+    client = LifeSmartLocalTCPClient(
+        "127.0.0.1", simulator.port, "admin", "admin", **kwargs
+    )
+    client.RECONNECT_DELAY_MIN = 0.01
+    task = asyncio.create_task(client.async_connect(callback))
+    try:
+        yield client
+    finally:
+        client.disconnect()
+        with contextlib.suppress(asyncio.CancelledError):
+            await asyncio.wait_for(task, timeout=2)
+
+
+class TestGatewaySimulator:
+    """测试客户端与模拟网关的端到端交互。"""
+
+    @pytest.mark.asyncio
+    async def test_login_and_load_devices(self):
+        """测试登录后加载模拟器提供的全部端点。"""
+        async with LocalGatewaySimulator(SimulatorConfig(endpoints=255)) as simulator:
+            async with connected_client(simulator) as client:
+                await asyncio.wait_for(client.device_ready.wait(), timeout=5)
+
+                assert len(client.devices) == 255
+                assert client.node_agt == "bench_agt"
+                assert simulator.stats.logins == 1
+                assert simulator.stats.config_requests == 1
+
+    @pytest.mark.asyncio
+    async def test_schg_stream_dispatched(self):
+        """测试模拟器推送的 `_schg` 变化被逐个分发给回调。"""
+        callback = AsyncMock()
+        config = SimulatorConfig(endpoints=30, schg_rate=200, schg_batch=3)
+        async with LocalGatewaySimulator(config) as simulator:
+            async with connected_client(simulator, callback) as client:
+                await wait_until(lambda: callback.await_count >= 30)
+
+                msgs = [call.args[0]["msg"] for call in callback.await_args_list]
+                assert all(msg["idx"] == "L1" for msg in msgs)
+                assert {msg["me"] for msg in msgs} == {
+                    f"ep_{i:04d}" for i in range(0, 30, 3)
+                }
+                assert client.devices["ep_0000"]["data"]["L1"]["val"] in (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_partial_frames(self):
+        """测试帧被拆成小块并延迟到达时仍能正确组装。"""
+        config = SimulatorConfig(endpoints=60, chunk_size=7, chunk_delay=0.0005)
+        async with LocalGatewaySimulator(config) as simulator:
+            async with connected_client(simulator) as client:
+                await asyncio.wait_for(client.device_ready.wait(), timeout=5)
+
+                assert len(client.devices) == 60
+
+    @pytest.mark.asyncio
+    async def test_reconnect_after_drop(self):
+        """测试连接被中断后客户端重连并重新同步，不触发重新加载。"""
+        callback = AsyncMock()
+        async with LocalGatewaySimulator(SimulatorConfig(endpoints=9)) as simulator:
+            async with connected_client(simulator, callback) as client:
+                await asyncio.wait_for(client.device_ready.wait(), timeout=5)
+
+                simulator.drop_connections()
+                await wait_until(lambda: simulator.stats.config_requests == 2)
+                await wait_until(lambda: client.is_connected)
+
+                assert simulator.stats.connections == 2
+                assert len(client.devices) == 9
+                assert {"reload": True} not in [
+                    call.args[0] for call in callback.await_args_list
+                ], "设备集合未变化时不应请求重新加载"
+
+    @pytest.mark.asyncio
+    async def test_push_stream_survives_client_drop(self):
+        """测试推送过程中客户端断开时，模拟器不会留下未处理的连接异常。"""
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: errors.append(context)
+        )
+        config = SimulatorConfig(endpoints=9, schg_rate=500)
+        async with LocalGatewaySimulator(config) as simulator:
+            async with connected_client(simulator, AsyncMock()) as client:
+                await wait_until(lambda: simulator.stats.schg_frames > 0)
+                client.writer.transport.abort()
+                await wait_until(lambda: simulator.stats.connections == 2)
+
+        assert errors == [], "客户端断开时推送任务应该安静地结束"
+
+    @pytest.mark.asyncio
+    async def test_command_acknowledged(self):
+        """测试启用应答等待时，指令得到模拟器的确认。"""
+        async with LocalGatewaySimulator(SimulatorConfig(endpoints=3)) as simulator:
+            async with connected_client(simulator, await_ack=True) as client:
+                await asyncio.wait_for(client.device_ready.wait(), timeout=5)
+
+                result = await client._async_send_single_command(
+                    client.node_agt, "ep_0000", "L1", 0x81, 1
+                )
+
+                assert result == 0
+                assert simulator.stats.commands == 1
+                assert simulator.stats.received[-1]["args"]["devid"] == "ep_0000"
+
+    @pytest.mark.asyncio
+    async def test_login_failure(self):
+        """测试凭据错误时登录失败，客户端停止重连。"""
+        config = SimulatorConfig(password="secret")
+        async with LocalGatewaySimulator(config) as simulator:
+            async with connected_client(simulator) as client:
+                await wait_until(lambda: client.disconnected)
+
+                assert simulator.stats.login_failures == 1
+                assert not client.device_ready.is_set()
@@ -15,6 +15,7 @@ LifeSmart 本地TCP客户端测试套件。
 
 import asyncio
 import json
+import socket
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -35,10 +36,16 @@ from custom_components.lifesmart.const import (
 )
 from custom_components.lifesmart.core.local_tcp_client import LifeSmartLocalTCPClient
 from custom_components.lifesmart.core.protocol import (
+    CONFIG_PROFILE_MINIMAL,
+    LifeSmartFrameAssembler,
     LifeSmartProtocol,
     LifeSmartPacketFactory,
 )
-from custom_components.lifesmart.helpers import normalize_device_names
+from custom_components.lifesmart.core.send_scheduler import SendPriority
+from custom_components.lifesmart.helpers import (
+    generate_unique_id,
+    normalize_device_names,
+)
 
 
 # ==================== 测试数据和Fixtures ====================
@@ -565,6 +572,116 @@ class TestDeviceManagementAndDataProcessing:
         except asyncio.CancelledError:
             pass
 
+    @pytest.mark.asyncio
+    async def test_fragmented_frames_processing(self, mock_connection, sample_packets):
+        """测试数据帧被拆分到多次读取时仍能完整处理。"""
+        reader, writer, mock_open = mock_connection
+        client = LifeSmartLocalTCPClient("host", 1234, "user", "pass")
+        callback = AsyncMock()
+
+        connect_task = asyncio.create_task(client.async_connect(callback))
+        reader.feed_data(sample_packets["login_success"])
+        await asyncio.sleep(0.1)
+
+        # 设备列表与状态更新被切分成小块，并在同一块中跨越帧边界
+        stream = sample_packets["device_list"] + sample_packets["status_update"]
+        for i in range(0, len(stream), 7):
+            reader.feed_data(stream[i : i + 7])
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.1)
+
+        assert len(client.devices) == 2, "拆分到达的设备列表应该被完整加载"
+        callback.assert_called_once()
+        msg = callback.call_args[0][0]["msg"]
+        assert msg["me"] == "device_1" and msg["val"] == 0, "状态更新应该被正确处理"
+
+        # 清理
+        client.disconnect()
+        try:
+            await asyncio.wait_for(connect_task, timeout=1.0)
+        except asyncio.CancelledError:
+            pass
+
+    @pytest.mark.asyncio
+    async def test_frames_after_failed_frame_processed_in_same_read(
+        self, mock_connection, sample_packets
+    ):
+        """测试某帧解码或回调失败后，同一次读取中其后已到达的帧仍被立即处理。"""
+        reader, writer, mock_open = mock_connection
+        client = LifeSmartLocalTCPClient("host", 1234, "user", "pass")
+        callback = AsyncMock(side_effect=[RuntimeError("回调异常"), None])
+
+        connect_task = asyncio.create_task(client.async_connect(callback))
+        reader.feed_data(sample_packets["login_success"])
+        reader.feed_data(sample_packets["device_list"])
+        await asyncio.wait_for(client.device_ready.wait(), timeout=1)
+
+        corrupt = b"GL00\x00\x00" + (4).to_bytes(4, "big") + b"\x12\x05\x11\x01"
+        reader.feed_data(
+            corrupt + sample_packets["status_update"] + sample_packets["status_update"]
+        )
+        await asyncio.sleep(0.1)
+
+        assert callback.await_count == 2, "损坏帧与回调异常之后的帧都应该被处理"
+        assert client._assembler.buffered == 0, "缓冲区中不应残留完整帧"
+
+        # 清理
+        client.disconnect()
+        try:
+            await asyncio.wait_for(connect_task, timeout=1.0)
+        except asyncio.CancelledError:
+            pass
+
+    @pytest.mark.asyncio
+    async def test_excluded_and_unknown_devices_skipped(
+        self, mock_connection, protocol, sample_packets
+    ):
+        """测试被排除设备和未知设备的状态推送在解码阶段即被跳过。"""
+        reader, writer, mock_open = mock_connection
+        client = LifeSmartLocalTCPClient("host", 1234, "user", "pass")
+        client.set_exclude_filter({"device_1"}, set())
+        callback = AsyncMock()
+
+        connect_task = asyncio.create_task(client.async_connect(callback))
+        reader.feed_data(sample_packets["login_success"])
+        await asyncio.sleep(0.1)
+        reader.feed_data(sample_packets["device_list"])
+        await asyncio.sleep(0.1)
+
+        assert not client._accept_schg_path("test_agt/ep/device_1/m/L1")
+        assert not client._accept_schg_path("test_agt/ep/unknown/m/L1")
+        assert client._accept_schg_path("test_agt/me/ep/device_2/m/P1")
+
+        reader.feed_data(
+            protocol.encode(
+                [
+                    {},
+                    {
+                        "_schg": {
+                            "test_agt/ep/device_1/m/L1": {"chg": {"val": 0}},
+                            "test_agt/ep/unknown/m/L1": {"chg": {"val": 1}},
+                            "test_agt/ep/device_2/m/P1": {"chg": {"val": 1}},
+                        }
+                    },
+                ]
+            )
+        )
+        await asyncio.sleep(0.1)
+
+        callback.assert_called_once()
+        msg = callback.call_args[0][0]["msg"]
+        assert msg["me"] == "device_2", "只有未被排除的已知设备应该被分发"
+        assert (
+            client.devices["device_1"]["data"]["L1"]["val"] == 1
+        ), "被跳过的更新不应生效"
+
+        # 清理
+        client.disconnect()
+        try:
+            await asyncio.wait_for(connect_task, timeout=1.0)
+        except asyncio.CancelledError:
+            pass
+
     @pytest.mark.asyncio
     async def test_device_deletion_handling(self, mock_connection, sample_packets):
         """测试设备删除事件的处理。"""
@@ -644,9 +761,18 @@ class TestHeartbeatAndConnectionMaintenance:
         # 使用正确的副作用函数
         mock_open.side_effect = mock_open_side_effect
 
-        with patch.object(
-            client._factory, "build_get_config_packet", return_value=b"heartbeat"
-        ) as mock_heartbeat:
+        with (
+            patch.object(
+                client._factory,
+                "build_keepalive_packet",
+                wraps=client._factory.build_keepalive_packet,
+            ) as mock_heartbeat,
+            patch.object(
+                client._factory,
+                "build_get_config_packet",
+                wraps=client._factory.build_get_config_packet,
+            ) as mock_get_config,
+        ):
             connect_task = asyncio.create_task(client.async_connect(AsyncMock()))
 
             # 完成登录和设备加载
@@ -656,10 +782,11 @@ class TestHeartbeatAndConnectionMaintenance:
             await asyncio.sleep(0.01)
 
             # 等待心跳触发
-            await asyncio.sleep(0.2)
+            await asyncio.sleep(0.15)
 
-            # 验证心跳包被构建
-            mock_heartbeat.assert_called()
+            # 验证空闲时发送的是轻量保活查询，get-config 只在登录后发送一次
+            mock_heartbeat.assert_called_with("test_node")
+            mock_get_config.assert_called_once_with("test_node", CONFIG_PROFILE_MINIMAL)
 
             # 清理
             client.disconnect()
@@ -698,9 +825,456 @@ class TestHeartbeatAndConnectionMaintenance:
             pass
 
 
+def config_reply(eps: dict) -> list:
+    """构造 get-config 应答帧的解码结果。"""
+    return [{}, {"ret": [0, {"eps": eps}]}]
+
+
+def switch_endpoint(l1: int, l2: int = 0) -> dict:
+    """构造一个两路开关的 get-config 端点数据。"""
+    return {
+        "cls": "SL_SW_IF2",
+        "name": "开关",
+        "_chd": {
+            "m": {
+                "_chd": {
+                    "L1": {"name": "{$EPN} 1", "type": 128 | l1, "val": l1},
+                    "L2": {"name": "{$EPN} 2", "type": 128 | l2, "val": l2},
+                }
+            }
+        },
+    }
+
+
+class TestReconnectAndResync:
+    """测试重连退避与重连后的增量同步。"""
+
+    def test_reconnect_backoff_with_jitter(self, test_client):
+        """测试重连等待时间指数增长、带抖动、有上限，加载设备后重置。"""
+        with patch(
+            "custom_components.lifesmart.core.local_tcp_client.random.uniform",
+            side_effect=lambda low, high: (low, high),
+        ):
+            delays = [test_client._next_reconnect_delay() for _ in range(8)]
+            assert delays == [
+                (0.5, 1.0),
+                (1.0, 2.0),
+                (2.0, 4.0),
+                (4.0, 8.0),
+                (8.0, 16.0),
+                (16.0, 32.0),
+                (30.0, 60.0),
+                (30.0, 60.0),
+            ], "等待时间应该每次翻倍并在上限处封顶"
+
+            test_client._load_devices(config_reply({"sw": switch_endpoint(1)}))
+            assert test_client._next_reconnect_delay() == (
+                0.5,
+                1.0,
+            ), "成功加载设备后退避应该重置"
+
+    @pytest.mark.asyncio
+    async def test_reconnect_uses_backoff_delay(self, mock_connection, sample_packets):
+        """测试连接失败后按退避时间等待再重连。"""
+        reader, writer, mock_open = mock_connection
+        mock_open.side_effect = [ConnectionRefusedError("拒绝"), (reader, writer)]
+        client = LifeSmartLocalTCPClient("host", 1234, "user", "pass")
+        client._next_reconnect_delay = MagicMock(return_value=0)
+
+        connect_task = asyncio.create_task(client.async_connect(AsyncMock()))
+        reader.feed_data(sample_packets["login_success"])
+        await asyncio.sleep(0.05)
+        reader.feed_data(sample_packets["device_list"])
+        await asyncio.sleep(0.05)
+
+        assert client.device_ready.is_set(), "重连成功后应该加载设备"
+        client._next_reconnect_delay.assert_called_once()
+        assert client._reconnect_attempts == 0
+
+        client.disconnect()
+        try:
+            await asyncio.wait_for(connect_task, timeout=1.0)
+        except asyncio.CancelledError:
+            pass
+
+    @pytest.mark.asyncio
+    async def test_first_load_dispatches_nothing(self, test_client):
+        """测试首次加载设备时不分发任何更新。"""
+        callback = AsyncMock()
+
+        stage = await test_client._handle_frame(
+            "loading", config_reply({"sw": switch_endpoint(1)}), callback
+        )
+
+        assert stage == "loaded"
+        callback.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_non_config_frame_keeps_loading(self, test_client):
+        """测试加载阶段收到的非 get-config 帧不会清空设备列表。"""
+        test_client._load_devices(config_reply({"sw": switch_endpoint(1)}))
+        push = [{}, {"_schg": {"agt/ep/sw/m/L1": {"chg": {"val": 0}}}}]
+
+        stage = await test_client._handle_frame("loading", push, AsyncMock())
+
+        assert stage == "loading"
+        assert set(test_client.devices) == {"sw"}, "设备列表不应该被覆盖"
+
+    @pytest.mark.asyncio
+    async def test_resync_dispatches_only_changed_ios(self, test_client):
+        """测试重连后只分发断线期间值发生变化的 IO。"""
+        callback = AsyncMock()
+        test_client.node_agt = "agt"
+        test_client._load_devices(
+            config_reply({"sw1": switch_endpoint(1), "sw2": switch_endpoint(0)})
+        )
+
+        await test_client._handle_frame(
+            "loading",
+            config_reply({"sw1": switch_endpoint(1), "sw2": switch_endpoint(0, 1)}),
+            callback,
+        )
+
+        callback.assert_awaited_once()
+        msg = callback.await_args.args[0]["msg"]
+        assert (msg["me"], msg["idx"], msg["val"]) == ("sw2", "L2", 1)
+        assert msg["agt"] == "agt" and msg["devtype"] == "SL_SW_IF2"
+
+    @pytest.mark.asyncio
+    async def test_resync_skips_excluded_devices(self, test_client):
+        """测试增量同步不分发被排除设备的变化。"""
+        callback = AsyncMock()
+        test_client._load_devices(config_reply({"sw1": switch_endpoint(0)}))
+        test_client.set_exclude_filter({"sw1"}, set())
+
+        await test_client._handle_frame(
+            "loading", config_reply({"sw1": switch_endpoint(1)}), callback
+        )
+
+        callback.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_resync_device_set_change_requests_reload(self, test_client):
+        """测试断线期间设备被添加或删除时请求重新加载，而不是逐个分发。"""
+        callback = AsyncMock()
+        test_client._load_devices(config_reply({"sw1": switch_endpoint(0)}))
+
+        await test_client._handle_frame(
+            "loading",
+            config_reply({"sw1": switch_endpoint(1), "sw2": switch_endpoint(0)}),
+            callback,
+        )
+
+        callback.assert_awaited_once_with({"reload": True})
+        assert set(test_client.devices) == {"sw1", "sw2"}
+
+
+class TestSchgRouting:
+    """测试 `_schg` 路径路由表与只读的 IO 消息视图。"""
+
+    @pytest.fixture
+    def loaded_client(self, test_client):
+        """已加载两个开关设备的客户端。"""
+        test_client.node_agt = "agt"
+        test_client._load_devices(
+            config_reply({"sw1": switch_endpoint(0), "sw2": switch_endpoint(1)})
+        )
+        return test_client
+
+    def test_routes_built_on_load(self, loaded_client):
+        """测试加载设备时为每个 IO 预先构建 6 段与 5 段路径的路由。"""
+        routes = loaded_client._routes
+
+        assert len(routes) == 8
+        route = routes["agt/me/ep/sw1/m/L2"]
+        assert route is routes["agt/ep/sw1/m/L2"], "两种路径格式应共享同一个路由"
+        assert (route.dev_id, route.sub_key) == ("sw1", "L2")
+        assert route.device is loaded_client.devices["sw1"]
+        assert route.unique_id == generate_unique_id("SL_SW_IF2", "agt", "sw1", "L2")
+
+    def test_routes_rebuilt_on_reload(self, loaded_client):
+        """测试重新加载后路由指向新的设备记录，已删除设备的路由被移除。"""
+        loaded_client._load_devices(config_reply({"sw1": switch_endpoint(1)}))
+
+        assert "agt/ep/sw2/m/L1" not in loaded_client._routes
+        assert (
+            loaded_client._routes["agt/ep/sw1/m/L1"].device
+            is loaded_client.devices["sw1"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_push_uses_route_without_parsing(self, loaded_client):
+        """测试路由表命中时推送不再解析路径，消息附带 unique_id。"""
+        callback = AsyncMock()
+        frame = [{}, {"_schg": {"agt/me/ep/sw1/m/L1": {"chg": {"val": 1}}}}]
+
+        with patch.object(
+            LifeSmartLocalTCPClient, "_parse_schg_path", side_effect=AssertionError
+        ):
+            await loaded_client._handle_push_frame(frame, callback)
+
+        data = callback.await_args.args[0]
+        assert data["unique_id"] == generate_unique_id("SL_SW_IF2", "agt", "sw1", "L1")
+        assert dict(data["msg"]) == {
+            "me": "sw1",
+            "idx": "L1",
+            "agt": "agt",
+            "devtype": "SL_SW_IF2",
+            "name": "开关 1",
+            "type": 128,
+            "val": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_unknown_agt_path_memoized(self, loaded_client):
+        """测试 agt 不同的路径回退到解析，结果记入路由表；未知设备不记录。"""
+        callback = AsyncMock()
+        frame = [
+            {},
+            {
+                "_schg": {
+                    "other/ep/sw2/m/L2": {"chg": {"val": 1}},
+                    "other/ep/unknown/m/L1": {"chg": {"val": 1}},
+                }
+            },
+        ]
+
+        await loaded_client._handle_push_frame(frame, callback)
+
+        callback.assert_awaited_once()
+        assert loaded_client.devices["sw2"]["data"]["L2"]["val"] == 1
+        assert "other/ep/sw2/m/L2" in loaded_client._routes
+        assert "other/ep/unknown/m/L1" not in loaded_client._routes
+
+    @pytest.mark.asyncio
+    async def test_message_is_readonly_view_of_io_state(self, loaded_client):
+        """测试分发的消息是共享 IO 状态的只读视图，而不是每条消息的副本。"""
+        callback = AsyncMock()
+        frame = [{}, {"_schg": {"agt/ep/sw1/m/L1": {"chg": {"val": 1}}}}]
+        await loaded_client._handle_push_frame(frame, callback)
+        await loaded_client._handle_push_frame(frame, callback)
+
+        first, second = (call.args[0]["msg"] for call in callback.await_args_list)
+        assert first is second, "同一个 IO 的消息视图应该被复用"
+        with pytest.raises(TypeError):
+            first["val"] = 0
+
+        loaded_client.devices["sw1"]["data"]["L1"]["val"] = 0
+        assert first["val"] == 0, "视图应该反映 IO 状态的最新值"
+
+        loaded_client.devices["sw1"]["data"]["L1"] = {"val": 5}
+        await loaded_client._handle_push_frame(frame, callback)
+        assert callback.await_args.args[0]["msg"]["val"] == 1
+        assert loaded_client.devices["sw1"]["data"]["L1"] == {"val": 1}
+
+
+class TestLightweightKeepalive:
+    """测试空闲连接的轻量保活与 get-config 回退。"""
+
+    @pytest.fixture
+    def loaded_client(self, test_client):
+        """已加载设备、发送通过模拟调度器完成的客户端。"""
+        test_client.node = "node"
+        test_client._load_devices(config_reply({"sw": switch_endpoint(0)}))
+        test_client._sender.send = AsyncMock()
+        return test_client
+
+    def sent_acts(self, client, protocol) -> list[str]:
+        """返回经调度器发出的每个数据包的 act。"""
+        return [
+            protocol.decode(call.args[0])[1][1]["act"]
+            for call in client._sender.send.await_args_list
+        ]
+
+    @pytest.mark.asyncio
+    async def test_keepalive_reply_records_rtt(self, loaded_client, protocol):
+        """测试保活查询以后台优先级发送，应答后记录往返时间并清理登记。"""
+        await loaded_client._send_heartbeat()
+
+        packet, priority = loaded_client._sender.send.await_args.args
+        assert priority == SendPriority.BACKGROUND
+        assert protocol.decode(packet)[1][1]["node"] == "node/me"
+        assert packet.sel in loaded_client._pending
+
+        await loaded_client._handle_frame(
+            "loaded", [{"_sel": packet.sel}, {"ret": [0]}], AsyncMock()
+        )
+        await asyncio.sleep(0)  # 完成回调在下一个事件循环周期运行
+
+        assert (
+            loaded_client.keepalive_rtt is not None and loaded_client.keepalive_rtt >= 0
+        )
+        assert loaded_client._pending == {}, "保活应答后应该移除在途登记"
+
+    @pytest.mark.asyncio
+    async def test_any_frame_after_keepalive_counts_as_reply(self, loaded_client):
+        """测试中枢不返回 `_sel` 时，保活之后到达的任何帧都证明连接存活。"""
+        await loaded_client._send_heartbeat()
+        assert loaded_client._read_timeout() == loaded_client.KEEPALIVE_TIMEOUT
+
+        await loaded_client._handle_frame(
+            "loaded", [{}, {"_schg": {"agt/ep/sw/m/L1": {"chg": {"val": 1}}}}], None
+        )
+        assert loaded_client._read_timeout() == loaded_client.IDLE_TIMEOUT
+        await loaded_client._send_heartbeat()
+        await asyncio.sleep(0)
+
+        assert loaded_client.keepalive_rtt is None, "无关的推送不应被记为往返时间"
+        assert not loaded_client._awaiting_config, "连接存活时不应该回退到 get-config"
+        assert loaded_client._keepalive is not None
+        assert len(loaded_client._pending) == 1
+
+    @pytest.mark.asyncio
+    async def test_unanswered_keepalive_falls_back_to_get_config(
+        self, loaded_client, protocol
+    ):
+        """测试保活无应答时改发 get-config，get-config 也无应答时要求重连。"""
+        await loaded_client._send_heartbeat()
+        await loaded_client._send_heartbeat()
+        await asyncio.sleep(0)
+
+        assert self.sent_acts(loaded_client, protocol) == ["91", "91"]
+        full_config = loaded_client._sender.send.await_args.args[0]
+        assert full_config == loaded_client._factory.build_get_config_packet(
+            "node", CONFIG_PROFILE_MINIMAL
+        )
+        assert loaded_client._pending == {}, "失败的保活查询应该被取消"
+
+        with pytest.raises(ConnectionError):
+            await loaded_client._send_heartbeat()
+
+    @pytest.mark.asyncio
+    async def test_drift_check_sends_get_config(self, loaded_client):
+        """测试距上次完整配置超过 DRIFT_CHECK_INTERVAL 时发送 get-config。"""
+        loaded_client._last_full_config -= loaded_client.DRIFT_CHECK_INTERVAL
+
+        await loaded_client._send_heartbeat()
+
+        assert loaded_client._sender.send.await_args.args[
+            0
+        ] == loaded_client._factory.build_get_config_packet(
+            "node", CONFIG_PROFILE_MINIMAL
+        )
+        assert loaded_client._keepalive is None
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_config_reply_resyncs(self, loaded_client):
+        """测试心跳 get-config 的应答按增量同步处理，并恢复轻量保活。"""
+        callback = AsyncMock()
+        loaded_client._last_full_config -= loaded_client.DRIFT_CHECK_INTERVAL
+        await loaded_client._send_heartbeat()
+
+        await loaded_client._handle_frame(
+            "loaded", config_reply({"sw": switch_endpoint(1)}), callback
+        )
+
+        callback.assert_awaited_once()
+        assert callback.await_args.args[0]["msg"]["val"] == 1
+        assert not loaded_client._awaiting_config
+        await loaded_client._send_heartbeat()
+        assert loaded_client._keepalive is not None, "同步后应该恢复轻量保活"
+
+    @pytest.mark.asyncio
+    async def test_tcp_keepalive_enabled(self, test_client):
+        """测试连接建立后在 socket 上启用 TCP keepalive。"""
+        sock = MagicMock()
+        test_client.writer = MagicMock()
+        test_client.writer.get_extra_info.return_value = sock
+
+        test_client._enable_tcp_keepalive()
+
+        sock.setsockopt.assert_any_call(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+
 # ==================== 设备控制方法测试类 ====================
 
 
+class TestProgressiveEnumeration:
+    """测试 get-config 应答到达过程中逐个产出设备。"""
+
+    @pytest.mark.asyncio
+    async def test_devices_yielded_before_reply_completes(self, test_client, protocol):
+        """测试端点到齐即产出设备记录，且与加载后的设备对象相同。"""
+        test_client.node_agt = "agt"
+        protocol.compress_threshold = 1 << 30
+        eps = {f"sw_{i}": switch_endpoint(i % 2) for i in range(40)}
+        packet = protocol.encode(config_reply(eps))
+        devices = test_client.async_iter_devices(timeout=1)
+        first = asyncio.ensure_future(devices.__anext__())
+        await asyncio.sleep(0)
+
+        half = len(packet) // 2
+        await test_client._dispatch_frames(packet[:half], "loading", AsyncMock())
+        record = await asyncio.wait_for(first, timeout=1)
+
+        assert record["me"] == "sw_0"
+        assert record["data"]["L1"]["name"] == "开关 1", "提前产出的记录应已规范化"
+        assert not test_client.device_ready.is_set(), "应答尚未完整到达"
+
+        stage = await test_client._dispatch_frames(
+            packet[half:], "loading", AsyncMock()
+        )
+        rest = [device async for device in devices]
+
+        assert stage == "loaded"
+        assert [d["me"] for d in [record, *rest]] == list(eps)
+        assert all(test_client.devices[d["me"]] is d for d in [record, *rest])
+        assert test_client._assembler.config_listener is None, "加载后应停止扫描"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_enumerations_each_get_all_devices(
+        self, test_client, protocol
+    ):
+        """测试并发的枚举各自收到全部设备记录，并在加载完成时一起结束。"""
+        test_client.node_agt = "agt"
+        protocol.compress_threshold = 1 << 30
+        eps = {f"sw_{i}": switch_endpoint(i % 2) for i in range(10)}
+        packet = protocol.encode(config_reply(eps))
+
+        async def collect():
+            return [d["me"] async for d in test_client.async_iter_devices(timeout=1)]
+
+        tasks = [asyncio.ensure_future(collect()) for _ in range(2)]
+        await asyncio.sleep(0)
+        await test_client._dispatch_frames(packet, "loading", AsyncMock())
+        results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+        assert results == [list(eps), list(eps)]
+        assert test_client._device_streams == set()
+
+    @pytest.mark.asyncio
+    async def test_timed_out_enumeration_cleans_up(self, test_client):
+        """测试枚举超时后移除自己的队列并停止扫描，不留下过期状态。"""
+        assert [d async for d in test_client.async_iter_devices(timeout=0.01)] == []
+
+        assert test_client._device_streams == set()
+        assert test_client._assembler.config_listener is None
+
+    @pytest.mark.asyncio
+    async def test_get_all_devices_does_not_scan(self, test_client):
+        """测试获取完整设备列表只等待加载完成，不启用端点扫描。"""
+        waiter = asyncio.ensure_future(test_client._async_get_all_devices(timeout=1))
+        await asyncio.sleep(0)
+        assert test_client._assembler.config_listener is None
+
+        test_client._load_devices(config_reply({"sw": switch_endpoint(0)}))
+
+        assert [d["me"] for d in await waiter] == ["sw"]
+
+    @pytest.mark.asyncio
+    async def test_loaded_devices_yielded_immediately(self, test_client):
+        """测试设备已加载时直接产出当前设备列表。"""
+        test_client._load_devices(config_reply({"sw": switch_endpoint(0)}))
+
+        assert [d["me"] async for d in test_client.async_iter_devices()] == ["sw"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_between_devices(self, test_client):
+        """测试超时后枚举结束，获取设备列表返回空列表。"""
+        assert [d async for d in test_client.async_iter_devices(timeout=0.01)] == []
+        assert await test_client._async_get_all_devices(timeout=0.01) == []
+
+
 class TestDeviceControlMethods:
     """测试各种设备控制方法的功能。"""
 
@@ -1119,6 +1693,251 @@ class TestAdvancedFeatures:
 # ==================== 错误处理和边界条件测试类 ====================
 
 
+class TestSendScheduling:
+    """测试指令包经发送调度器合并写出。"""
+
+    @pytest.mark.asyncio
+    async def test_scene_commands_coalesced_into_one_write(self, protocol):
+        """测试同时发出的 30 个端点指令只产生一次 socket 写入。"""
+        client = LifeSmartLocalTCPClient("host", 1234, "user", "pass")
+        client._factory = LifeSmartPacketFactory("test_agt", "test_node")
+        client.writer = MagicMock()
+        client.writer.drain = AsyncMock()
+        client.writer.is_closing = MagicMock(return_value=False)
+
+        results = await asyncio.gather(
+            *(
+                client.turn_on_light_switch_async("L1", "test_agt", f"dev{i}")
+                for i in range(30)
+            )
+        )
+
+        assert results == [0] * 30, "所有指令都应该发送成功"
+        client.writer.write.assert_called_once()
+        client.writer.drain.assert_awaited_once()
+        frames = list(
+            LifeSmartFrameAssembler(protocol).feed(client.writer.write.call_args[0][0])
+        )
+        assert [f[1]["args"]["devid"] for f in frames] == [
+            f"dev{i}" for i in range(30)
+        ], "合并写入应该保持指令顺序"
+        stats = client.send_queue_stats
+        assert stats["packets"] == 30 and stats["writes"] == 1
+        assert stats["depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_bulk_operations_use_bulk_lane(self, mocked_client):
+        """测试场景/定时器等配置类操作使用批量优先级。"""
+        await mocked_client.add_scene_async("scene", "SET,io;")
+        await mocked_client.set_scene_async("scene")
+
+        first, second = mocked_client._send_packet.await_args_list
+        assert first.kwargs.get("priority") == SendPriority.BULK
+        assert second.kwargs.get("priority", SendPriority.INTERACTIVE) == (
+            SendPriority.INTERACTIVE
+        )
+
+
+class TestReceiveQueueDispatch:
+    """测试实时推送经入站队列分发，慢速回调不阻塞 socket 读取。"""
+
+    @pytest.mark.asyncio
+    async def test_slow_callback_does_not_stall_reads(
+        self, mock_connection, sample_packets, protocol
+    ):
+        """测试回调阻塞时读取循环仍继续解码推送并更新设备状态。"""
+        reader, writer, mock_open = mock_connection
+        client = LifeSmartLocalTCPClient("host", 1234, "user", "pass")
+        release = asyncio.Event()
+
+        async def slow_callback(data):
+            await release.wait()
+
+        callback = AsyncMock(side_effect=slow_callback)
+
+        connect_task = asyncio.create_task(client.async_connect(callback))
+        reader.feed_data(sample_packets["login_success"])
+        reader.feed_data(sample_packets["device_list"])
+        await asyncio.wait_for(client.device_ready.wait(), timeout=1)
+
+        for val in (0, 1, 0, 1):
+            reader.feed_data(
+                protocol.encode(
+                    [
+                        {},
+                        {
+                            "_schg": {
+                                "test_agt/ep/device_1/m/L2": {
+                                    "chg": {"val": val, "type": 128 | val}
+                                }
+                            }
+                        },
+                    ]
+                )
+            )
+        await asyncio.sleep(0.05)
+
+        assert callback.await_count == 1, "第一个更新的回调仍在阻塞"
+        assert (
+            client.devices["device_1"]["data"]["L2"]["val"] == 1
+        ), "读取循环应该继续处理后续推送"
+        assert client.receive_queue_stats["enqueued"] == 4
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert callback.await_count == 4
+        assert client.receive_queue_stats["dispatched"] == 4
+
+        client.disconnect()
+        try:
+            await asyncio.wait_for(connect_task, timeout=1.0)
+        except asyncio.CancelledError:
+            pass
+        assert not client._updates.running, "连接任务结束后消费任务应该停止"
+
+
+class TestCommandAcknowledgement:
+    """测试指令与中枢应答的关联 (按 _sel 序号)。"""
+
+    @pytest.fixture
+    def connected_client(self, protocol):
+        """提供一个已连接、使用真实包工厂的客户端，并记录写出的指令序号。"""
+        client = LifeSmartLocalTCPClient("host", 1234, "user", "pass", await_ack=True)
+        client._factory = LifeSmartPacketFactory("test_agt", "test_node")
+        client.writer = MagicMock()
+        client.writer.drain = AsyncMock()
+        client.writer.is_closing = MagicMock(return_value=False)
+        client.sent_sels = []
+        assembler = LifeSmartFrameAssembler(protocol)
+
+        def record_sels(data):
+            if not data.startswith((b"GL00", b"ZZ00")):
+                return  # 测试用的占位数据包
+            # 同一周期内的多个指令包会被合并为一次写入
+            for frame in assembler.feed(data):
+                client.sent_sels.append(frame[0].get("_sel"))
+
+        client.writer.write.side_effect = record_sels
+        return client
+
+    @pytest.mark.asyncio
+    async def test_pipelined_commands_resolved_by_sel(self, connected_client):
+        """测试多个指令同时在途，乱序到达的应答按序号分别完成各自的调用。"""
+        client = connected_client
+        first = asyncio.create_task(
+            client.turn_on_light_switch_async("L1", "test_agt", "dev1")
+        )
+        second = asyncio.create_task(
+            client.turn_off_light_switch_async("L2", "test_agt", "dev1")
+        )
+        await asyncio.sleep(0.01)
+
+        assert client.sent_sels == [1, 2], "两个指令应该在应答前都已发出"
+        assert set(client._pending) == {1, 2}, "两个指令都应该处于在途状态"
+
+        assert client._resolve_response([{"_sel": 2}, {"err": 10015}])
+        assert client._resolve_response([{"_sel": 1}, {"ret": "OK"}])
+
+        assert await first == 0, "收到 ret 应答时应该返回0"
+        assert await second == 10015, "收到 err 应答时应该返回错误码"
+        assert client._pending == {}, "完成的指令应该从在途表中移除"
+
+    @pytest.mark.asyncio
+    async def test_zero_err_is_success(self, connected_client):
+        """测试 err 为 0 的应答视为成功。"""
+        client = connected_client
+        packet = client._factory.build_epset_packet("dev1", "L1", CMD_TYPE_ON, 1)
+        task = asyncio.create_task(client._send_packet(packet))
+        await asyncio.sleep(0.01)
+
+        client._resolve_response([{"_sel": packet.sel}, {"err": 0}])
+        assert await task == 0, "err 为 0 不应该被当作失败"
+
+    @pytest.mark.asyncio
+    async def test_packets_without_ack_are_fire_and_forget(self, connected_client):
+        """测试未启用 await_ack 或数据包不带序号时，写出后立即返回0。"""
+        client = connected_client
+        assert await client._send_packet(b"packet") == 0, "不带序号的包无需应答"
+
+        client.await_ack = False
+        packet = client._factory.build_epset_packet("dev1", "L1", CMD_TYPE_ON, 1)
+        assert await client._send_packet(packet) == 0, "默认不等待应答"
+        assert client._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_unmatched_frames_are_not_consumed(self, connected_client):
+        """测试与在途指令无关的帧不会被当作应答。"""
+        client = connected_client
+        task = asyncio.create_task(
+            client.turn_on_light_switch_async("L1", "test_agt", "dev1")
+        )
+        await asyncio.sleep(0.01)
+
+        assert not client._resolve_response([{"_sel": 99}, {"ret": "OK"}])
+        assert not client._resolve_response([{"_sel": 1}, {"_schg": {}}])
+        assert not client._resolve_response([{}, {"ret": [0, {}]}])
+        assert not task.done(), "无关帧不应该完成在途指令"
+
+        client._resolve_response([{"_sel": 1}, {"ret": "OK"}])
+        assert await task == 0
+
+    @pytest.mark.asyncio
+    async def test_command_timeout(self, connected_client):
+        """测试中枢未应答时按调用的超时时间返回-1。"""
+        client = connected_client
+        packet = client._factory.build_epset_packet("dev1", "L1", CMD_TYPE_ON, 1)
+
+        result = await client._send_packet(packet, timeout=0.01)
+
+        assert result == -1, "超时应该返回-1"
+        assert client._pending == {}, "超时的指令应该从在途表中移除"
+
+    @pytest.mark.asyncio
+    async def test_disconnect_fails_pending_commands(self, connected_client):
+        """测试断开连接时所有在途指令立即失败，而不是等待超时。"""
+        client = connected_client
+        tasks = [
+            asyncio.create_task(
+                client.turn_on_light_switch_async(idx, "test_agt", "dev1")
+            )
+            for idx in ("L1", "L2", "L3")
+        ]
+        await asyncio.sleep(0.01)
+
+        client.disconnect()
+
+        assert await asyncio.gather(*tasks) == [-1, -1, -1], "在途指令应该失败"
+        assert client._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_responses_dispatched_from_read_loop(
+        self, mock_connection, sample_packets, protocol
+    ):
+        """测试读取循环将应答帧交给在途指令，而不是作为状态推送处理。"""
+        reader, writer, _ = mock_connection
+        client = LifeSmartLocalTCPClient("host", 1234, "user", "pass", await_ack=True)
+        callback = AsyncMock()
+        reader.feed_data(sample_packets["login_success"])
+        reader.feed_data(sample_packets["device_list"])
+
+        connect_task = asyncio.create_task(client.async_connect(callback))
+        await asyncio.wait_for(client.device_ready.wait(), timeout=1)
+
+        command = asyncio.create_task(
+            client.turn_on_light_switch_async("L1", "test_agt", "device_1")
+        )
+        await asyncio.sleep(0.01)
+        _, (header, _) = protocol.decode(writer.write.call_args[0][0])
+        sel = header["_sel"]
+        reader.feed_data(protocol.encode([{"_sel": sel}, {"ret": "OK"}]))
+
+        assert await asyncio.wait_for(command, timeout=1) == 0
+        callback.assert_not_awaited()
+
+        client.disconnect()
+        await asyncio.gather(connect_task, return_exceptions=True)
+
+
 class TestErrorHandlingAndEdgeCases:
     """测试错误处理和各种边界条件。"""
 
@@ -14,11 +14,12 @@ LifeSmart OpenAPI 客户端测试套件。
 并包含详细的中文注释以确保可维护性。
 """
 
+import asyncio
 import json
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from aiohttp import ClientError
+from aiohttp import ClientConnectorError, ClientError, ClientResponseError
 from homeassistant.components.climate import (
     HVACMode,
     FAN_LOW,
@@ -39,6 +40,7 @@ from custom_components.lifesmart.const import (
     DOOYA_TYPES,
     GARAGE_DOOR_TYPES,
 )
+from custom_components.lifesmart.core.cloud_rate_limiter import CloudPriority
 from custom_components.lifesmart.core.openapi_client import LifeSmartOAPIClient
 from custom_components.lifesmart.exceptions import LifeSmartAPIError, LifeSmartAuthError
 
@@ -287,6 +289,217 @@ class TestCoreAPICall:
             with pytest.raises(expected_exception):
                 await client._async_call_api("AnyMethod")
 
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_request(self, client):
+        """测试并发的相同只读调用只发送一次请求并共享结果。"""
+        release = asyncio.Event()
+
+        async def slow_post(*_):
+            await release.wait()
+            return {"code": 0, "message": [{"me": "dev1"}]}
+
+        with patch.object(client, "_post_and_parse", side_effect=slow_post) as post:
+            calls = [
+                asyncio.create_task(client._async_call_api("EpGetAll"))
+                for _ in range(3)
+            ]
+            other = asyncio.create_task(
+                client._async_call_api("SceneGet", {"agt": "hub1"})
+            )
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*calls, other)
+
+            assert post.call_count == 2, "相同调用应合并，不同方法应分别请求"
+            assert results[0] is results[1] is results[2]
+            assert client._inflight_reads == {}, "请求结束后应移出进行中列表"
+
+            # 请求结束后再次调用会重新发送
+            await client._async_call_api("EpGetAll")
+            assert post.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_error(self, client):
+        """测试合并的只读请求失败时所有调用方收到同一个异常。"""
+        with patch.object(
+            client,
+            "_post_and_parse",
+            return_value={"code": 10005, "message": "error"},
+        ) as post:
+            results = await asyncio.gather(
+                client._async_call_api("EpGet", {"agt": "hub1", "me": "dev1"}),
+                client._async_call_api("EpGet", {"me": "dev1", "agt": "hub1"}),
+                return_exceptions=True,
+            )
+
+        post.assert_called_once()
+        assert isinstance(results[0], LifeSmartAuthError)
+        assert results[0] is results[1]
+
+    @pytest.mark.asyncio
+    async def test_write_calls_not_coalesced(self, client):
+        """测试写操作即使参数相同也各自发送请求。"""
+        params = {"agt": "hub1", "me": "dev1", "idx": "L1", "type": 0x81, "val": 1}
+        with patch.object(client, "_post_and_parse", return_value={"code": 0}) as post:
+            await asyncio.gather(
+                client._async_call_api("EpSet", params),
+                client._async_call_api("EpSet", params),
+            )
+
+        assert post.call_count == 2
+
+    @pytest.mark.parametrize(
+        "method, api_path, expected",
+        [
+            ("EpSet", "/api", CloudPriority.COMMAND),
+            ("SceneSet", "/api", CloudPriority.COMMAND),
+            ("SendKeys", "/irapi", CloudPriority.IR),
+            ("GetCategory", "/irapi", CloudPriority.IR),
+            ("EpGetAll", "/api", CloudPriority.BACKGROUND),
+            ("RoomGet", "/api", CloudPriority.BACKGROUND),
+        ],
+    )
+    def test_request_priority(self, client, method, api_path, expected):
+        """测试用户指令、红外请求与后台刷新的限流优先级。"""
+        assert client._request_priority(method, api_path) == expected
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error_code", [10008, 10017])
+    async def test_business_error_does_not_back_off(self, client, error_code):
+        """测试业务错误码 (内部错误、数据非法) 不会让限流器进入退避。"""
+        with (
+            patch.object(
+                client,
+                "_post_and_parse",
+                return_value={"code": error_code, "message": "busy"},
+            ),
+            patch.object(client._rate_limiter, "report_throttled") as throttled,
+        ):
+            with pytest.raises(LifeSmartAPIError):
+                await client._async_call_api("EpSet", {"agt": "hub1"})
+
+        throttled.assert_not_called()
+        assert client.rate_limit_stats["requests"] == 1
+        assert client.rate_limit_stats["active"] == 0, "失败的请求也应释放并发名额"
+
+    @pytest.mark.asyncio
+    async def test_http_429_honours_retry_after(self, client):
+        """测试 HTTP 429 响应的 Retry-After 被用作退避时间。"""
+        request_info = MagicMock(
+            real_url="https://api.cn2.ilifesmart.com/app/api.EpSet"
+        )
+        error = ClientResponseError(
+            request_info, (), status=429, headers={"Retry-After": "3"}
+        )
+        with (
+            patch.object(client, "_post_async", side_effect=error),
+            patch.object(client._rate_limiter, "report_throttled") as throttled,
+        ):
+            with pytest.raises(LifeSmartAPIError):
+                await client._async_call_api("EpSet", {"agt": "hub1"})
+
+        throttled.assert_called_once_with(3.0)
+
+
+class TestRetryAndCircuitBreaker:
+    """测试暂时性故障的重试与按接口的熔断。"""
+
+    @pytest.fixture(autouse=True)
+    def fast_retry(self):
+        """将重试间隔缩短，避免测试等待。"""
+        with patch.object(LifeSmartOAPIClient, "RETRY_BASE_DELAY", 0.001):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_idempotent_read_retried(self, client):
+        """测试幂等方法在网络故障后重试成功。"""
+        with patch.object(
+            client,
+            "_post_async",
+            side_effect=[
+                ClientError("reset"),
+                json.dumps({"code": 0, "message": []}),
+            ],
+        ) as post:
+            response = await client._async_call_api("SceneGet", {"agt": "hub1"})
+
+        assert response["code"] == 0
+        assert post.await_count == 2
+        assert client.resilience_stats["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retryable_error_code_retried_until_limit(self, client):
+        """测试可重试分类的错误码按 max_retries 重试后仍失败则引发异常。"""
+        with patch.object(
+            client, "_post_and_parse", return_value={"code": 10011, "message": ""}
+        ) as post:
+            with pytest.raises(LifeSmartAPIError):
+                await client._async_call_api("EpGetAll")
+
+        assert post.await_count == 1 + LifeSmartOAPIClient.MAX_RETRIES
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error_code", [10017, 10015])
+    async def test_non_retryable_error_code_not_retried(self, client, error_code):
+        """测试数据校验、权限等分类的错误码不重试。"""
+        with patch.object(
+            client, "_post_and_parse", return_value={"code": error_code}
+        ) as post:
+            with pytest.raises(LifeSmartAPIError):
+                await client._async_call_api("EpGetAll")
+
+        post.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_write_retried_only_when_not_delivered(self, client):
+        """测试写操作只在连接未能建立时重试，请求可能已送达时不重试。"""
+        not_delivered = ClientConnectorError(MagicMock(), OSError("refused"))
+        with patch.object(
+            client,
+            "_post_async",
+            side_effect=[
+                not_delivered,
+                ClientError("reset"),
+                json.dumps({"code": 0}),
+            ],
+        ) as post:
+            with pytest.raises(LifeSmartAPIError):
+                await client._async_call_api("EpSet", {"agt": "hub1"})
+
+        assert post.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_breaker_fails_fast_and_probes_recovery(self, client):
+        """测试接口熔断后请求立即失败，后台探测成功后恢复。"""
+        breaker = client._circuit_breaker("/api")
+        breaker.reset_timeout = 0.01
+        with patch.object(client, "_post_async", side_effect=ClientError("down")):
+            for _ in range(breaker.failure_threshold):
+                with pytest.raises(LifeSmartAPIError):
+                    await client._async_call_api("EpSet", {"agt": "hub1"})
+            assert breaker.is_open
+
+            with patch.object(client, "_post_and_parse") as post:
+                with pytest.raises(LifeSmartAPIError, match="暂时不可用"):
+                    await client._async_call_api("EpGetAll")
+                post.assert_not_awaited()
+
+        with patch.object(client, "_post_and_parse", return_value={"code": 0}) as post:
+            await asyncio.wait_for(breaker._probe_task, timeout=1)
+            assert post.await_args.args[1]["method"] == "AgtGetList"
+
+        assert not breaker.is_open
+        assert client.resilience_stats["breakers"]["/api"]["opens"] == 1
+        assert "/irapi" not in client.resilience_stats["breakers"]
+
+    def test_disconnect_cancels_probe(self, client):
+        """测试 disconnect 停止熔断器的后台探测。"""
+        breaker = client._circuit_breaker("/irapi")
+        with patch.object(breaker, "cancel") as cancel:
+            client.disconnect()
+
+        cancel.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_post_and_parse_network_failure(self, client):
         """测试网络请求失败的处理。"""
@@ -731,6 +944,75 @@ class TestDeviceControlHelpers:
             )
 
 
+class TestCommandBatching:
+    """测试 IO 写指令合并为 EpBatchSet 的功能。"""
+
+    @pytest.fixture
+    def batching_client(self, hass, client_config):
+        """提供启用了指令微批处理的客户端。"""
+        return LifeSmartOAPIClient(hass, **client_config, batch_window=0.01)
+
+    @pytest.mark.asyncio
+    async def test_batch_set_async(self, client, mock_async_call_api):
+        """测试 EpBatchSet 的请求参数与失败条目的解析。"""
+        items = [{"me": "dev1", "idx": "L1", "type": CMD_TYPE_ON, "val": 1}]
+        failed = [{**items[0], "ret": 10013}]
+        mock_async_call_api.return_value = {
+            "code": 0,
+            "message": {"failedIoitems": failed},
+        }
+
+        assert await client.batch_set_async("hub1", items) == failed
+        mock_async_call_api.assert_awaited_once_with(
+            "EpBatchSet",
+            {"agt": "hub1", "ioItems": json.dumps(items)},
+            api_path="/api",
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_commands_merged(
+        self, batching_client, mock_async_call_api
+    ):
+        """测试并发的单 IO 与多 IO 指令合并为一次 EpBatchSet 调用。"""
+        mock_async_call_api.return_value = {"code": 0, "message": {}}
+
+        results = await asyncio.gather(
+            batching_client.set_single_ep_async("hub1", "dev1", "L1", CMD_TYPE_ON, 1),
+            batching_client.set_multi_eps_async(
+                "hub1", "dev2", [{"idx": "RGBW", "type": CMD_TYPE_SET_VAL, "val": 5}]
+            ),
+        )
+
+        assert results == [0, 0]
+        mock_async_call_api.assert_awaited_once()
+        method, params = mock_async_call_api.await_args.args
+        assert method == "EpBatchSet"
+        assert json.loads(params["ioItems"]) == [
+            {"me": "dev1", "idx": "L1", "type": CMD_TYPE_ON, "val": 1},
+            {"me": "dev2", "idx": "RGBW", "type": CMD_TYPE_SET_VAL, "val": 5},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_item_raises_for_its_caller(
+        self, batching_client, mock_async_call_api
+    ):
+        """测试只有条目失败的调用方收到 LifeSmartAPIError。"""
+        mock_async_call_api.return_value = {
+            "code": 0,
+            "message": {"failedIoitems": [{"me": "dev2", "idx": "L1", "ret": 10013}]},
+        }
+
+        ok, failed = await asyncio.gather(
+            batching_client.set_single_ep_async("hub1", "dev1", "L1", CMD_TYPE_ON, 1),
+            batching_client.set_single_ep_async("hub1", "dev2", "L1", CMD_TYPE_ON, 1),
+            return_exceptions=True,
+        )
+
+        assert ok == 0
+        assert isinstance(failed, LifeSmartAPIError)
+        assert failed.code == 10013
+
+
 class TestCoverControlHelpers:
     """测试窗帘控制辅助方法的功能。"""
 
@@ -1034,6 +1316,44 @@ class TestSuperBowlAPIMethods:
         expected_brands = {"samsung": 1, "lg": 2, "sony": 3}
         assert result == expected_brands, "应该返回品牌字典"
 
+    @pytest.mark.asyncio
+    async def test_ir_catalog_served_from_cache(
+        self, hass, mock_async_call_api, client, client_config
+    ):
+        """测试红外码库查询经缓存，其他客户端实例的相同查询也不再访问网络。"""
+        mock_async_call_api.return_value = {"code": 0, "message": {"keys": ["POWER"]}}
+        other_client = LifeSmartOAPIClient(hass, **client_config)
+
+        first = await client.get_ir_remote_feature_async("tv", "sony", idx="1.irxs")
+        second = await other_client.get_ir_remote_feature_async(
+            "tv", "sony", idx="1.irxs"
+        )
+
+        assert first == second == {"keys": ["POWER"]}
+        mock_async_call_api.assert_called_once_with(
+            "GetRemoteFeature",
+            {"category": "tv", "brand": "sony", "idx": "1.irxs"},
+            api_path="/irapi",
+        )
+
+    @pytest.mark.asyncio
+    async def test_learned_remote_feature_not_cached(self, mock_async_call_api, client):
+        """测试已创建 (学习) 的遥控器特性不经码库缓存，每次都查询云端。"""
+        mock_async_call_api.return_value = {"code": 0, "message": {"keys": ["K1"]}}
+
+        for _ in range(2):
+            result = await client.get_ir_remote_feature_async(
+                "custom", "", agt="hub1", ai="AI_IR_1"
+            )
+
+        assert result == {"keys": ["K1"]}
+        assert mock_async_call_api.await_count == 2
+        mock_async_call_api.assert_called_with(
+            "GetRemoteFeature",
+            {"category": "custom", "brand": "", "agt": "hub1", "ai": "AI_IR_1"},
+            api_path="/irapi",
+        )
+
     @pytest.mark.asyncio
     async def test_get_ir_codes_async_with_keys(self, mock_async_call_api, client):
         """测试获取红外码 API（带按键参数）。"""
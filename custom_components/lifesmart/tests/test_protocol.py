@@ -18,6 +18,9 @@ from io import BytesIO
 import pytest
 
 from custom_components.lifesmart.core.protocol import (
+    CONFIG_PROFILE_FULL,
+    CONFIG_PROFILE_MINIMAL,
+    LifeSmartFrameAssembler,
     LifeSmartProtocol,
     LifeSmartPacketFactory,
     LSTimestamp,
@@ -361,6 +364,116 @@ class TestProtocolPacketHandling:
         assert decoded_packets[1] == packet2, "第二个包应该正确"
         assert decoded_packets[2] == packet3, "第三个包应该正确"
 
+    @pytest.mark.parametrize(
+        "wrap", [bytes, bytearray, memoryview], ids=["Bytes", "Bytearray", "View"]
+    )
+    def test_decode_accepts_buffer_types(self, protocol: LifeSmartProtocol, wrap):
+        """测试 decode 对 bytes/bytearray/memoryview 输入的解析结果一致。"""
+        packet1 = [{"seq": 1, "name": "客厅"}, {"raw": b"\xff\xfe"}]
+        packet2 = [{"seq": 2}]
+        stream = wrap(protocol.encode(packet1) + protocol.encode(packet2))
+
+        remaining, decoded = protocol.decode(stream)
+
+        assert decoded == packet1, "不同缓冲区类型的解码结果应该一致"
+        assert isinstance(remaining, bytes), "剩余数据应该以 bytes 返回"
+        assert protocol.decode(remaining) == (b"", packet2), "剩余数据应该可继续解码"
+
+    def test_parse_view_advances_cursor(self, protocol: LifeSmartProtocol):
+        """测试 _parse_view 返回解析值和游标位置，且不越过已消费的数据。"""
+        packed = protocol._pack_value({"label": "开关", "items": [1, 2]})
+        buf = memoryview(packed + b"\x04\x02")
+
+        value, pos = protocol._parse_view(buf, 1, packed[0])
+
+        assert value == {"label": "开关", "items": [1, 2]}, "解析值应该正确"
+        assert pos == len(packed), "游标应该停在已消费数据的末尾"
+        assert protocol._parse_view(buf, pos + 1, buf[pos]) == (1, len(buf))
+
+    def test_inline_normalization_matches_two_pass(self, protocol: LifeSmartProtocol):
+        """测试单遍规范化解析与“原始解析 + _normalize_structure”结果一致。"""
+        ts = b"\x06\x01" + protocol._encode_varint(1700000000 << 1)
+        packed = (
+            b"\x12\x03"
+            + protocol._pack_value("val", isKey=True)
+            + protocol._pack_value("enum:val")
+            + protocol._pack_value("91", isKey=True)
+            + ts
+            + protocol._pack_value("_chd", isKey=True)
+            + b"\x12\x02"
+            + protocol._pack_value("type", isKey=True)
+            + protocol._pack_value(129)
+            + protocol._pack_value("at")
+            + b"\x06\x02"
+            + protocol._encode_varint(9)  # ZigZag(-5)
+        )
+        buf = memoryview(packed)
+
+        raw, raw_pos = protocol._parse_view(buf, 1, packed[0])
+        inline, inline_pos = protocol._parse_view(buf, 1, packed[0], normalized=True)
+
+        assert inline_pos == raw_pos, "两种模式消费的字节数应该相同"
+        assert "enum:val" in raw, "原始模式应该保留 enum: 前缀"
+        assert inline == protocol._normalize_structure(raw), "单遍结果应与两遍一致"
+        assert inline["val"] == "val", "枚举值应该直接输出裸名称"
+        assert inline["91"] == 1700000000, "时间戳应该直接输出整数"
+        assert inline["_chd"] == {"type": 129, "at": -5}, "嵌套时间戳也应该规范化"
+
+    def test_schg_filter_skips_rejected_paths(self, protocol: LifeSmartProtocol):
+        """测试 _schg 选择性解码：未被接受的路径被跳过，其余内容与完整解码一致。"""
+        message = [
+            {"id": 7},
+            {
+                "_schg": {
+                    "agt/ep/keep/m/L1": {"chg": {"type": 129, "val": 1}},
+                    "agt/ep/skip/m/L1": {
+                        "chg": {"val": -3, "name": "跳过", "raw": b"\xff\x00"},
+                        "list": [None, True, False, [], {"deep": [1, 2]}],
+                    },
+                    "agt/ep/keep/m/L2": {"chg": {"type": 128, "val": 0}},
+                },
+                "act": "enum:val",
+            },
+        ]
+        packet = protocol.encode(message)
+        full = protocol.decode_payload(packet, 10, len(packet))
+
+        accept_all = protocol.decode_payload(packet, 10, len(packet), lambda _: True)
+        selected = protocol.decode_payload(
+            packet, 10, len(packet), lambda path: "/skip/" not in path
+        )
+
+        assert accept_all == full, "全部接受时结果应与完整解码一致"
+        del full[1]["_schg"]["agt/ep/skip/m/L1"]
+        assert selected == full, "被拒绝的路径应被省略，其余内容保持不变"
+        _, decoded = protocol.decode(packet, schg_filter=lambda _: False)
+        assert decoded[1]["_schg"] == {}, "全部拒绝时 _schg 应为空字典"
+        assert decoded[1]["act"] == "val", "_schg 之外的字段应正常解码"
+
+    def test_large_config_reply_decoding(self, protocol: LifeSmartProtocol):
+        """测试大型 get-config 回复（数百个端点）的解码。"""
+        eps = {
+            f"dev_{i:04d}": {
+                "cls": "SL_SW_IF3",
+                "name": f"开关 {i}",
+                "_chd": {
+                    "m": {
+                        "_chd": {
+                            f"L{j}": {"name": f"按钮 {j}", "val": j % 2, "type": 129}
+                            for j in range(1, 4)
+                        }
+                    }
+                },
+            }
+            for i in range(200)
+        }
+        groups = [dict(list(eps.items())[k : k + 100]) for k in range(0, 200, 100)]
+        reply = [{}, {"ret": [0, {"eps": groups[0]}, {"eps": groups[1]}]}]
+
+        _, decoded = protocol.decode(protocol.encode(reply))
+
+        assert decoded == reply, "大型配置回复应该正确解码"
+
     def test_partial_packet_handling(self, protocol: LifeSmartProtocol):
         """测试部分数据包的处理。"""
         test_message = [{"test": "partial_packet"}]
@@ -392,6 +505,251 @@ class TestProtocolPacketHandling:
         assert decoded_data == test_data, f"大小为{packet_size}的包数据应该一致"
 
 
+# ==================== 编码器输出一致性测试类 ====================
+
+
+# 由重构前（逐层 bytes 拼接）的编码器生成的基准输出，用于保证写入器
+# 重构后的编码结果逐字节一致。
+ENCODER_GOLDEN_CORPUS = [
+    (
+        "build_epset_packet",
+        ("dev1", "L1", 0x81, 1),
+        "474c303000000000004a0311045f73656c040213030313020414031304120513290402137911"
+        "016d1316110464657631132f11024c31134e048202130a110b746573745f6167742f65701309"
+        "1106726653657441",
+    ),
+    (
+        "build_multi_epset_packet",
+        ("dev1", [{"idx": "RGBW", "val": 12345}, {"idx": "DYN", "val": 0}]),
+        "474c30300000000000600311045f73656c040213030313020414031304120313291202040012"
+        "02132904f2c001132f1104524742570402120213290400132f110344594e137911016d131611"
+        "0464657631130a110b746573745f6167742f657013091106726653657441",
+    ),
+    (
+        "build_send_code_packet",
+        ("ir_dev", [1, 2, 3]),
+        "474c30300000000000750311045f73656c04021303031302041403130412051107637472"
+        "6c636d64110873656e64636f6465137911016d1103636d6411046374726c131611066972"
+        "5f6465761105706172616d1202134e04021104646174611105432a010203130a110b7465"
+        "73745f6167742f6570130911066570436d6441",
+    ),
+    (
+        "build_get_config_packet",
+        ("test_node",),
+        "474c303000000000009602130303130204140313041203130e120113621212135a0313720313"
+        "2a03130e120311016d040211017303136a040213590313270313380311015f11036570731106"
+        "505f466c697003110570747a6d720313530313260311076465765479706503132e03136c0311"
+        "047266696303131003137103130c1201130d03136a0402130a110f746573745f6e6f64652f6d"
+        "652f65701309135b",
+    ),
+]
+
+
+class TestEncoderOutputStability:
+    """测试编码器重构前后输出逐字节一致，并覆盖大负载的往返编解码。"""
+
+    @pytest.mark.parametrize(
+        "method_name, args, expected_hex",
+        ENCODER_GOLDEN_CORPUS,
+        ids=["EpSet", "MultiEpSet", "SendCode", "GetConfig"],
+    )
+    def test_factory_packets_match_golden_bytes(
+        self,
+        packet_factory: LifeSmartPacketFactory,
+        method_name: str,
+        args: tuple,
+        expected_hex: str,
+    ):
+        """测试工厂构建的数据包与基准输出逐字节一致。"""
+        packet = getattr(packet_factory, method_name)(*args)
+
+        assert packet.hex() == expected_hex, f"{method_name} 的编码输出应该保持不变"
+
+    def test_mixed_types_match_golden_bytes(self, protocol: LifeSmartProtocol):
+        """测试混合类型负载的编码输出与基准一致。"""
+        message = [
+            {
+                "n": None,
+                "t": True,
+                "f": False,
+                "i": -300,
+                "s": "中",
+                "b": b"\xff",
+                "l": [],
+                "enum:91": "::NULL::",
+            }
+        ]
+
+        assert protocol.encode(message).hex() == (
+            "474c30300000000000310811016e00110174021101660311016904d7041101731103e4b8"
+            "ad1101621101ff11016c01135b11083a3a4e554c4c3a3a"
+        ), "混合类型的编码输出应该保持不变"
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            {"val": [{"key": f"L{i}", "val": i, "type": 129} for i in range(200)]},
+            {"cmdlist": "SET,io,'/ep/dev',{L1=1};" * 400, "_": "trigger"},
+            {"param": {"enum:type": 1, "data": b"C*" + bytes(range(256)) * 16}},
+        ],
+        ids=["MultiIO", "SceneCmdlist", "RawIRCode"],
+    )
+    def test_large_payload_roundtrip(self, protocol: LifeSmartProtocol, value: dict):
+        """测试多IO、场景 cmdlist 与原始红外码等大负载的往返编解码。"""
+        packed = protocol._pack_value(value)
+        parsed, pos = protocol._parse_view(memoryview(packed), 1, packed[0])
+
+        assert pos == len(packed), "解析应该恰好消费全部编码数据"
+        assert protocol._normalize_structure(parsed) == protocol._normalize_structure(
+            value
+        ), "大负载往返编解码应该保持数据一致"
+
+        _, decoded = protocol.decode(protocol.encode([{}, value]))
+        assert decoded[1] == protocol._normalize_structure(value)
+
+    def test_compression_settings(self):
+        """测试可配置的压缩级别与阈值，且 ZZ00 输出对相同输入保持稳定。"""
+        message = [{"cmdlist": "SET,io,'/ep/dev',{L1=1};" * 100}]
+        default = LifeSmartProtocol()
+        fast = LifeSmartProtocol(compress_level=1)
+        never = LifeSmartProtocol(compress_threshold=10**9)
+
+        packet = default.encode(message)
+        assert packet.startswith(b"ZZ00"), "超过默认阈值的数据包应该被压缩"
+        assert packet == default.encode(message), "相同输入的压缩输出应该一致"
+        assert fast.encode(message).startswith(b"ZZ00")
+        assert never.encode(message).startswith(b"GL00"), "阈值之下不应压缩"
+        for proto in (default, fast, never):
+            assert proto.decode(proto.encode(message))[1] == message
+
+        factory = LifeSmartPacketFactory("agt", "node", compress_threshold=10**9)
+        scene = factory.build_add_scene_packet("scene", "SET,io;" * 300)
+        assert scene.startswith(b"GL00"), "工厂应该使用配置的压缩阈值"
+
+        with pytest.raises(ValueError, match="压缩级别"):
+            LifeSmartProtocol(compress_level=10)
+
+
+# ==================== 增量帧组装测试类 ====================
+
+
+class TestFrameAssembler:
+    """测试 LifeSmartFrameAssembler 的增量帧组装功能。"""
+
+    def test_byte_by_byte_feeding(self, protocol: LifeSmartProtocol):
+        """测试逐字节送入数据时，只有在帧完整后才产出结果。"""
+        message = [{"seq": 1}, {"_schg": {"agt/ep/dev/m/L1": {"chg": {"val": 1}}}}]
+        packet = protocol.encode(message)
+        assembler = LifeSmartFrameAssembler(protocol)
+
+        frames = []
+        for i in range(len(packet)):
+            frames.extend(assembler.feed(packet[i : i + 1]))
+            if i < len(packet) - 1:
+                assert not frames, "帧未完整前不应产出结果"
+
+        assert frames == [message], "完整帧应该被正确解码"
+        assert assembler.buffered == 0, "产出后不应残留缓存数据"
+
+    def test_multiple_frames_in_one_chunk(self, protocol: LifeSmartProtocol):
+        """测试一次送入多个完整帧和一个不完整帧。"""
+        messages = [[{"seq": i, "data": f"frame_{i}"}] for i in range(3)]
+        tail = protocol.encode([{"seq": 3}])
+        chunk = b"".join(protocol.encode(m) for m in messages) + tail[:5]
+        assembler = LifeSmartFrameAssembler(protocol)
+
+        assert list(assembler.feed(chunk)) == messages, "应该产出所有完整帧"
+        assert assembler.buffered == 5, "不完整帧的数据应该被缓存"
+        assert list(assembler.feed(tail[5:])) == [[{"seq": 3}]]
+
+    def test_compressed_frame_split_across_chunks(self, protocol: LifeSmartProtocol):
+        """测试 ZZ00 压缩帧跨多次读取到达，且后面紧跟下一帧。"""
+        large_message = [{"large_data": "X" * 2048, "repeat": i} for i in range(5)]
+        compressed = protocol.encode(large_message)
+        assert compressed.startswith(b"ZZ00"), "测试数据应该触发压缩"
+        following = [{"seq": "next"}]
+        stream = compressed + protocol.encode(following)
+        assembler = LifeSmartFrameAssembler(protocol)
+
+        frames = []
+        for i in range(0, len(stream), 37):
+            frames.extend(assembler.feed(stream[i : i + 37]))
+
+        assert frames == [large_message, following], "压缩帧及其后续帧都应该被解码"
+        assert assembler.buffered == 0
+
+    def test_unknown_header_resets_buffer(self, protocol: LifeSmartProtocol):
+        """测试无法识别的包头会清空缓冲区并抛出 ValueError。"""
+        assembler = LifeSmartFrameAssembler(protocol)
+
+        with pytest.raises(ValueError, match="未知的包头"):
+            list(assembler.feed(b"XXXX\x00\x00\x00\x00\x00\x01\x00"))
+
+        assert assembler.buffered == 0, "无法同步时应该清空缓冲区"
+        message = [{"seq": 1}]
+        assert list(assembler.feed(protocol.encode(message))) == [message]
+
+    def test_corrupted_frame_is_dropped(self, protocol: LifeSmartProtocol):
+        """测试损坏的完整帧被丢弃后，后续帧仍可正常解析。"""
+        corrupted = b"GL00\x00\x00\x00\x00\x00\x02\x05\x11"
+        message = [{"seq": 2}]
+        assembler = LifeSmartFrameAssembler(protocol)
+
+        with pytest.raises(EOFError):
+            list(assembler.feed(corrupted + protocol.encode(message)))
+
+        assert list(assembler.feed(b"")) == [message], "后续帧应该可以继续解析"
+
+    def test_oversized_frames_rejected(self, protocol: LifeSmartProtocol):
+        """测试声明长度或解压后长度超出上限的帧被拒绝，且不会继续缓存数据。"""
+        assembler = LifeSmartFrameAssembler(protocol)
+        with pytest.raises(ValueError, match="超出上限"):
+            list(assembler.feed(b"GL00\x00\x00\xff\xff\xff\xff" + b"\x00" * 32))
+        assert assembler.buffered == 0, "超限帧应该被丢弃"
+
+        protocol.MAX_PACKET_SIZE = 2048
+        bomb = protocol.encode([{"data": "A" * 8192}])
+        # 伪造一个较小的声明长度，实际解压数据远超上限
+        bomb = bomb[:6] + (1024).to_bytes(4, "big") + bomb[10:]
+        with pytest.raises(ValueError, match="解压后的数据超出上限"):
+            list(assembler.feed(bomb))
+        assert assembler.buffered == 0, "解压超限时应该清空缓冲区"
+
+    @pytest.mark.parametrize("compress", [False, True], ids=["GL00", "ZZ00"])
+    def test_config_endpoints_streamed_before_frame_completes(
+        self, protocol: LifeSmartProtocol, compress: bool
+    ):
+        """测试 get-config 应答完整到达前，已到齐的端点逐个交给监听器。"""
+        if not compress:
+            protocol.compress_threshold = 1 << 30
+        eps = {
+            f"ep_{i:03d}": {"cls": "SL_SW_IF1", "name": f"开关 {i}", "ver": "1.0"}
+            for i in range(120)
+        }
+        message = [{"req": True}, {"ret": [0, {"eps": eps}], "act": "GetConfig"}]
+        push = [{"seq": 1}, {"_schg": {"agt/ep/dev/m/L1": {"chg": {"val": 1}}}}]
+        stream = protocol.encode(push) + protocol.encode(message)
+        assert stream[len(protocol.encode(push)) :].startswith(
+            b"ZZ00" if compress else b"GL00"
+        )
+        assembler = LifeSmartFrameAssembler(protocol)
+        streamed = []
+        assembler.config_listener = lambda devid, dev: streamed.append((devid, dev))
+
+        frames, streamed_before_complete = [], 0
+        for i in range(0, len(stream), 64):
+            frames.extend(assembler.feed(stream[i : i + 64]))
+            if len(frames) < 2:
+                streamed_before_complete = len(streamed)
+
+        assert frames == [push, message]
+        assert 0 < streamed_before_complete, "端点应该在整帧到达前产出"
+        assert streamed == list(frames[1][1]["ret"][1]["eps"].items())
+        assert all(
+            dev is frames[1][1]["ret"][1]["eps"][devid] for devid, dev in streamed
+        ), "整帧解码应该沿用扫描出的端点，而不是再解析一遍"
+
+
 # ==================== 协议错误处理测试类 ====================
 
 
@@ -485,6 +843,38 @@ class TestProtocolErrorHandling:
                 BytesIO(incomplete_timestamp_data), 0x06
             )  # 时间戳类型码
 
+    def test_compressed_packet_size_limits(self, protocol: LifeSmartProtocol):
+        """测试 ZZ00 包的声明长度和实际解压长度都受 MAX_PACKET_SIZE 约束。"""
+        protocol.MAX_PACKET_SIZE = 4096
+        packet = protocol.encode([{"data": "B" * 3000}])
+        assert protocol.decode(packet)[1] == [{"data": "B" * 3000}]
+
+        declared_too_large = packet[:6] + (8192).to_bytes(4, "big") + packet[10:]
+        with pytest.raises(ValueError, match="声明的长度"):
+            protocol.decode(declared_too_large)
+
+        bomb = LifeSmartProtocol().encode([{"data": "B" * 20000}])
+        bomb = bomb[:6] + (1024).to_bytes(4, "big") + bomb[10:]
+        with pytest.raises(ValueError, match="解压后的数据超出上限"):
+            protocol.decode(bomb)
+
+        with pytest.raises(EOFError, match="压缩数据不完整"):
+            protocol.decode(packet[:-8])
+
+    def test_truncated_nested_value_reports_call_stack(
+        self, protocol: LifeSmartProtocol, caplog
+    ):
+        """测试嵌套结构中途截断时，错误日志包含由解析栈重建的调用栈位置。"""
+        packed = protocol._pack_value({"items": [1, 2, "三"]})
+        truncated = memoryview(packed[:-2])
+
+        with pytest.raises(EOFError, match="字符串数据不足"):
+            protocol._parse_view(truncated, 1, packed[0])
+
+        errors = [r for r in caplog.records if r.levelname == "ERROR"]
+        assert len(errors) == 1, "非递归解析器对一次错误只应记录一条日志"
+        assert "调用栈[[0].val[2].val]" in errors[0].getMessage()
+
 
 # ==================== 数据包工厂测试类 ====================
 
@@ -499,6 +889,24 @@ class TestPacketFactoryConstruction:
         assert factory.node_agt == "test_agt", "节点AGT应该正确设置"
         assert factory.node == "test_node", "节点名称应该正确设置"
 
+    def test_command_packets_carry_increasing_sel(
+        self, packet_factory: LifeSmartPacketFactory, protocol: LifeSmartProtocol
+    ):
+        """测试每个指令包写入递增的 _sel 序号，并在达到上限后回绕。"""
+        packets = [
+            packet_factory.build_epset_packet("dev1", "L1", 0x81, 1),
+            packet_factory.build_multi_epset_packet("dev1", [{"idx": "L1"}]),
+            packet_factory.build_set_scene_packet("X" * 1200),
+        ]
+        sels = [protocol.decode(packet)[1][0]["_sel"] for packet in packets]
+        assert sels == [1, 2, 3], "每个指令包应该使用新的序号"
+        assert [p.sel for p in packets] == sels, "包对象应该携带写入其中的序号"
+
+        packet_factory._sel = LifeSmartPacketFactory.SEL_MAX
+        packet = packet_factory.build_set_scene_packet("scene")
+        assert packet.sel == 1, "序号应该回绕到1"
+        assert protocol.decode(packet)[1][0]["_sel"] == 1
+
     @pytest.mark.parametrize(
         "method_name, args, expected_structure",
         [
@@ -592,6 +1000,84 @@ class TestPacketFactoryConstruction:
                     decoded_data[1][key] == expected_value
                 ), f"{method_name}的{key}字段应该正确"
 
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ("dev1", "L1", 0x81, 1),
+            ("dev2", "P1", 0xCF, -1),
+            ("dev3", "RGBW", 0xFF, 0xFFFFFF),
+            ("dev4", "val", 0x81, "enum:val"),
+            ("dev5", "L1", 0x81, "X" * 1200),
+        ],
+        ids=["Switch", "Negative", "Color", "EnumLikeValue", "Compressed"],
+    )
+    def test_epset_template_matches_full_encode(
+        self,
+        packet_factory: LifeSmartPacketFactory,
+        protocol: LifeSmartProtocol,
+        args: tuple,
+    ):
+        """测试预编译模板构建的 EpSet 包与完整 encode() 的结果一致。"""
+        devid, idx, command_type, val = args
+        expected = protocol.encode(
+            [
+                {"_sel": 1, "req": False, "timestamp": 10},
+                {
+                    "args": {
+                        "val": val,
+                        "valtag": "m",
+                        "devid": devid,
+                        "key": idx,
+                        "type": command_type,
+                    },
+                    "node": "test_agt/ep",
+                    "act": "rfSetA",
+                },
+            ]
+        )
+
+        packet = packet_factory.build_epset_packet(*args)
+
+        assert protocol.decode(packet) == protocol.decode(expected)
+        if not expected.startswith(b"ZZ00"):
+            assert packet == expected, "未压缩的模板输出应该逐字节一致"
+
+    def test_template_cache_follows_node_changes(
+        self, packet_factory: LifeSmartPacketFactory, protocol: LifeSmartProtocol
+    ):
+        """测试 node/node_agt 变化后缓存片段随之更新，get-config 包按 node 缓存。"""
+        first = packet_factory.build_get_config_packet("node_a")
+        assert packet_factory.build_get_config_packet("node_a") is first
+        _, decoded = protocol.decode(packet_factory.build_get_config_packet("node_b"))
+        assert decoded[1]["node"] == "node_b/me/ep", "不同 node 应该生成不同的包"
+
+        packet_factory.node_agt = "other_agt"
+        _, decoded = protocol.decode(
+            packet_factory.build_epset_packet("dev1", "L1", 0x81, 1)
+        )
+        assert decoded[1]["node"] == "other_agt/ep", "node_agt 变化后应使用新的节点"
+
+    def test_get_config_projection_profiles(
+        self, packet_factory: LifeSmartPacketFactory, protocol: LifeSmartProtocol
+    ):
+        """测试 minimal 投影只请求平台需要的字段，且与 full 分别缓存。"""
+        full = packet_factory.build_get_config_packet("node")
+        minimal = packet_factory.build_get_config_packet("node", CONFIG_PROFILE_MINIMAL)
+        assert full is packet_factory.build_get_config_packet(
+            "node", CONFIG_PROFILE_FULL
+        ), "默认投影应为 full"
+        assert len(minimal) < len(full)
+
+        _, decoded = protocol.decode(minimal)
+        fields = decoded[1]["args"]["14"]["98"]
+        assert set(fields) == {"ver", "14", "cls", "_", "name"}
+        assert fields["_"] == "eps"
+        assert fields["14"] == {"m": 1, "s": False, "_chd": 1}
+        assert decoded[1]["act"] == "91"
+
+        with pytest.raises(ValueError):
+            packet_factory.build_get_config_packet("node", "unknown")
+
     def test_multi_epset_packet_structure(
         self, packet_factory: LifeSmartPacketFactory, protocol: LifeSmartProtocol
     ):
@@ -719,6 +1205,22 @@ class TestProtocolPerformanceAndLimits:
 
         assert decoded_message == test_message, "深度嵌套结构应该正确处理"
 
+    def test_nesting_beyond_recursion_limit(self, protocol: LifeSmartProtocol):
+        """测试嵌套深度超过 Python 递归限制时，显式栈解析器仍能正确解码。"""
+        import sys
+
+        depth = sys.getrecursionlimit() + 100
+        packed = b"\x12\x01" + protocol._pack_value("k", isKey=True)
+        payload = packed * depth + protocol._pack_value("bottom")
+        buf = memoryview(payload)
+
+        value, pos = protocol._parse_view(buf, 1, payload[0])
+
+        assert pos == len(payload), "应该消费全部数据"
+        for _ in range(depth - 1):
+            value = value["k"]
+        assert value == {"k": "bottom"}, "最内层的值应该正确"
+
     def test_concurrent_encoding_decoding(self, protocol: LifeSmartProtocol):
         """测试并发编码解码的数据一致性。"""
         import threading
@@ -0,0 +1,349 @@
+"""
+LifeSmart 协议层性能基准测试。
+
+使用合成但贴近真实场景的语料测量 LifeSmartProtocol 与 LifeSmartPacketFactory 的
+编解码性能，包括：
+- 10/100/1000 个端点的 get-config 回复（超过压缩阈值时为 gzip 压缩的 ZZ00 帧）
+- 经 LifeSmartFrameAssembler 处理的 `_schg` 增量推送突发
+- 多 IO 的 EpSet 指令构建与解析
+
+语料由 scripts/protocol_benchmark_corpus.py 生成，与 scripts/benchmark_protocol.py
+共用。每个用例报告帧/秒、字节/秒、每帧新分配的内存块数与单次执行的内存
+分配峰值 (tracemalloc)。
+基准测试完全离线运行，
+由于计时受机器负载影响，默认跳过，需要显式开启：
+
+    LIFESMART_BENCHMARK=1 pytest -m benchmark
+
+结果写入仓库根目录的 bench_output.txt，并与 protocol_benchmark_baseline.json
+中存储的基线比较；设置 LIFESMART_BENCHMARK_UPDATE=1 时以本次结果覆盖基线。
+语料本身的正确性测试不受开关影响，始终运行。
+"""
+
+import functools
+import gc
+import json
+import os
+import platform
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from custom_components.lifesmart.core.protocol import (
+    LifeSmartFrameAssembler,
+    LifeSmartPacketFactory,
+    LifeSmartProtocol,
+)
+from scripts.protocol_benchmark_corpus import (
+    build_config_reply,
+    build_multi_epset_ios,
+    build_schg_burst,
+)
+
+BENCHMARK_ENABLED = bool(os.environ.get("LIFESMART_BENCHMARK"))
+UPDATE_BASELINE = bool(os.environ.get("LIFESMART_BENCHMARK_UPDATE"))
+# 吞吐量低于基线的该比例时判定为回归；计时受机器负载影响，因此容差较宽
+THROUGHPUT_TOLERANCE = float(os.environ.get("LIFESMART_BENCHMARK_TOLERANCE", "0.5"))
+# 每帧分配块数或内存分配峰值超过基线的该比例时判定为回归
+# (仅在 Python 版本一致时比较)
+ALLOCATION_TOLERANCE = 0.25
+# 每个用例的目标计时时长 (秒)，取多轮中的最优值
+TARGET_SECONDS = 0.2
+ROUNDS = 5
+
+BASELINE_PATH = Path(__file__).with_name("protocol_benchmark_baseline.json")
+OUTPUT_PATH = Path(__file__).resolve().parents[3] / "bench_output.txt"
+
+
+# ==================== 基准用例 ====================
+
+
+@dataclass
+class BenchmarkCase:
+    """一个基准用例：`run()` 每次处理 `frames` 帧、共 `size` 字节。"""
+
+    name: str
+    run: Callable[[], object]
+    frames: int
+    size: int
+
+
+ENDPOINT_COUNTS = (10, 100, 1000)
+BENCHMARK_CASE_NAMES = [
+    *(
+        f"{op} get-config {endpoints} eps"
+        for endpoints in ENDPOINT_COUNTS
+        for op in ("encode", "decode")
+    ),
+    "decode _schg burst x200",
+    "encode multi-epset 20 ios",
+    "decode multi-epset 20 ios",
+    "encode epset",
+]
+
+
+@functools.cache
+def build_benchmark_cases() -> dict[str, BenchmarkCase]:
+    """构建所有编解码基准用例 (按名称索引)。
+
+    编码 1000 个端点的语料需要一定时间，因此只在首次使用时构建，
+    不影响普通测试的收集。
+    """
+    proto = LifeSmartProtocol()
+    factory = LifeSmartPacketFactory("bench_agt", "bench_node")
+    cases = []
+
+    for endpoints in ENDPOINT_COUNTS:
+        message = build_config_reply(endpoints)
+        packet = proto.encode(message)
+        cases.append(
+            BenchmarkCase(
+                f"encode get-config {endpoints} eps",
+                lambda message=message: proto.encode(message),
+                1,
+                len(packet),
+            )
+        )
+        cases.append(
+            BenchmarkCase(
+                f"decode get-config {endpoints} eps",
+                lambda packet=packet: proto.decode(packet),
+                1,
+                len(packet),
+            )
+        )
+
+    burst = b"".join(proto.encode(message) for message in build_schg_burst(200))
+
+    def feed_burst():
+        return list(LifeSmartFrameAssembler(proto).feed(burst))
+
+    cases.append(BenchmarkCase("decode _schg burst x200", feed_burst, 200, len(burst)))
+
+    ios = build_multi_epset_ios(20)
+    multi = factory.build_multi_epset_packet("ep_0001", ios)
+    cases.append(
+        BenchmarkCase(
+            "encode multi-epset 20 ios",
+            lambda: factory.build_multi_epset_packet("ep_0001", ios),
+            1,
+            len(multi),
+        )
+    )
+    cases.append(
+        BenchmarkCase(
+            "decode multi-epset 20 ios",
+            lambda: proto.decode(multi),
+            1,
+            len(multi),
+        )
+    )
+    epset = factory.build_epset_packet("ep_0001", "L1", 0x81, 1)
+    cases.append(
+        BenchmarkCase(
+            "encode epset",
+            lambda: factory.build_epset_packet("ep_0001", "L1", 0x81, 1),
+            1,
+            len(epset),
+        )
+    )
+    return {case.name: case for case in cases}
+
+
+# ==================== 测量与基线 ====================
+
+
+def measure_allocations(case: BenchmarkCase) -> tuple[int, int]:
+    """返回单次执行的 (内存峰值增量字节数, 新分配的内存块数)。
+
+    块数是执行前后两次 tracemalloc 快照之差的 `count`。执行结果在第二次快照
+    之后才释放，因此计入解码出的整个对象树；执行中途已释放的临时对象只体现在
+    峰值中。tracemalloc 自身的分配被过滤掉。
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = case.run()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(
+        before.filter_traces(ignore), "filename"
+    )
+    blocks = sum(stat.count_diff for stat in diff)
+    return max(peak - current, 0), max(blocks, 0)
+
+
+def measure(case: BenchmarkCase) -> dict:
+    """测量用例的吞吐量、每帧分配块数和单次执行的内存分配峰值。"""
+    case.run()  # 预热，填充工厂缓存等一次性状态
+    peak, blocks = measure_allocations(case)
+
+    start = time.perf_counter()
+    case.run()
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    number = max(1, int(TARGET_SECONDS / ROUNDS / elapsed))
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(number):
+            case.run()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    return {
+        "frames_per_sec": round(case.frames / best, 1),
+        "bytes_per_sec": round(case.size / best),
+        "allocs_per_frame": round(blocks / case.frames, 1),
+        "peak_alloc_kib": round(peak / 1024, 1),
+    }
+
+
+def load_baseline() -> dict:
+    """读取已存储的基线，不存在时返回空基线。"""
+    if not BASELINE_PATH.exists():
+        return {"python": None, "cases": {}}
+    return json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+
+
+def python_version() -> str:
+    """返回 `主版本.次版本` 形式的 Python 版本，用于判断分配数据是否可比。"""
+    return ".".join(platform.python_version_tuple()[:2])
+
+
+def compare_with_baseline(name: str, result: dict, baseline: dict) -> list[str]:
+    """将测量结果与基线比较，返回回归描述列表。"""
+    reference = baseline["cases"].get(name)
+    if not reference:
+        return []
+    problems = []
+    for metric in ("frames_per_sec", "bytes_per_sec"):
+        floor = reference[metric] * (1 - THROUGHPUT_TOLERANCE)
+        if result[metric] < floor:
+            problems.append(
+                f"{metric} {result[metric]} 低于基线 {reference[metric]} "
+                f"的 {1 - THROUGHPUT_TOLERANCE:.0%}"
+            )
+    if baseline.get("python") == python_version():
+        for metric in ("allocs_per_frame", "peak_alloc_kib"):
+            if metric not in reference:
+                continue
+            ceiling = reference[metric] * (1 + ALLOCATION_TOLERANCE) + 1
+            if result[metric] > ceiling:
+                problems.append(
+                    f"{metric} {result[metric]} 超过基线 {reference[metric]}"
+                )
+    return problems
+
+
+def format_report(results: dict, baseline: dict) -> str:
+    """将结果格式化为文本报告，附带相对基线的吞吐量比值。"""
+    lines = [
+        f"LifeSmart protocol benchmark (Python {platform.python_version()})",
+        f"{'case':<40} {'frames/s':>12} {'MB/s':>8} {'allocs/frame':>13} "
+        f"{'peak KiB':>10} {'vs baseline':>11}",
+    ]
+    for name, result in results.items():
+        reference = baseline["cases"].get(name)
+        ratio = (
+            f"{result['frames_per_sec'] / reference['frames_per_sec']:.2f}x"
+            if reference
+            else "-"
+        )
+        lines.append(
+            f"{name:<40} {result['frames_per_sec']:>12.1f} "
+            f"{result['bytes_per_sec'] / 1e6:>8.2f} "
+            f"{result['allocs_per_frame']:>13.1f} "
+            f"{result['peak_alloc_kib']:>10.1f} {ratio:>11}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture(scope="module")
+def benchmark_results():
+    """收集本模块所有基准结果，结束时写出报告并按需更新基线。"""
+    results: dict[str, dict] = {}
+    yield results
+    if not results:
+        return
+    baseline = load_baseline()
+    report = format_report(results, baseline)
+    OUTPUT_PATH.write_text(report, encoding="utf-8")
+    print("\n" + report)
+    if UPDATE_BASELINE:
+        BASELINE_PATH.write_text(
+            json.dumps(
+                {"python": python_version(), "cases": results},
+                ensure_ascii=False,
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+
+
+# ==================== 语料正确性测试 ====================
+
+
+class TestBenchmarkCorpus:
+    """测试基准语料本身可被正确编解码，保证基准测量的是真实路径。"""
+
+    @pytest.mark.parametrize("endpoints", [10, 100])
+    def test_config_reply_roundtrip(self, endpoints: int):
+        """测试 get-config 回复语料的编解码往返。"""
+        proto = LifeSmartProtocol()
+        message = build_config_reply(endpoints)
+        packet = proto.encode(message)
+
+        remaining, decoded = proto.decode(packet)
+
+        assert not remaining, "解码后不应有剩余数据"
+        assert packet[:4] == b"ZZ00", "大型配置回复应该被压缩"
+        assert decoded == message, "配置回复语料应该往返一致"
+
+    def test_schg_burst_through_assembler(self):
+        """测试 _schg 突发语料经帧组装器逐帧产出。"""
+        proto = LifeSmartProtocol()
+        messages = build_schg_burst(20)
+        stream = b"".join(proto.encode(message) for message in messages)
+
+        frames = list(LifeSmartFrameAssembler(proto).feed(stream))
+
+        assert frames == messages, "每条 _schg 推送都应被完整解码"
+
+    def test_benchmark_cases_run(self):
+        """测试所有基准用例都能执行且帧数、字节数有效。"""
+        cases = build_benchmark_cases()
+        assert list(cases) == BENCHMARK_CASE_NAMES, "用例名称应与参数化列表一致"
+        for case in cases.values():
+            assert case.run() is not None, f"{case.name} 应该返回结果"
+            assert case.frames > 0 and case.size > 0, f"{case.name} 参数无效"
+
+
+# ==================== 性能基准 ====================
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not BENCHMARK_ENABLED, reason="设置 LIFESMART_BENCHMARK=1 启用")
+class TestProtocolBenchmark:
+    """测量编解码吞吐量与分配，并与存储的基线比较。"""
+
+    @pytest.mark.parametrize("name", BENCHMARK_CASE_NAMES)
+    def test_benchmark(self, name: str, benchmark_results: dict):
+        """测量单个用例，吞吐量或分配明显劣于基线时失败。"""
+        result = measure(build_benchmark_cases()[name])
+        benchmark_results[name] = result
+
+        if UPDATE_BASELINE:
+            return
+        problems = compare_with_baseline(name, result, load_baseline())
+        assert not problems, f"{name} 性能回归: {'; '.join(problems)}"
@@ -0,0 +1,138 @@
+"""
+LifeSmart 本地入站更新队列测试套件。
+
+此测试文件专门测试 core/receive_queue.py 中的入站更新队列，包括：
+- 消费任务按入队顺序分批分发
+- 队列已满时按 IO 合并为最新值
+- 队列已满时丢弃最早的更新，控制类事件不被丢弃
+- 回调异常不影响后续分发
+- 延迟、合并与丢弃统计
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.lifesmart.core.receive_queue import LifeSmartReceiveQueue
+
+
+def dispatched(callback) -> list:
+    """返回回调依次收到的数据。"""
+    return [call.args[0] for call in callback.await_args_list]
+
+
+class TestDispatch:
+    """测试正常分发。"""
+
+    @pytest.mark.asyncio
+    async def test_updates_dispatched_in_order(self):
+        """测试未满时每个更新都按入队顺序分发，并按批次让出事件循环。"""
+        queue = LifeSmartReceiveQueue()
+        queue.BATCH_SIZE = 2
+        callback = AsyncMock()
+        queue.start(callback)
+
+        for i in range(5):
+            queue.put("L1", {"val": i})
+        await asyncio.sleep(0.01)
+
+        assert dispatched(callback) == [{"val": i} for i in range(5)]
+        assert queue.stats.batches == 3
+        assert queue.stats.dispatched == 5
+        assert queue.stats.coalesced == queue.stats.dropped == 0
+        assert queue.depth == 0
+        queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_callback_error_does_not_stop_consumer(self):
+        """测试回调异常被记录，之后的更新继续分发。"""
+        queue = LifeSmartReceiveQueue()
+        callback = AsyncMock(side_effect=[RuntimeError("实体异常"), None])
+        queue.start(callback)
+
+        queue.put("a", {"val": 1})
+        queue.put("b", {"val": 2})
+        await asyncio.sleep(0.01)
+
+        assert callback.await_count == 2
+        assert queue.running
+        queue.stop()
+        assert not queue.running
+
+    @pytest.mark.asyncio
+    async def test_lag_measured_while_consumer_busy(self):
+        """测试慢速回调期间更新在队列中等待，并记录分发延迟。"""
+        queue = LifeSmartReceiveQueue()
+        release = asyncio.Event()
+
+        async def slow_callback(data):
+            await release.wait()
+
+        callback = AsyncMock(side_effect=slow_callback)
+        queue.start(callback)
+
+        queue.put("a", {"val": 1})
+        await asyncio.sleep(0.01)
+        queue.put("b", {"val": 2})
+        await asyncio.sleep(0.02)
+        assert queue.depth == 1, "回调阻塞期间新更新应该在队列中等待"
+
+        release.set()
+        await asyncio.sleep(0.01)
+
+        assert queue.stats.max_lag >= 0.02
+        assert queue.stats.avg_lag > 0
+        queue.stop()
+
+
+class TestOverflow:
+    """测试队列已满时的溢出策略。"""
+
+    @pytest.mark.asyncio
+    async def test_full_queue_coalesces_same_io(self):
+        """测试队列已满时同一个 IO 的新更新合并为最新值，并保留原有位置。"""
+        queue = LifeSmartReceiveQueue(max_size=2)
+        callback = AsyncMock()
+
+        queue.put("L1", {"val": 1})
+        queue.put("L2", {"val": 1})
+        queue.put("L1", {"val": 2})
+        queue.put("L1", {"val": 3})
+        queue.start(callback)
+        await asyncio.sleep(0.01)
+
+        assert dispatched(callback) == [{"val": 3}, {"val": 1}]
+        assert queue.stats.coalesced == 2
+        assert queue.stats.dropped == 0
+        assert queue.stats.enqueued == 4
+        queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_oldest(self):
+        """测试队列已满且 IO 不同时丢弃最早的更新，但保留重新加载请求。"""
+        queue = LifeSmartReceiveQueue(max_size=2)
+        callback = AsyncMock()
+
+        queue.put("reload", {"reload": True}, droppable=False)
+        queue.put("L1", {"val": 1})
+        queue.put("L2", {"val": 2})
+        queue.put("L3", {"val": 3})
+        queue.start(callback)
+        await asyncio.sleep(0.01)
+
+        assert dispatched(callback) == [{"reload": True}, {"val": 3}]
+        assert queue.stats.dropped == 2
+        assert queue.stats.max_depth == 2
+        queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_discards_pending(self):
+        """测试停止时丢弃尚未分发的更新。"""
+        queue = LifeSmartReceiveQueue()
+        queue.put("L1", {"val": 1})
+
+        queue.stop()
+
+        assert queue.depth == 0
+        assert not queue.running
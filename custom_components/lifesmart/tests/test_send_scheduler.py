@@ -0,0 +1,140 @@
+"""
+LifeSmart 本地出站发送调度器测试套件。
+
+此测试文件专门测试 core/send_scheduler.py 中的发送调度器，包括：
+- 同一事件循环周期内排入的数据包合并为一次写入
+- 优先级队列 (交互指令优先于批量操作和心跳)
+- 单次写入的长度上限
+- 连接断开时排队数据包的失败处理
+- 队列深度与等待时间统计
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.lifesmart.core.send_scheduler import (
+    LifeSmartSendScheduler,
+    SendPriority,
+)
+
+
+@pytest.fixture
+def writer():
+    """模拟的 StreamWriter，记录每次写入的数据。"""
+    writer = MagicMock()
+    writer.drain = AsyncMock()
+    writer.is_closing = MagicMock(return_value=False)
+    return writer
+
+
+@pytest.fixture
+def scheduler(writer):
+    """使用模拟 writer 的发送调度器。"""
+    return LifeSmartSendScheduler(lambda: writer)
+
+
+def written(writer) -> list[bytes]:
+    """返回 writer 每次收到的写入数据。"""
+    return [call.args[0] for call in writer.write.call_args_list]
+
+
+class TestWriteCoalescing:
+    """测试写入合并。"""
+
+    @pytest.mark.asyncio
+    async def test_packets_in_one_tick_written_once(self, scheduler, writer):
+        """测试同一周期内排入的 30 个包只产生一次写入和一次 drain。"""
+        packets = [f"pkt{i:02d};".encode() for i in range(30)]
+
+        await asyncio.gather(*(scheduler.send(packet) for packet in packets))
+
+        assert written(writer) == [b"".join(packets)], "应该按入队顺序合并为一次写入"
+        writer.drain.assert_awaited_once()
+        assert scheduler.stats.writes == 1
+        assert scheduler.stats.packets == 30
+        assert scheduler.stats.packets_per_write == 30
+        assert scheduler.stats.max_depth == 30, "应该记录队列的最大深度"
+        assert scheduler.depth == 0
+
+    @pytest.mark.asyncio
+    async def test_priority_lanes_during_backpressure(self, scheduler, writer):
+        """测试 drain 期间排入的包按优先级写出，交互指令排在心跳和批量操作之前。"""
+        release = asyncio.Event()
+        writer.drain.side_effect = release.wait
+
+        first = asyncio.create_task(scheduler.send(b"first;"))
+        await asyncio.sleep(0.01)
+        queued = [
+            asyncio.create_task(scheduler.send(b"heartbeat;", SendPriority.BACKGROUND)),
+            asyncio.create_task(scheduler.send(b"scene;", SendPriority.BULK)),
+            asyncio.create_task(scheduler.send(b"switch;")),
+        ]
+        await asyncio.sleep(0.01)
+        assert scheduler.lane_depths() == {
+            "interactive": 1,
+            "bulk": 1,
+            "background": 1,
+        }, "drain 期间新包应该在各自的队列中等待"
+
+        release.set()
+        await asyncio.gather(first, *queued)
+
+        assert written(writer) == [b"first;", b"switch;scene;heartbeat;"]
+        assert scheduler.stats.max_wait >= scheduler.stats.avg_wait > 0
+
+    @pytest.mark.asyncio
+    async def test_write_size_limit(self, scheduler, writer):
+        """测试单次写入不超过 MAX_WRITE_SIZE，超出部分在后续写入中发送。"""
+        scheduler.MAX_WRITE_SIZE = 10
+        packets = [b"aaaa", b"bbbb", b"cccc", b"d" * 20]
+
+        await asyncio.gather(*(scheduler.send(packet) for packet in packets))
+
+        assert written(writer) == [b"aaaabbbb", b"cccc", b"d" * 20]
+
+
+class TestFailureHandling:
+    """测试连接不可用或断开时的处理。"""
+
+    @pytest.mark.asyncio
+    async def test_send_without_writer(self):
+        """测试没有可用连接时发送失败。"""
+        scheduler = LifeSmartSendScheduler(lambda: None)
+
+        with pytest.raises(ConnectionError):
+            await scheduler.send(b"packet")
+        assert scheduler.stats.packets == 0, "失败的包不应计入统计"
+
+    @pytest.mark.asyncio
+    async def test_close_fails_queued_packets(self, scheduler, writer):
+        """测试关闭时排队和正在写出的包立即失败。"""
+        writer.drain.side_effect = asyncio.Event().wait  # 永远阻塞
+
+        tasks = [
+            asyncio.create_task(scheduler.send(b"a")),
+            asyncio.create_task(scheduler.send(b"b", SendPriority.BULK)),
+        ]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(scheduler.send(b"c")))
+        await asyncio.sleep(0)
+
+        scheduler.close("测试断开")
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(r, ConnectionError) for r in results), results
+        assert scheduler.depth == 0
+
+    @pytest.mark.asyncio
+    async def test_write_error_propagates_to_batch(self, scheduler, writer):
+        """测试写入异常传递给同批次的所有调用方，之后的包仍可继续发送。"""
+        writer.drain.side_effect = [ConnectionResetError("reset"), None]
+
+        results = await asyncio.gather(
+            scheduler.send(b"a"), scheduler.send(b"b"), return_exceptions=True
+        )
+        assert all(isinstance(r, ConnectionResetError) for r in results)
+
+        await scheduler.send(b"c")
+        assert written(writer)[-1] == b"c"
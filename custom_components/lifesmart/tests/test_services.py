@@ -6,10 +6,11 @@
 - 红外命令发送服务
 - 场景触发服务
 - 点动开关服务
+- 红外码库缓存清除服务
 - 错误处理和参数验证
 """
 
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from homeassistant.core import HomeAssistant
@@ -57,6 +58,27 @@ class TestLifeSmartServiceManager:
             DOMAIN, "trigger_scene"
         ), "应该注册场景触发服务"
         assert hass.services.has_service(DOMAIN, "press_switch"), "应该注册点动开关服务"
+        assert hass.services.has_service(
+            DOMAIN, "invalidate_ir_catalog"
+        ), "应该注册红外码库缓存清除服务"
+
+    @pytest.mark.parametrize("data, category", [({}, None), ({"category": "tv"}, "tv")])
+    async def test_invalidate_ir_catalog_service(
+        self, hass: HomeAssistant, service_manager, data, category
+    ):
+        """测试清除红外码库缓存服务，可按类别清除。"""
+        service_manager.register_services()
+
+        with patch(
+            "custom_components.lifesmart.ir_catalog_cache."
+            "LifeSmartIRCatalogCache.async_invalidate",
+            new_callable=AsyncMock,
+        ) as invalidate:
+            await hass.services.async_call(
+                DOMAIN, "invalidate_ir_catalog", data, blocking=True
+            )
+
+        invalidate.assert_awaited_once_with(category)
 
     async def test_send_ir_keys_service(
         self, hass: HomeAssistant, service_manager, mock_client
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Benchmark LifeSmart local protocol parser throughput.
+
+Decodes a get-config reply and a `_schg` push frame from the shared benchmark
+corpus (scripts/protocol_benchmark_corpus.py) with the protocol implementation in the
+working tree and prints frames/s and MB/s.
+Pass `--baseline-ref <git ref>` to load `core/protocol.py` from another
+revision and benchmark it side by side, e.g. to compare a parser change
+against `HEAD~1`. Runs fully offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PROTOCOL_PATH = "custom_components/lifesmart/core/protocol.py"
+
+sys.path.insert(0, str(ROOT))
+
+from custom_components.lifesmart.core import protocol as current  # noqa: E402
+from scripts.protocol_benchmark_corpus import (  # noqa: E402
+    build_config_reply,
+    build_schg_burst,
+)
+
+
+def load_protocol_at(ref: str):
+    source = subprocess.run(
+        ["git", "show", f"{ref}:{PROTOCOL_PATH}"],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "protocol.py"
+        path.write_bytes(source)
+        # Load it as a sibling of core/protocol.py so its relative imports resolve.
+        spec = importlib.util.spec_from_file_location(
+            "custom_components.lifesmart.core._baseline_protocol", path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+def build_frames(proto) -> dict[str, bytes]:
+    """Encode GL00 payloads from the shared benchmark corpus."""
+    config = proto.encode(build_config_reply(300))
+    if config[:4] == b"ZZ00":
+        config = gzip.decompress(config[10:])
+    schg = proto.encode(build_schg_burst(1)[0])
+    return {"get-config (300 eps)": config, "_schg push": schg}
+
+
+def bench(module, repeat: int) -> dict[str, tuple[float, int]]:
+    proto = module.LifeSmartProtocol()
+    results = {}
+    for name, frame in build_frames(current.LifeSmartProtocol()).items():
+        number = max(1, 200_000 // len(frame))
+        # Only the public decode() API is timed so that any revision, including
+        # ones predating decode_payload(), can serve as the baseline.
+        best = min(
+            timeit.repeat(
+                lambda: proto.decode(frame),
+                number=number,
+                repeat=repeat,
+            )
+        )
+        results[name] = (best / number, len(frame))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline-ref", help="git ref to compare against")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = {"current": bench(current, args.repeat)}
+    if args.baseline_ref:
+        runs[args.baseline_ref] = bench(
+            load_protocol_at(args.baseline_ref), args.repeat
+        )
+
+    for label, results in runs.items():
+        for name, (seconds, size) in results.items():
+            print(
+                f"{label:>12}  {name:<22} {1 / seconds:>10.0f} frames/s "
+                f"{size / seconds / 1e6:>7.2f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
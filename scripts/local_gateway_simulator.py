@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Simulate a LifeSmart gateway on a local TCP port.
+
+The simulator speaks the GL00/ZZ00 protocol through `LifeSmartProtocol`. It
+accepts Login, answers get-config with up to 255 synthetic endpoints from
+scripts/protocol_benchmark_corpus.py, acknowledges commands by `_sel`, and
+streams `_schg` deltas at a configurable rate. Faults can be injected:
+connection drops, outgoing frames split into small delayed chunks (partial
+frames), and slow reads that let the client's socket buffer fill up.
+
+Run it standalone to point a Home Assistant dev instance at it, or with
+`--bench SECONDS` to drive `LifeSmartLocalTCPClient` against it and report
+end-to-end push throughput and reconnects. Everything runs on 127.0.0.1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+sys.path.insert(0, str(ROOT))
+
+from custom_components.lifesmart.core.protocol import (  # noqa: E402
+    LifeSmartFrameAssembler,
+    LifeSmartProtocol,
+)
+from scripts.protocol_benchmark_corpus import build_endpoint  # noqa: E402
+
+# A 0x12 container stores its element count in one byte, so one gateway's
+# get-config reply holds at most this many endpoints.
+MAX_ENDPOINTS = 255
+
+
+@dataclass
+class SimulatorConfig:
+    """Gateway behaviour and injected faults."""
+
+    endpoints: int = 100
+    username: str = "admin"
+    password: str = "admin"
+    node: str = "sim_node"
+    # The benchmark corpus tags every endpoint with this agt.
+    agt: str = "bench_agt"
+    # `_schg` frames per second sent to each logged-in connection (0 = none),
+    # each carrying `schg_batch` IO changes.
+    schg_rate: float = 0.0
+    schg_batch: int = 1
+    # Split every outgoing frame into chunks of this many bytes, sleeping
+    # `chunk_delay` seconds between chunks.
+    chunk_size: int | None = None
+    chunk_delay: float = 0.0
+    # Sleep this long before every socket read.
+    read_delay: float = 0.0
+    # Close each connection this many seconds after it was accepted.
+    disconnect_after: float | None = None
+
+
+@dataclass
+class SimulatorStats:
+    """Counters accumulated over the simulator's lifetime."""
+
+    connections: int = 0
+    logins: int = 0
+    login_failures: int = 0
+    config_requests: int = 0
+    keepalives: int = 0
+    commands: int = 0
+    schg_frames: int = 0
+    bytes_sent: int = 0
+    received: list[dict] = field(default_factory=list)
+
+
+class LocalGatewaySimulator:
+    """Asyncio TCP server that behaves like a LifeSmart gateway."""
+
+    def __init__(self, config: SimulatorConfig | None = None) -> None:
+        self.config = config or SimulatorConfig()
+        if not 1 <= self.config.endpoints <= MAX_ENDPOINTS:
+            raise ValueError(f"endpoints must be between 1 and {MAX_ENDPOINTS}")
+        self.stats = SimulatorStats()
+        self._proto = LifeSmartProtocol()
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._config_frame: bytes | None = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening and return the bound port."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self.port
+
+    async def stop(self) -> None:
+        self.drop_connections()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> LocalGatewaySimulator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def drop_connections(self) -> None:
+        """Abort every open connection, as a gateway reboot or Wi-Fi drop would."""
+        for writer in list(self._writers):
+            writer.transport.abort()
+
+    def config_frame(self) -> bytes:
+        """Return the encoded get-config reply, built once."""
+        if self._config_frame is None:
+            eps = {
+                f"ep_{i:04d}": build_endpoint(i) for i in range(self.config.endpoints)
+            }
+            # Real replies to get-config carry no `_sel`.
+            self._config_frame = self._proto.encode(
+                [
+                    {"req": True, "timestamp": 10},
+                    {"ret": [0, {"eps": eps}], "act": "GetConfig"},
+                ]
+            )
+        return self._config_frame
+
+    def schg_frame(self, seq: int) -> bytes:
+        """Return a `_schg` frame toggling L1 on the next switch endpoints."""
+        switches = range(0, self.config.endpoints, 3)
+        changes = {}
+        for n in range(seq, seq + self.config.schg_batch):
+            ep = switches[n % len(switches)]
+            path = f"{self.config.agt}/me/ep/ep_{ep:04d}/m/L1"
+            val = (n // len(switches)) % 2
+            changes[path] = {"chg": {"type": 128 | val, "val": val}}
+        return self._proto.encode([{"req": False, "timestamp": 10}, {"_schg": changes}])
+
+    async def _send(self, writer: asyncio.StreamWriter, frame: bytes) -> None:
+        size = self.config.chunk_size or len(frame)
+        for start in range(0, len(frame), size):
+            writer.write(frame[start : start + size])
+            await writer.drain()
+            if self.config.chunk_delay and start + size < len(frame):
+                await asyncio.sleep(self.config.chunk_delay)
+        self.stats.bytes_sent += len(frame)
+
+    async def _reply(
+        self, writer: asyncio.StreamWriter, sel: int | None, body: dict
+    ) -> None:
+        header = {"req": True, "timestamp": 10}
+        if sel is not None:
+            header["_sel"] = sel
+        await self._send(writer, self._proto.encode([header, body]))
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.stats.connections += 1
+        self._writers.add(writer)
+        drop_timer = None
+        if self.config.disconnect_after is not None:
+            drop_timer = asyncio.get_running_loop().call_later(
+                self.config.disconnect_after, writer.transport.abort
+            )
+        assembler = LifeSmartFrameAssembler(self._proto)
+        pusher: asyncio.Task | None = None
+        try:
+            while True:
+                if self.config.read_delay:
+                    await asyncio.sleep(self.config.read_delay)
+                data = await reader.read(4096)
+                if not data:
+                    break
+                for header, body in assembler.feed(data):
+                    logged_in = await self._handle_frame(writer, header, body)
+                    if logged_in and self.config.schg_rate and pusher is None:
+                        pusher = asyncio.create_task(self._push_loop(writer))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            if drop_timer:
+                drop_timer.cancel()
+            if pusher:
+                pusher.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await pusher
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _handle_frame(
+        self, writer: asyncio.StreamWriter, header: dict, body: dict
+    ) -> bool:
+        """Answer one request; return True when it completed the login sequence."""
+        act, args = body.get("act"), body.get("args", {})
+        sel = header.get("_sel")
+        self.stats.received.append(body)
+        if act == "Login":
+            if (args.get("uid"), args.get("pwd")) != (
+                self.config.username,
+                self.config.password,
+            ):
+                self.stats.login_failures += 1
+                await self._reply(writer, sel, {"err": -2001, "act": "Login"})
+                return False
+            self.stats.logins += 1
+            node_info = {"base": [0, self.config.node], "agt": [0, self.config.agt]}
+            await self._reply(
+                writer, sel, {"ret": [0, 0, 0, 0, node_info], "act": "Login"}
+            )
+            return False
+        if act == "91" and args.get("_chd") == 0:
+            self.stats.keepalives += 1
+            await self._reply(writer, sel, {"ret": [0], "act": act})
+            return False
+        if act == "91":
+            self.stats.config_requests += 1
+            await self._send(writer, self.config_frame())
+            return True
+        self.stats.commands += 1
+        await self._reply(writer, sel, {"ret": 0, "act": act})
+        return False
+
+    async def _push_loop(self, writer: asyncio.StreamWriter) -> None:
+        interval = 1 / self.config.schg_rate
+        seq = 0
+        next_at = time.monotonic()
+        while not writer.is_closing():
+            try:
+                await self._send(writer, self.schg_frame(seq))
+            except ConnectionError:
+                return  # client went away; _handle tears the connection down
+            self.stats.schg_frames += 1
+            seq += self.config.schg_batch
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+
+async def run_bench(simulator: LocalGatewaySimulator, seconds: float) -> None:
+    """Drive LifeSmartLocalTCPClient against the simulator and print results."""
+    from custom_components.lifesmart.core.local_tcp_client import (
+        LifeSmartLocalTCPClient,
+    )
+
+    config = simulator.config
+    updates = 0
+
+    async def callback(data: dict) -> None:
+        nonlocal updates
+        updates += "msg" in data
+
+    client = LifeSmartLocalTCPClient(
+        "127.0.0.1", simulator.port, config.username, config.password
+    )
+    started = time.perf_counter()
+    task = asyncio.create_task(client.async_connect(callback))
+    await client.device_ready.wait()
+    load_time = time.perf_counter() - started
+    updates = 0
+    await asyncio.sleep(seconds)
+    client.disconnect()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    stats = simulator.stats
+    print(f"devices loaded      : {len(client.devices)} in {load_time * 1000:.1f} ms")
+    print(f"updates dispatched  : {updates} ({updates / seconds:,.0f}/s)")
+    print(f"_schg frames sent   : {stats.schg_frames}")
+    print(f"connections         : {stats.connections}")
+    print(f"get-config requests : {stats.config_requests}")
+    print(f"MB sent             : {stats.bytes_sent / 1e6:.2f}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    config = SimulatorConfig(
+        endpoints=args.endpoints,
+        username=args.username,
+        password=args.password,
+        schg_rate=args.rate,
+        schg_batch=args.batch,
+        chunk_size=args.chunk_size,
+        chunk_delay=args.chunk_delay,
+        read_delay=args.read_delay,
+        disconnect_after=args.disconnect_after,
+    )
+    simulator = LocalGatewaySimulator(config)
+    port = await simulator.start(args.host, args.port)
+    print(f"LifeSmart gateway simulator listening on {args.host}:{port}")
+    try:
+        if args.bench:
+            await run_bench(simulator, args.bench)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--endpoints", type=int, default=100)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--rate", type=float, default=0.0, help="_schg frames/s")
+    parser.add_argument("--batch", type=int, default=1, help="IO changes per frame")
+    parser.add_argument("--chunk-size", type=int, help="split frames into chunks")
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--read-delay", type=float, default=0.0)
+    parser.add_argument("--disconnect-after", type=float)
+    parser.add_argument(
+        "--bench", type=float, help="run the local client for this many seconds"
+    )
+    try:
+        asyncio.run(main_async(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Synthetic LifeSmart local protocol corpus shared by the protocol benchmarks.
+
+The messages mirror what a gateway actually sends: get-config replies with a
+mix of switch, sensor and cover endpoints, `_schg` pushes in both the 5- and
+6-segment path formats, and multi-IO EpSet arguments. Used by
+scripts/benchmark_protocol.py and the tests in
+custom_components/lifesmart/tests/test_protocol_benchmark.py.
+"""
+
+from __future__ import annotations
+
+# A 0x12 container stores its element count in one byte, so large configs are
+# split into several eps dicts of this many endpoints each.
+EPS_PER_GROUP = 100
+
+
+def build_endpoint(i: int) -> dict:
+    """Return get-config data for endpoint i, cycling switch/sensor/cover types."""
+    kind = i % 3
+    if kind == 0:
+        cls, chd = "SL_SW_IF3", {
+            f"L{j}": {"name": f"{{$EPN}} 按钮 {j}", "type": 129, "val": j % 2}
+            for j in range(1, 4)
+        }
+    elif kind == 1:
+        cls, chd = "SL_SC_THL", {
+            "T": {"name": "温度", "type": 9, "val": 235, "v": 23},
+            "H": {"name": "湿度", "type": 9, "val": 560, "v": 56},
+            "Z": {"name": "光照", "type": 9, "val": 120, "v": 120},
+            "V": {"name": "电量", "type": 9, "val": 92, "v": 92},
+        }
+    else:
+        cls, chd = "SL_DOOYA", {
+            "P1": {"name": "位置", "type": 128, "val": 100},
+            "P2": {"name": "控制", "type": 128, "val": 0},
+        }
+    return {
+        "cls": cls,
+        "name": f"设备 {i:04d}",
+        "agt": "bench_agt",
+        "ver": "1.0.63",
+        "_chd": {"m": {"_chd": chd}},
+    }
+
+
+def build_config_reply(endpoints: int) -> list:
+    """Return a get-config reply message with the given number of endpoints."""
+    groups = [
+        {
+            f"ep_{i:04d}": build_endpoint(i)
+            for i in range(start, min(start + EPS_PER_GROUP, endpoints))
+        }
+        for start in range(0, endpoints, EPS_PER_GROUP)
+    ]
+    return [
+        {"_sel": 1, "req": True, "timestamp": 10},
+        {"ret": [0] + [{"eps": group} for group in groups], "act": "GetConfig"},
+    ]
+
+
+def build_schg_burst(frames: int) -> list[list]:
+    """Return `_schg` push messages alternating 5- and 6-segment paths."""
+    messages = []
+    for i in range(frames):
+        dev = f"ep_{i % 50:04d}"
+        path = f"bench_agt/me/ep/{dev}/m/L1" if i % 2 else f"bench_agt/ep/{dev}/m/T"
+        messages.append(
+            [
+                {"_sel": 1, "req": False, "timestamp": 10},
+                {"_schg": {path: {"chg": {"type": 129, "val": i % 2, "v": i % 2}}}},
+            ]
+        )
+    return messages
+
+
+def build_multi_epset_ios(count: int) -> list[dict]:
+    """Return the io_list argument for a multi-IO EpSet."""
+    return [
+        {"idx": f"L{i % 3 + 1}", "type": 0x81 if i % 2 else 0x80, "val": i % 2}
+        for i in range(count)
+    ]